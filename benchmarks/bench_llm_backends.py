@@ -0,0 +1,152 @@
+"""
+Compares end-to-end latency of the Assistants and Chat Completions backends.
+
+Starts a local mock of the OpenAI API (threads, runs, messages and chat
+completions) that adds a fixed per-request latency and a fixed generation
+time, then sends the same structured message through each backend in
+core.llm_backends. The Assistants path pays for its extra round trips and
+run polling; the Chat Completions path is a single call.
+
+Usage: python benchmarks/bench_llm_backends.py [--runs 5] [--latency 0.08] [--generation 1.5]
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import openai
+from core.llm_backends import AssistantsBackend, ChatCompletionsBackend, ASH_RESPONSE_FORMAT, load_persona
+
+ASH_REPLY = json.dumps({
+    "reply": "✨ The tea leaves say yes, mortal!",
+    "conversation_summary": "The user asked Ash for a sign and got one.",
+    "pronouns": "",
+    "preferred_name": "",
+    "relationship_notes": "Friendly.",
+    "ash_memories": [],
+    "long_term_memories": []
+})
+
+STRUCTURED_MESSAGE = {
+    "user": {"user_id": "1234", "name": "Tester", "pronouns": "they/them"},
+    "message": {"content": "Ash, give me a sign!", "timestamp": "2025-01-01T00:00:00+00:00"},
+    "memory": {"long_term": ["Tester loves tea."], "recent_interactions": []},
+    "conversation_history": [],
+    "expected_response_format": ASH_RESPONSE_FORMAT,
+}
+
+class MockOpenAI(BaseHTTPRequestHandler):
+    """Just enough of the OpenAI REST API for both backends."""
+    latency = 0.08
+    generation = 1.5
+    runs = {}  # ✅ run_id -> started at
+    request_count = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("x-ratelimit-limit-requests", "10000")
+        self.send_header("x-ratelimit-remaining-requests", "9999")
+        self.send_header("x-ratelimit-reset-requests", "6ms")
+        self.send_header("x-ratelimit-limit-tokens", "2000000")
+        self.send_header("x-ratelimit-remaining-tokens", "1999000")
+        self.send_header("x-ratelimit-reset-tokens", "30ms")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self):
+        with MockOpenAI.lock:
+            MockOpenAI.request_count += 1
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        time.sleep(self.latency)
+
+        parts = self.path.split("?")[0].strip("/").split("/")[1:]  # ✅ Drop the "v1" prefix
+        now = int(time.time())
+
+        if parts == ["chat", "completions"]:
+            time.sleep(self.generation)
+            return self._send({
+                "id": f"chatcmpl-{uuid.uuid4().hex}", "object": "chat.completion", "created": now, "model": "mock",
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": ASH_REPLY}}],
+                "usage": {"prompt_tokens": 1200, "completion_tokens": 80, "total_tokens": 1280,
+                          "prompt_tokens_details": {"cached_tokens": 1024}},
+            })
+        if parts == ["threads"]:
+            return self._send({"id": f"thread_{uuid.uuid4().hex}", "object": "thread", "created_at": now, "metadata": {}})
+        if len(parts) == 3 and parts[2] == "runs":
+            run_id = f"run_{uuid.uuid4().hex}"
+            MockOpenAI.runs[run_id] = time.monotonic()
+            return self._send({"id": run_id, "object": "thread.run", "thread_id": parts[1], "status": "queued", "created_at": now})
+        if len(parts) == 4 and parts[2] == "runs":
+            done = time.monotonic() - MockOpenAI.runs[parts[3]] >= self.generation
+            status = "completed" if done else "in_progress"
+            return self._send({"id": parts[3], "object": "thread.run", "thread_id": parts[1], "status": status, "created_at": now})
+        if len(parts) == 3 and parts[2] == "messages":
+            return self._send({"object": "list", "data": [{
+                "id": f"msg_{uuid.uuid4().hex}", "object": "thread.message", "thread_id": parts[1], "role": "assistant",
+                "created_at": now, "content": [{"type": "text", "text": {"value": ASH_REPLY, "annotations": []}}]
+            }]})
+
+        self.send_error(404)
+
+    do_GET = _handle
+    do_POST = _handle
+
+async def time_backend(backend, runs):
+    """Per-call latencies (seconds) and API requests per call."""
+    content = backend.user_content(STRUCTURED_MESSAGE)
+    latencies = []
+    requests_before = MockOpenAI.request_count
+    for _ in range(runs):
+        start = time.perf_counter()
+        reply = await backend.complete(content, tokens=0)
+        latencies.append(time.perf_counter() - start)
+        assert json.loads(reply)["reply"], "mock reply did not round-trip"
+    return latencies, (MockOpenAI.request_count - requests_before) / runs
+
+async def time_backends(backends, runs):
+    return [await time_backend(backend, runs) for backend in backends]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.08, help="seconds added to every mock API request")
+    parser.add_argument("--generation", type=float, default=1.5, help="seconds the mock model spends generating")
+    args = parser.parse_args()
+
+    MockOpenAI.latency = args.latency
+    MockOpenAI.generation = args.generation
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = openai.AsyncOpenAI(api_key="mock", base_url=f"http://127.0.0.1:{server.server_port}/v1", max_retries=0)
+    backends = [
+        AssistantsBackend(client, "asst_mock"),
+        ChatCompletionsBackend(client, "mock", load_persona()),
+    ]
+
+    print(f"Runs: {args.runs} | per-request latency: {args.latency * 1000:.0f} ms | generation: {args.generation:.2f}s")
+    print(f"{'backend':28} {'requests':>9} {'mean (s)':>9} {'median':>8} {'max':>8}")
+    for backend, (latencies, requests) in zip(backends, asyncio.run(time_backends(backends, args.runs))):
+        print(f"{backend.label:28} {requests:9.1f} {statistics.mean(latencies):9.2f} {statistics.median(latencies):8.2f} {max(latencies):8.2f}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
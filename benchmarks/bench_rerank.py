@@ -0,0 +1,97 @@
+"""
+Compares what reaches the prompt with and without the re-ranking stage.
+
+Builds synthetic retrieval candidates shaped like real ones: a few topics,
+each with several near-identical paraphrases of different ages, embedded in
+the same 1536-dim space as text-embedding-3-small. The baseline keeps the
+top-k by retrieval score (what the bot sent before re-ranking); the
+re-ranked run goes through core.rerank.rerank.
+
+Usage: python benchmarks/bench_rerank.py [--topics 6] [--paraphrases 5] [--top-k 8] [--runs 200]
+"""
+import os
+import sys
+import time
+import argparse
+import datetime
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.records import Snippet
+from core.rerank import rerank
+
+DIMENSIONS = 1536
+NOW = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+def token_counter():
+    """tiktoken when its encoding is available, otherwise a ~4 chars/token estimate."""
+    from core.prompt_assembler import count_tokens, get_encoding
+    return count_tokens, "tiktoken" if get_encoding() is not None else "estimate (chars / 4)"
+
+def make_candidates(rng, topics, paraphrases):
+    """Candidate snippets: `paraphrases` noisy copies of each topic, scored by similarity to the query."""
+    query = rng.standard_normal(DIMENSIONS)
+    candidates = []
+    for topic in range(topics):
+        center = rng.standard_normal(DIMENSIONS) + query * rng.uniform(0.2, 1.0)
+        for copy in range(paraphrases):
+            vector = center + rng.standard_normal(DIMENSIONS) * 0.1
+            similarity = float(vector @ query / (np.linalg.norm(vector) * np.linalg.norm(query)))
+            candidates.append(Snippet(
+                "UserFact",
+                f"{topic}-{copy}",
+                f"Topic {topic}: the user mentioned this detail about their life (phrasing {copy}), with some extra words.",
+                score=similarity,
+                created_at=NOW - datetime.timedelta(days=int(rng.integers(0, 400))),
+                vector=vector.tolist()
+            ))
+    return candidates
+
+def describe(snippets, count_tokens):
+    topics = {snippet.uuid.split("-")[0] for snippet in snippets}
+    ages = [(NOW - snippet.created_at).days for snippet in snippets]
+    return {
+        "snippets": len(snippets),
+        "tokens": count_tokens([snippet.text for snippet in snippets]),
+        "topics": len(topics),
+        "mean_age_days": sum(ages) / len(ages) if ages else 0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--topics", type=int, default=6)
+    parser.add_argument("--paraphrases", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    count_tokens, tokenizer = token_counter()
+
+    totals = {"baseline": [], "reranked": []}
+    rerank_ms = []
+    for _ in range(args.runs):
+        candidates = make_candidates(rng, args.topics, args.paraphrases)
+
+        baseline = sorted(candidates, key=lambda snippet: -snippet.score)[:args.top_k]
+        totals["baseline"].append(describe(baseline, count_tokens))
+
+        start = time.perf_counter()
+        reranked = rerank(candidates, args.top_k, now=NOW)
+        rerank_ms.append((time.perf_counter() - start) * 1000)
+        totals["reranked"].append(describe(reranked, count_tokens))
+
+    print(f"Candidates per query: {args.topics * args.paraphrases} | top-k: {args.top_k} | runs: {args.runs} | tokens: {tokenizer}")
+    print(f"{'':10} {'snippets':>9} {'tokens':>8} {'topics':>7} {'age (d)':>8}")
+    for name, runs in totals.items():
+        mean = {key: sum(run[key] for run in runs) / len(runs) for key in runs[0]}
+        print(f"{name:10} {mean['snippets']:9.1f} {mean['tokens']:8.1f} {mean['topics']:7.1f} {mean['mean_age_days']:8.0f}")
+
+    baseline_tokens = sum(run["tokens"] for run in totals["baseline"])
+    reranked_tokens = sum(run["tokens"] for run in totals["reranked"])
+    print(f"Prompt tokens saved: {(1 - reranked_tokens / baseline_tokens):.1%}")
+    print(f"Re-rank latency: median {np.median(rerank_ms):.2f} ms, p95 {np.percentile(rerank_ms, 95):.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import math
+import time
+import threading
+import numpy as np
+from weaviate.classes.query import Sort, MetadataQuery
+from data.constants import (
+    ASH_MEMORY_TOP_K,
+    ASH_MEMORY_REINFORCEMENT_WEIGHT,
+    ASH_MEMORY_MATCH_DISTANCE,
+    ASH_MEMORY_HOT_SET_SIZE,
+    ASH_MEMORY_HOT_SET_TTL,
+)
+from core.records import AshMemory
+from core.embedding_cache import get_query_embedding, get_query_embedding_async
+from core.weaviate_manager import get_weaviate_client, report_weaviate_error
+from core.normalize import normalize_text
+from core.weaviate_async import get_async_weaviate_client, report_async_weaviate_error
+
+# ✅ Ash's self-memories are shared by every user, and the most reinforced
+# ones are the ones that matter most. The top ASH_MEMORY_HOT_SET_SIZE of them
+# (with their vectors) are kept in memory and scored locally, so most
+# requests rank Ash's memories without a Weaviate query at all.
+
+def ash_memory_score(similarity, reinforced_count):
+    """Vector similarity boosted by how often Ash has reinforced the memory."""
+    return similarity * (1 + ASH_MEMORY_REINFORCEMENT_WEIGHT * math.log1p(max(reinforced_count, 1)))
+
+def unit_vector(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+class AshMemoryHotSet:
+    """
+    The most reinforced Ash memories and their vectors, refreshed every `ttl`
+    seconds. If the collection fits in the set, it is `complete` and local
+    scoring is exact; otherwise a query is only needed when a memory outside
+    the set could still outscore the local top-k.
+    Vectors are kept as one normalized matrix, so ranking is a single matmul.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._memories = []  # ✅ AshMemory per matrix row; replaced, never mutated, once handed out
+        self._matrix = None  # ✅ len(_memories) x dimensions, unit rows
+        self._counts = None  # ✅ reinforced_count per row
+        self._rows = {}  # ✅ uuid -> row
+        self._complete = False
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0}
+
+    def is_fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def load(self, objects):
+        """Replaces the set with query results sorted by reinforced_count (size + 1 fetched)."""
+        memories, vectors = [], []
+        for obj in objects[:self.size]:
+            vector = (obj.vector or {}).get("default")
+            if vector:
+                memories.append(AshMemory.from_object(obj))
+                vectors.append(unit_vector(vector))
+
+        matrix = np.stack(vectors) if vectors else None
+        counts = np.array([memory.reinforced_count for memory in memories], dtype=np.float32)
+
+        with self._lock:
+            self._memories = memories
+            self._matrix = matrix
+            self._counts = counts
+            self._rows = {memory.uuid: row for row, memory in enumerate(memories)}
+            self._complete = len(objects) <= self.size
+            self._loaded_at = time.monotonic()
+            self._stats["refreshes"] += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def apply_writes(self, writes):
+        """Keeps counts current after a flush; a memory we don't hold means the set is stale."""
+        with self._lock:
+            memories = list(self._memories)
+            counts = self._counts.copy() if self._counts is not None else None
+            for obj_uuid, properties in writes:
+                row = self._rows.get(obj_uuid)
+                if row is None:
+                    self._loaded_at = None
+                    continue
+                memory = memories[row]
+                reinforced_count = properties.get("reinforced_count") or memory.reinforced_count
+                memories[row] = AshMemory(memory.uuid, memory.memory, reinforced_count)  # ✅ Callers may still hold the old record
+                counts[row] = reinforced_count
+            self._memories = memories
+            self._counts = counts
+
+    def _snapshot(self):
+        with self._lock:
+            return self._memories, self._matrix, self._counts
+
+    def rank(self, query_vector):
+        """Returns [(score, AshMemory)] for every memory in the set, best first."""
+        memories, matrix, counts = self._snapshot()
+        if matrix is None:
+            return []
+        similarities = matrix @ unit_vector(query_vector)
+        scores = similarities * (1 + ASH_MEMORY_REINFORCEMENT_WEIGHT * np.log1p(np.maximum(counts, 1)))
+        return [(float(scores[row]), memories[row]) for row in np.argsort(-scores, kind="stable")]
+
+    def nearest(self, vector):
+        """Returns (similarity, AshMemory) for the closest memory in the set, or (0.0, None)."""
+        memories, matrix, _ = self._snapshot()
+        if matrix is None:
+            return 0.0, None
+        similarities = matrix @ unit_vector(vector)
+        row = int(np.argmax(similarities))
+        return float(similarities[row]), memories[row]
+
+    def covers(self, ranked, limit):
+        """True if no memory outside the set can beat the local top-k."""
+        with self._lock:
+            if self._complete:
+                return True
+            if len(ranked) < limit or not self._memories:
+                return False
+            floor = float(self._counts.min())
+        # ✅ Outside memories have at most `floor` reinforcements and similarity <= 1
+        return ranked[limit - 1][0] >= ash_memory_score(1.0, floor)
+
+    def record(self, hit):
+        with self._lock:
+            self._stats["hits" if hit else "misses"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._memories)
+            stats["complete"] = self._complete
+            stats["fresh"] = self.is_fresh()
+        return stats
+
+ash_hot_set = AshMemoryHotSet(ASH_MEMORY_HOT_SET_SIZE, ASH_MEMORY_HOT_SET_TTL)
+
+### **🔹 Retrieval**
+async def refresh_ash_hot_set_async():
+    """Reloads the hot set with the most reinforced memories."""
+    client = await get_async_weaviate_client()
+    if not client:
+        return False
+
+    try:
+        response = await client.collections.get("AshMemories").query.fetch_objects(
+            sort=Sort.by_property("reinforced_count", ascending=False),
+            limit=ASH_MEMORY_HOT_SET_SIZE + 1,  # ✅ One extra tells us whether the set holds everything
+            include_vector=True
+        )
+        ash_hot_set.load(response.objects)
+        print(f"🔥 Loaded {len(response.objects[:ASH_MEMORY_HOT_SET_SIZE])} Ash memories into the hot set.")
+        return True
+
+    except Exception as e:
+        print(f"❌ ERROR loading Ash memory hot set: {e}")
+        await report_async_weaviate_error(e)
+        return False
+
+async def fetch_relevant_ash_memories_async(query_text, limit=ASH_MEMORY_TOP_K):
+    """
+    Returns Ash's top-k self-memories for a message as AshMemory records,
+    ranked by similarity weighted by reinforcement.
+    """
+    query_vector = await get_query_embedding_async(query_text)
+    if query_vector is None:
+        return []
+
+    if not ash_hot_set.is_fresh():
+        await refresh_ash_hot_set_async()
+
+    ranked = ash_hot_set.rank(query_vector)
+    if ash_hot_set.covers(ranked, limit):
+        ash_hot_set.record(hit=True)
+        return [memory for _, memory in ranked[:limit]]
+    ash_hot_set.record(hit=False)
+
+    client = await get_async_weaviate_client()
+    if not client:
+        return [memory for _, memory in ranked[:limit]]
+
+    try:
+        response = await client.collections.get("AshMemories").query.near_vector(
+            near_vector=query_vector,
+            limit=limit,
+            return_metadata=MetadataQuery(distance=True)
+        )
+    except Exception as e:
+        print(f"❌ ERROR searching Ash memories: {e}")
+        await report_async_weaviate_error(e)
+        return [memory for _, memory in ranked[:limit]]
+
+    candidates = {memory.uuid: (score, memory) for score, memory in ranked}
+    for obj in response.objects:
+        memory = AshMemory.from_object(obj)
+        candidates.setdefault(memory.uuid, (ash_memory_score(1 - obj.metadata.distance, memory.reinforced_count), memory))
+
+    return [memory for _, memory in sorted(candidates.values(), key=lambda pair: -pair[0])[:limit]]
+
+### **🔹 Reinforcement**
+def match_existing_ash_memories(objects, client=None):
+    """
+    Rewrites each new Ash memory to the text of an existing memory within
+    ASH_MEMORY_MATCH_DISTANCE, so paraphrases share the existing memory's key
+    and reinforce it instead of being inserted as new objects.
+    """
+    client = client or get_weaviate_client()
+    if not client:
+        return objects
+
+    collection = client.collections.get("AshMemories")
+    matched = []
+
+    for obj in objects:
+        vector = get_query_embedding(obj["memory"])
+        if vector is None:
+            matched.append(obj)
+            continue
+
+        similarity, memory = ash_hot_set.nearest(vector)
+        if memory is None or 1 - similarity > ASH_MEMORY_MATCH_DISTANCE:
+            try:
+                response = collection.query.near_vector(
+                    near_vector=vector,
+                    limit=1,
+                    distance=ASH_MEMORY_MATCH_DISTANCE,
+                    return_metadata=MetadataQuery(distance=True)
+                )
+            except Exception as e:
+                print(f"⚠️ Couldn't match Ash memory by similarity: {e}")
+                report_weaviate_error(e)
+                response = None
+            memory = AshMemory.from_object(response.objects[0]) if response and response.objects else None
+
+        if memory is not None and normalize_text(memory.memory) != normalize_text(obj["memory"]):
+            print(f"🔁 Reinforcing Ash memory {memory.memory!r} (matched {obj['memory']!r})")
+            obj = dict(obj, memory=memory.memory)
+        matched.append(obj)
+
+    return matched
+
+def show_ash_memory_stats():
+    """Prints hot set size and hit rate."""
+    stats = ash_hot_set.stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / lookups if lookups else 0.0
+    print("\n=== 🔥 Ash Memory Hot Set ===")
+    print(f"Memories: {stats['size']} | Complete: {stats['complete']} | Fresh: {stats['fresh']} | Refreshes: {stats['refreshes']}")
+    print(f"Local rankings: {stats['hits']} | Weaviate fallbacks: {stats['misses']} | Hit rate: {hit_rate:.1%}")
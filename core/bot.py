@@ -1,17 +1,37 @@
 import os
+import sys
 import time
 import random
 import asyncio
 import discord
 import logging
 import threading
-from discord.ext import commands
+from discord.ext import tasks
 from core.startup import startup_sequence
-from core.message_handler import gather_data_for_chatgpt
-from data.constants import GUILD_ID, DISCORD_BOT_TOKEN, ASH_EPHEMERAL_MESSAGES
+from core.message_handler import gather_data_for_chatgpt, send_reply_to_channel
+from core.channel_buffer import channel_buffer
+from core.prompt_assembler import load_encoding
+from core.weaviate_async import close_async_weaviate_client
+from core.memory_writer import memory_writer
+from data.constants import (
+    DISCORD_BOT_TOKEN, ASH_EPHEMERAL_MESSAGES, SHARD_PROCESS_INDEX, SHARD_STATUS_INTERVAL,
+    RECENT_CONVERSATIONS_PRUNE_INTERVAL_HOURS, CONSOLIDATION_INTERVAL_HOURS,
+    DUPLICATE_WINDOW,
+    SCHEDULER_MAX_CONCURRENT, SCHEDULER_PER_USER_IN_FLIGHT, SCHEDULER_MAX_QUEUE,
+    JOB_MODE, JOB_WORKERS, JOB_WORKER_CONCURRENCY, JOB_RESULT_POLL_INTERVAL
+)
+from core.memory_consolidation import run_memory_consolidation
+from core.coalescer import MessageCoalescer
+from core.scheduler import RequestScheduler
+from core.job_queue import job_queue
+from core.llm_worker import llm_workers
+from core.rate_limiter import openai_rate_limiter
+from core.sharding import (
+    create_bot, sync_guild_commands, write_shard_status, show_shard_status, shard_processes, stop_on_sigterm
+)
 from core.logging_manager import show_logging_menu
 from core.weaviate_manager import (
-    weaviate_menu, is_weaviate_running
+    weaviate_menu, is_weaviate_running, close_weaviate_client, prune_recent_conversations
 )
 from weaviate.classes.query import Filter
 
@@ -20,29 +40,109 @@ logger = logging.getLogger("discord")
 # ✅ Set up Discord bot with intents
 intents = discord.Intents.default()
 intents.message_content = True  # Required for reading messages
-bot = commands.Bot(command_prefix="/", intents=intents)
+bot = create_bot(intents)  # ✅ AutoShardedBot when "shard_count" is set in config.json
 
 # ✅ Track bot state
 bot_running = False
 bot_thread = None
 
+# ✅ /ash requests run under a global cap, round-robin across users, with load shedding
+request_scheduler = RequestScheduler(SCHEDULER_MAX_CONCURRENT, SCHEDULER_PER_USER_IN_FLIGHT, SCHEDULER_MAX_QUEUE)
+
+job_waiters = {}  # ✅ Queue mode: job_id -> future resolved once its reply is delivered
+
+async def enqueue_ash_job(user_id, message, channel, handled):
+    """
+    Queue mode: hands the request to the LLM workers. Returns (status,
+    position) like the scheduler; `handled` resolves once the reply is posted.
+    """
+    counts = await asyncio.to_thread(job_queue.counts)
+    queued, running = counts.get("queued", 0), counts.get("running", 0)
+    if queued >= SCHEDULER_MAX_QUEUE:
+        print(f"🚦 Job queue full ({SCHEDULER_MAX_QUEUE}). Shedding request from {user_id}.")
+        return "rejected", None
+
+    guild = getattr(channel, "guild", None)
+    payload = {
+        "user_id": str(user_id),
+        "message": message,
+        "channel_id": channel.id,
+        "guild_id": guild.id if guild else None,
+        "last_messages": await channel_buffer.recent(channel, user_id),  # ✅ Workers have no gateway connection
+    }
+    job_id = await asyncio.to_thread(job_queue.enqueue, user_id, SHARD_PROCESS_INDEX, payload)
+    job_waiters[job_id] = handled
+
+    if queued + running < JOB_WORKERS * JOB_WORKER_CONCURRENCY:
+        return "started", None
+    return "queued", queued + 1
+
+def resolve(future):
+    """Marks a request handled (at most once)."""
+    if not future.done():
+        future.set_result(None)
+
+async def schedule_ash_request(user_id, message, channel, replies):
+    """
+    Hands a (coalesced) /ash request to the scheduler or job queue, tells the
+    user where they stand, and returns once the request has been handled
+    (so the coalescer can hold the user's follow-ups until then).
+    """
+    handled = asyncio.get_running_loop().create_future()
+    if JOB_MODE == "queue":
+        status, position = await enqueue_ash_job(user_id, message, channel, handled)
+    else:
+        async def job():
+            try:
+                await gather_data_for_chatgpt(user_id, message, channel)
+            finally:
+                resolve(handled)
+        status, position = request_scheduler.submit(user_id, job)
+
+    if status != "started":
+        await update_ephemeral_replies(replies, status, position)
+    if status != "rejected":
+        await handled
+
+async def update_ephemeral_replies(replies, status, position):
+    """Edits each ephemeral reply with the request's place in line, or the shed notice."""
+    for interaction, ephemeral_message in replies:
+        if status == "queued":
+            content = f"{ephemeral_message}\n⏳ You're #{position} in line."
+        else:
+            content = "🚦 Ash is swamped right now. Please try again in a minute!"
+        try:
+            await interaction.edit_original_response(content=content)
+        except discord.HTTPException as e:
+            print(f"⚠️ Couldn't update ephemeral message: {e}")
+
+# ✅ Bursts of /ash messages from one user in one channel become a single request
+message_coalescer = MessageCoalescer(schedule_ash_request, DUPLICATE_WINDOW)
+
 ### 🎭 Bot Event: On Ready ###
 @bot.event
 async def on_ready():
     """Triggered when the bot starts and syncs commands."""
     try:
         await asyncio.sleep(3)
+        await load_encoding()  # ✅ Fetch the tokenizer now, off the event loop, not on the first /ash
         print("🚀 Checking and syncing commands...")
 
-        # ✅ Resync Commands (BUT DON'T CLEAR THEM)
-        await bot.tree.sync(guild=discord.Object(id=GUILD_ID))
+        # ✅ Register commands in every guild this process serves (BUT DON'T CLEAR THEM)
+        await sync_guild_commands(bot, bot.guilds)
 
-        # ✅ Delay before fetching commands (let Discord API catch up)
-        await asyncio.sleep(3)
-
-        # ✅ Debug: Fetch and print registered commands
-        commands = await bot.tree.fetch_commands(guild=discord.Object(id=GUILD_ID))
-        print(f"📌 Registered commands: {[cmd.name for cmd in commands]}")
+        # ✅ Start background maintenance (on_ready fires again after reconnects); one process runs it
+        if SHARD_PROCESS_INDEX <= 0:
+            if not prune_conversations_task.is_running():
+                prune_conversations_task.start()
+            if not consolidate_memories_task.is_running():
+                consolidate_memories_task.start()
+            if JOB_MODE == "queue" and not recover_stale_jobs_task.is_running():
+                recover_stale_jobs_task.start()
+        if SHARD_PROCESS_INDEX >= 0 and not shard_status_task.is_running():
+            shard_status_task.start()
+        if JOB_MODE == "queue" and not deliver_job_results_task.is_running():
+            deliver_job_results_task.start()
 
         print(f"✅ Logged in as {bot.user} | Commands Re-Synced")
         print("✅ AshBot is fully ready and online!")
@@ -50,6 +150,98 @@ async def on_ready():
     except Exception as e:
         print(f"❌ Error syncing commands: {e}")
 
+@bot.event
+async def on_guild_join(guild):
+    """Registers commands in a newly joined guild right away."""
+    await sync_guild_commands(bot, [guild])
+
+### 📥 Channel Buffer Events ###
+# ✅ Listeners (not @bot.event) so the default on_message command handling still runs
+@bot.listen("on_message")
+async def buffer_new_message(message):
+    channel_buffer.add(message)
+
+@bot.listen("on_raw_message_edit")
+async def buffer_edited_message(payload):
+    if "content" in payload.data:
+        channel_buffer.edit(payload.channel_id, payload.message_id, payload.data["content"])
+
+@bot.listen("on_raw_message_delete")
+async def buffer_deleted_message(payload):
+    channel_buffer.delete(payload.channel_id, {payload.message_id})
+
+@bot.listen("on_raw_bulk_message_delete")
+async def buffer_bulk_deleted_messages(payload):
+    channel_buffer.delete(payload.channel_id, payload.message_ids)
+
+### 🧹 Background Maintenance ###
+@tasks.loop(hours=RECENT_CONVERSATIONS_PRUNE_INTERVAL_HOURS)
+async def prune_conversations_task():
+    """Applies the RecentConversations retention policy without blocking the event loop."""
+    await asyncio.to_thread(prune_recent_conversations)
+
+@tasks.loop(hours=CONSOLIDATION_INTERVAL_HOURS)
+async def consolidate_memories_task():
+    """Merges oversized users' memories into compact fact lists in a worker thread."""
+    await asyncio.to_thread(run_memory_consolidation)
+
+### 📬 Job Queue Results ###
+@tasks.loop(seconds=JOB_RESULT_POLL_INTERVAL)
+async def deliver_job_results_task():
+    """
+    Queue mode: posts the replies LLM workers have finished for this
+    process's channels. Errors are logged, never raised: an exception would
+    stop the loop and no reply would be delivered again.
+    """
+    try:
+        finished = await asyncio.to_thread(job_queue.finished_jobs, SHARD_PROCESS_INDEX)
+    except Exception as e:
+        print(f"❌ ERROR reading finished jobs: {e}")
+        return
+
+    for job_id, status, payload, result in finished:
+        try:
+            channel = bot.get_channel(payload["channel_id"]) or await bot.fetch_channel(payload["channel_id"])
+            if status == "failed":
+                print(f"❌ Job {job_id} failed: {result.get('error')}")
+                await send_reply_to_channel(
+                    "I'm experiencing some magical interference... Try again later!",
+                    channel, payload["user_id"], payload["message"]
+                )
+                continue
+            for content in result.get("messages", []):
+                await channel.send(content)
+        except Exception as e:
+            print(f"❌ ERROR posting reply for job {job_id}: {e}")
+        finally:
+            waiter = job_waiters.pop(job_id, None)
+            if waiter is not None:
+                resolve(waiter)
+
+    try:
+        await asyncio.to_thread(job_queue.delete, [job[0] for job in finished])
+    except Exception as e:
+        print(f"❌ ERROR clearing delivered jobs: {e}")
+
+@tasks.loop(minutes=1)
+async def recover_stale_jobs_task():
+    """Queue mode: requeues jobs whose worker died mid-run (stopped heartbeating)."""
+    try:
+        requeued, failed = await asyncio.to_thread(job_queue.recover_stale)
+    except Exception as e:
+        print(f"❌ ERROR recovering stale jobs: {e}")
+        return
+    if requeued or failed:
+        print(f"♻️ Stale jobs: {requeued} requeued, {failed} failed.")
+
+@tasks.loop(seconds=SHARD_STATUS_INTERVAL)
+async def shard_status_task():
+    """Shard worker processes: publishes shard status and latency for the console menu."""
+    try:
+        write_shard_status(bot)
+    except OSError as e:
+        print(f"⚠️ Could not write shard status: {e}")
+
 @bot.event
 async def on_disconnect():
     """Handles unexpected disconnections by attempting reconnection."""
@@ -80,14 +272,14 @@ async def talk_to_ash(interaction: discord.Interaction, message: str):
     channel = interaction.channel
 
     try:
-        # ✅ Randomly select an ephemeral message
+        # ✅ Respond immediately with a random ephemeral message (edited later with the queue position if we have to wait)
         ephemeral_message = random.choice(ASH_EPHEMERAL_MESSAGES)
-
-        # ✅ Respond immediately with an ephemeral message
         await interaction.response.send_message(ephemeral_message, ephemeral=True)
 
-        # ✅ Process the request asynchronously without an immediate public response
-        asyncio.create_task(gather_data_for_chatgpt(user_id, message, channel))
+        # ✅ Send the message on; follow-ups sent while Ash is still answering join one request, double-submits are dropped
+        status = message_coalescer.submit(user_id, channel, message, context=(interaction, ephemeral_message))
+        if status == "duplicate":
+            await interaction.edit_original_response(content="👀 I already have that one, give me a moment!")
 
     except Exception as e:
         print(f"❌ ERROR processing /ash command: {e}")
@@ -111,6 +303,14 @@ def start_ashbot():
         return
     
     print("🚀 Starting AshBot...")
+    if JOB_MODE == "queue":
+        llm_workers.start()  # ✅ The bot only enqueues; these processes do the LLM work
+
+    if shard_processes.enabled:
+        shard_processes.start()  # ✅ Shards run in worker processes; this one keeps the menu
+        bot_running = True
+        return
+
     bot_thread = threading.Thread(target=run_bot, daemon=True)
     bot_thread.start()
 
@@ -123,8 +323,50 @@ def stop_ashbot():
 
     print("🛑 Stopping AshBot...")
     bot_running = False
+
+    if shard_processes.enabled:
+        shard_processes.stop()
+    if JOB_MODE == "queue":
+        llm_workers.stop()
+
+    # ✅ The async client lives on the bot's loop, so close it there
+    try:
+        asyncio.run_coroutine_threadsafe(close_async_weaviate_client(), bot.loop).result(timeout=5)
+    except Exception as e:
+        print(f"⚠️ Could not close async Weaviate client: {e}")
+
+    memory_writer.stop()  # ✅ Flush queued memory writes before the client goes away
+    close_weaviate_client()  # ✅ os._exit skips atexit hooks, so close explicitly
     os._exit(0)  # Force stop for now (we will refine this later)
 
+def show_request_queue():
+    """Prints the /ash scheduler's load and counters."""
+    stats = request_scheduler.stats()
+    print("\n=== 🚦 /ash Request Queue ===")
+    print(f"Running: {stats['running']}/{SCHEDULER_MAX_CONCURRENT} | Waiting: {stats['waiting']}/{SCHEDULER_MAX_QUEUE} ({stats['waiting_users']} users)")
+    print(f"Started: {stats['started']} | Queued: {stats['queued']} | Shed: {stats['shed']}")
+    print(f"Completed: {stats['completed']} | Failed: {stats['failed']}")
+
+    if JOB_MODE == "queue":
+        counts = job_queue.counts()
+        print(f"Job queue: {counts.get('queued', 0)} queued | {counts.get('running', 0)} running | {counts.get('done', 0) + counts.get('failed', 0)} awaiting delivery")
+        print(f"LLM workers alive: {llm_workers.alive()}/{JOB_WORKERS} (x{JOB_WORKER_CONCURRENCY} jobs each)")
+
+    limits = openai_rate_limiter.stats()
+    print(f"OpenAI requests available: {limits['requests_available']}/{limits['requests_per_minute']} per min | tokens: {limits['tokens_available']}/{limits['tokens_per_minute']} per min")
+    print(f"Calls: {limits['calls']} | Paced waits: {limits['waits']} ({limits['wait_seconds']:.1f}s) | 429s: {limits['rate_limited']} | Header syncs: {limits['header_syncs']}")
+
+def run_shard_worker():
+    """Entry point for a shard worker process (started by ShardProcessManager)."""
+    stop_on_sigterm()
+    try:
+        run_bot()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        memory_writer.stop()  # ✅ Flush queued memory writes before exiting
+        close_weaviate_client()
+
 ### 📝 Console Menu ###
 def show_main_menu():
     """Displays the main menu for AshBot."""
@@ -136,6 +378,8 @@ def show_main_menu():
         else:
             print("[A] Start AshBot")
         print("[W] Manage Weaviate")
+        print("[Q] Show Request Queue")
+        print("[H] Show Shard Status")
         print("[C] Configure Logging")
         print("[X] Exit AshBot")
 
@@ -146,12 +390,19 @@ def show_main_menu():
             start_ashbot()
         elif choice == "W":
             weaviate_menu()
+        elif choice == "Q":
+            show_request_queue()
+        elif choice == "H":
+            show_shard_status(bot, bot_running)
         elif choice == "C":
             show_logging_menu()
         elif choice == "X":
             break
 
 if __name__ == "__main__":
+    if "--shard-worker" in sys.argv:
+        run_shard_worker()
+        sys.exit(0)
     if not is_weaviate_running():
         startup_sequence()
     show_main_menu()
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from data.constants import ASH_BOT_ID, CHANNEL_BUFFER_SIZE, CHANNEL_BUFFER_SCAN, CHANNEL_BUFFER_MAX_MESSAGES
+
+# ✅ Recent channel messages for Ash's conversation_history, kept in memory
+# instead of calling channel.history (a rate-limited REST call) on every
+# /ash request. Gateway events (new, edited, deleted messages) keep each
+# channel's ring buffer current; a channel we haven't seen yet is backfilled
+# from history once. The total across channels is capped, evicting the
+# channels idle the longest.
+
+def entry_from_message(msg):
+    return {
+        "id": msg.id,
+        "user_id": str(msg.author.id),
+        "bot": msg.author.bot,
+        "message": msg.content,
+        "timestamp": msg.created_at.isoformat()
+    }
+
+class ChannelBuffer:
+    """Per-channel ring buffers of recent messages, with a global message cap and LRU eviction of idle channels."""
+
+    def __init__(self, per_channel, max_messages):
+        self.per_channel = per_channel
+        self.max_messages = max_messages
+        self._channels = OrderedDict()  # ✅ channel_id -> {"messages": deque, "backfilled": bool}, least recently used first
+        self._total = 0
+        self._lock = threading.Lock()
+        self._backfills = {}  # ✅ channel_id -> Task, so concurrent misses share one history call
+
+    def _channel(self, channel_id):
+        """Returns (and marks as used) a channel's buffer, creating it if needed. Caller must hold the lock."""
+        buffer = self._channels.get(channel_id)
+        if buffer is None:
+            buffer = self._channels[channel_id] = {"messages": deque(maxlen=self.per_channel), "backfilled": False}
+        self._channels.move_to_end(channel_id)
+        return buffer
+
+    def _evict(self):
+        """Drops the least recently used channels until the global cap holds. Caller must hold the lock."""
+        while self._total > self.max_messages and len(self._channels) > 1:
+            _, buffer = self._channels.popitem(last=False)
+            self._total -= len(buffer["messages"])
+
+    def _append(self, buffer, entry):
+        messages = buffer["messages"]
+        if len(messages) < messages.maxlen:
+            self._total += 1
+        messages.append(entry)  # ✅ At maxlen the deque drops the oldest message itself
+
+    def add(self, msg):
+        """on_message: appends a new message to its channel's buffer."""
+        with self._lock:
+            self._append(self._channel(msg.channel.id), entry_from_message(msg))
+            self._evict()
+
+    def edit(self, channel_id, message_id, content):
+        """on_raw_message_edit: updates a buffered message's text, if we have it."""
+        with self._lock:
+            buffer = self._channels.get(channel_id)
+            if buffer is None:
+                return
+            for entry in buffer["messages"]:
+                if entry["id"] == message_id:
+                    entry["message"] = content
+                    return
+
+    def delete(self, channel_id, message_ids):
+        """on_raw_message_delete / on_raw_bulk_message_delete: forgets deleted messages."""
+        with self._lock:
+            buffer = self._channels.get(channel_id)
+            if buffer is None:
+                return
+            kept = [entry for entry in buffer["messages"] if entry["id"] not in message_ids]
+            self._total -= len(buffer["messages"]) - len(kept)
+            buffer["messages"] = deque(kept, maxlen=self.per_channel)
+
+    async def _backfill(self, channel):
+        """Merges the channel's latest history into its buffer (once per channel)."""
+        try:
+            history = [entry_from_message(msg) async for msg in channel.history(limit=self.per_channel)]
+        except Exception as e:
+            print(f"❌ ERROR backfilling channel {channel.id}: {e}")
+            return
+
+        with self._lock:
+            buffer = self._channel(channel.id)
+            seen = {entry["id"]: entry for entry in history}
+            seen.update((entry["id"], entry) for entry in buffer["messages"])  # ✅ Live events are newer than history
+            merged = sorted(seen.values(), key=lambda entry: entry["id"])[-self.per_channel:]  # ✅ Snowflake ids sort by time
+
+            self._total += len(merged) - len(buffer["messages"])
+            buffer["messages"] = deque(merged, maxlen=self.per_channel)
+            buffer["backfilled"] = True
+            self._evict()
+
+    async def recent(self, channel, user_id, limit=5):
+        """
+        The last few messages in a channel, newest first, skipping other bots
+        (Ash's own messages are kept). Only touches the network on a miss.
+        """
+        with self._lock:
+            buffer = self._channels.get(channel.id)
+            backfilled = buffer is not None and buffer["backfilled"]
+
+        if not backfilled:
+            task = self._backfills.get(channel.id)
+            if task is None:
+                task = asyncio.ensure_future(self._backfill(channel))
+                self._backfills[channel.id] = task
+                task.add_done_callback(lambda _: self._backfills.pop(channel.id, None))
+            await asyncio.shield(task)
+
+        with self._lock:
+            buffer = self._channel(channel.id)
+            newest = list(buffer["messages"])[-CHANNEL_BUFFER_SCAN:][::-1]
+
+        last_messages = []
+        for entry in newest:
+            if entry["bot"] and entry["user_id"] not in (str(user_id), str(ASH_BOT_ID)):  # Ignore bots EXCEPT AshBot
+                continue
+            last_messages.append({key: entry[key] for key in ("user_id", "message", "timestamp")})
+            if len(last_messages) == limit:
+                break
+        return last_messages
+
+channel_buffer = ChannelBuffer(CHANNEL_BUFFER_SIZE, CHANNEL_BUFFER_MAX_MESSAGES)
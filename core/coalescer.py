@@ -0,0 +1,99 @@
+import time
+import asyncio
+from core.normalize import normalize_text
+
+# ✅ People often send two or three /ash messages in a row. A message is
+# sent on right away when nothing of that user's is in flight in the
+# channel; follow-ups that arrive while Ash is still handling it are held
+# and sent as ONE request with one combined reply (instead of one full
+# context fetch and LLM run per message, with replies racing each other).
+
+class MessageCoalescer:
+    """
+    Calls `dispatch(user_id, combined_message, channel, contexts)` per
+    (user, channel), one request at a time. `dispatch` must return once the
+    request has been handled; messages that arrive meanwhile are combined
+    into the next request. `contexts` are the caller's per-message values
+    (e.g. the interactions to answer).
+    A message identical to one pending or dispatched in the last
+    `duplicate_window` seconds is dropped.
+    """
+
+    def __init__(self, dispatch, duplicate_window):
+        self.dispatch = dispatch
+        self.duplicate_window = duplicate_window
+        self._pending = {}  # ✅ (user_id, channel_id) -> {"channel", "messages", "normalized", "contexts"}
+        self._in_flight = set()  # ✅ (user_id, channel_id) with a request being handled
+        self._recent = {}  # ✅ (user_id, channel_id) -> [(normalized message, dispatched at)]
+        self._tasks = set()  # ✅ Strong references so dispatch tasks aren't garbage collected
+
+    def submit(self, user_id, channel, message, context=None):
+        """
+        Queues a message. Returns "duplicate" if it was dropped, "dispatched"
+        if it was sent on right away, "held" if it waits for the user's
+        request in flight, or "merged" if it joined messages already held.
+        """
+        key = (str(user_id), channel.id)
+        normalized = normalize_text(message)
+
+        if self._is_duplicate(key, normalized):
+            print(f"🔁 Dropped duplicate /ash message from {user_id}.")
+            return "duplicate"
+
+        burst = self._pending.get(key)
+        if burst is not None:
+            burst["messages"].append(message)
+            burst["normalized"].add(normalized)
+            burst["contexts"].append(context)
+            return "merged"
+
+        self._pending[key] = {"channel": channel, "messages": [message], "normalized": {normalized}, "contexts": [context]}
+        if key in self._in_flight:
+            return "held"
+
+        self._in_flight.add(key)
+        task = asyncio.create_task(self._dispatch_pending(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return "dispatched"
+
+    def _is_duplicate(self, key, normalized):
+        burst = self._pending.get(key)
+        if burst is not None and normalized in burst["normalized"]:
+            return True
+
+        cutoff = time.monotonic() - self.duplicate_window
+        recent = [(text, sent_at) for text, sent_at in self._recent.get(key, []) if sent_at > cutoff]
+        if recent:
+            self._recent[key] = recent
+        else:
+            self._recent.pop(key, None)
+        return any(text == normalized for text, _ in recent)
+
+    async def _dispatch_pending(self, key):
+        """Sends the held messages, then whatever arrived while they were handled, until none are left."""
+        try:
+            while key in self._pending:
+                burst = self._pending.pop(key)
+
+                now = time.monotonic()
+                self._recent = {  # ✅ Forget double-submit fingerprints that have aged out
+                    recent_key: entries for recent_key, entries in self._recent.items()
+                    if any(sent_at > now - self.duplicate_window for _, sent_at in entries)
+                }
+                self._recent.setdefault(key, []).extend((text, now) for text in burst["normalized"])
+
+                messages = burst["messages"]
+                if len(messages) > 1:
+                    print(f"🧺 Coalesced {len(messages)} /ash messages from {key[0]} into one request.")
+                try:
+                    await self.dispatch(key[0], combine_messages(messages), burst["channel"], burst["contexts"])
+                except Exception as e:
+                    print(f"❌ ERROR dispatching /ash request from {key[0]}: {e}")
+        finally:
+            self._pending.pop(key, None)  # ✅ Only non-empty if cancelled (shutdown)
+            self._in_flight.discard(key)
+
+def combine_messages(messages):
+    """Joins a burst into one message, one line per original message."""
+    return messages[0] if len(messages) == 1 else "\n".join(messages)
@@ -0,0 +1,88 @@
+import copy
+import time
+import threading
+from collections import OrderedDict
+from data.constants import CONTEXT_CACHE_MAX_ENTRIES, CONTEXT_CACHE_TTL, CONTEXT_CACHE_NEGATIVE_TTL
+
+MISS = object()  # ✅ Sentinel so cached empty results ({} / []) are still hits
+
+class ContextCache:
+    """
+    Small thread-safe TTL + LRU cache for per-user lookups.
+    Keys are (kind, user_id, *extra) tuples so all of a user's entries can be
+    invalidated together. Empty results are cached with a shorter TTL
+    (negative caching) so unknown users don't hit Weaviate on every message.
+    """
+
+    def __init__(self, max_entries, ttl, negative_ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()  # ✅ key -> (expires_at, value), oldest first
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        """Returns a copy of the cached value, or MISS."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return MISS
+
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return MISS
+
+            self._entries.move_to_end(key)
+            self._stats["negative_hits" if not value else "hits"] += 1
+            return copy.deepcopy(value)
+
+    def set(self, key, value):
+        """Stores a copy of value, evicting the least recently used entries past the size bound."""
+        ttl = self.ttl if value else self.negative_ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate_user(self, user_id):
+        """Drops every cached entry for one user."""
+        user_id = str(user_id)
+        with self._lock:
+            stale_keys = [key for key in self._entries if key[1] == user_id]
+            for key in stale_keys:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale_keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["negative_hits"]) / lookups if lookups else 0.0
+        return stats
+
+context_cache = ContextCache(CONTEXT_CACHE_MAX_ENTRIES, CONTEXT_CACHE_TTL, CONTEXT_CACHE_NEGATIVE_TTL)
+
+def show_cache_stats():
+    """Prints context cache counters and offers to clear it."""
+    stats = context_cache.stats()
+    print("\n=== 🗃️ Context Cache Stats ===")
+    print(f"Entries: {stats['size']}/{context_cache.max_entries}")
+    print(f"Hits: {stats['hits']} | Negative hits: {stats['negative_hits']} | Misses: {stats['misses']}")
+    print(f"Hit rate: {stats['hit_rate']:.1%}")
+    print(f"Expired: {stats['expired']} | Evicted: {stats['evictions']} | Invalidated: {stats['invalidations']}")
+
+    if input("Clear the cache? (y/N): ").strip().lower() == "y":
+        context_cache.clear()
+        print("🧹 Context cache cleared.")
@@ -0,0 +1,192 @@
+import time
+import array
+import asyncio
+import sqlite3
+import threading
+import openai
+from data.constants import (
+    OPENAI_API_KEY,
+    EMBEDDING_MODEL,
+    EMBEDDING_CACHE_FILE,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_TOUCH_INTERVAL,
+)
+from core.normalize import normalize_text
+
+# ✅ The bot embeds search queries itself (instead of letting Weaviate's
+# text2vec-openai module do it per request) and keeps the vectors in a
+# small SQLite store, so repeats like "hi ash" never leave the machine.
+
+def _pack(vector):
+    return array.array("f", vector).tobytes()
+
+def _unpack(blob):
+    vector = array.array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+class EmbeddingCache:
+    """
+    Bounded, persistent (SQLite) embedding store keyed by (model, normalized
+    text). Hits only note their LRU timestamp in memory; the timestamps are
+    written in one batch every `touch_interval` seconds (and before any
+    eviction), so a read never costs a write and a commit.
+    """
+
+    def __init__(self, path, max_entries, touch_interval=EMBEDDING_CACHE_TOUCH_INTERVAL):
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self._connection = None
+        self._touched = {}  # ✅ (model, text) -> last hit time, not yet written
+        self._touched_flushed_at = time.monotonic()
+        self._stats = {"hits": 0, "misses": 0, "embed_calls": 0, "embed_errors": 0, "embed_ms_total": 0.0, "evictions": 0}
+
+    def _db(self):
+        """Opens the database on first use. Caller must hold the lock."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL, "
+                "PRIMARY KEY (model, text))"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        return self._connection
+
+    def _flush_touched(self):
+        """Writes pending LRU timestamps in one transaction. Caller must hold the lock."""
+        if self._touched:
+            db = self._db()
+            db.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text = ?",
+                [(last_used, model, text) for (model, text), last_used in self._touched.items()]
+            )
+            db.commit()
+            self._touched.clear()
+        self._touched_flushed_at = time.monotonic()
+
+    def get(self, model, text):
+        """Returns the cached vector or None, noting the hit for the next LRU timestamp flush."""
+        with self._lock:
+            row = self._db().execute("SELECT vector FROM embeddings WHERE model = ? AND text = ?", (model, text)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._touched[(model, text)] = time.time()
+            if time.monotonic() - self._touched_flushed_at >= self.touch_interval:
+                self._flush_touched()
+            self._stats["hits"] += 1
+            return _unpack(row[0])
+
+    def put(self, model, text, vector):
+        """Stores a vector and evicts the least recently used rows past max_entries."""
+        with self._lock:
+            db = self._db()
+            self._touched.pop((model, text), None)
+            db.execute(
+                "INSERT OR REPLACE INTO embeddings (model, text, vector, last_used) VALUES (?, ?, ?, ?)",
+                (model, text, _pack(vector), time.time())
+            )
+            overflow = db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._flush_touched()  # ✅ Evict by up-to-date timestamps
+                db.execute(
+                    "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,)
+                )
+                self._stats["evictions"] += overflow
+            db.commit()
+
+    def record_embed_call(self, elapsed_ms, failed=False):
+        with self._lock:
+            self._stats["embed_calls"] += 1
+            self._stats["embed_ms_total"] += elapsed_ms
+            if failed:
+                self._stats["embed_errors"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = self._db().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["avg_embed_ms"] = stats["embed_ms_total"] / stats["embed_calls"] if stats["embed_calls"] else 0.0
+        return stats
+
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_FILE, EMBEDDING_CACHE_MAX_ENTRIES)
+
+_sync_openai = None
+_async_openai = None
+_inflight_embeddings = {}  # ✅ (model, text) -> Task, so concurrent lookups share one API call
+
+def get_query_embedding(text, model=EMBEDDING_MODEL):
+    """Returns the embedding for a query, from the cache when possible. None if embedding fails."""
+    global _sync_openai
+    key = normalize_text(text)
+    vector = embedding_cache.get(model, key)
+    if vector is not None:
+        return vector
+
+    if _sync_openai is None:
+        _sync_openai = openai.OpenAI(api_key=OPENAI_API_KEY)
+
+    start = time.perf_counter()
+    try:
+        response = _sync_openai.embeddings.create(model=model, input=key)
+    except Exception as e:
+        embedding_cache.record_embed_call((time.perf_counter() - start) * 1000, failed=True)
+        print(f"❌ ERROR embedding query: {e}")
+        return None
+
+    embedding_cache.record_embed_call((time.perf_counter() - start) * 1000)
+    vector = response.data[0].embedding
+    embedding_cache.put(model, key, vector)
+    return vector
+
+async def get_query_embedding_async(text, model=EMBEDDING_MODEL):
+    """
+    Async version of get_query_embedding; SQLite work runs off the event loop.
+    Concurrent requests for the same query (e.g. facts and memory search
+    for one message) wait on a single lookup.
+    """
+    key = normalize_text(text)
+    task = _inflight_embeddings.get((model, key))
+    if task is None:
+        task = asyncio.ensure_future(_lookup_query_embedding_async(key, model))
+        _inflight_embeddings[(model, key)] = task
+        task.add_done_callback(lambda _: _inflight_embeddings.pop((model, key), None))
+    return await asyncio.shield(task)
+
+async def _lookup_query_embedding_async(key, model):
+    global _async_openai
+    vector = await asyncio.to_thread(embedding_cache.get, model, key)
+    if vector is not None:
+        return vector
+
+    if _async_openai is None:
+        _async_openai = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+    start = time.perf_counter()
+    try:
+        response = await _async_openai.embeddings.create(model=model, input=key)
+    except Exception as e:
+        embedding_cache.record_embed_call((time.perf_counter() - start) * 1000, failed=True)
+        print(f"❌ ERROR embedding query (async): {e}")
+        return None
+
+    embedding_cache.record_embed_call((time.perf_counter() - start) * 1000)
+    vector = response.data[0].embedding
+    await asyncio.to_thread(embedding_cache.put, model, key, vector)
+    return vector
+
+def show_embedding_stats():
+    """Prints embedding cache hit rate and embedding latency."""
+    stats = embedding_cache.stats()
+    print("\n=== 🧭 Query Embedding Cache ===")
+    print(f"Model: {EMBEDDING_MODEL}")
+    print(f"Cached embeddings: {stats['size']}/{embedding_cache.max_entries} (evicted: {stats['evictions']})")
+    print(f"Hits: {stats['hits']} | Misses: {stats['misses']} | Hit rate: {stats['hit_rate']:.1%}")
+    print(f"Embedding calls: {stats['embed_calls']} (errors: {stats['embed_errors']}) | Avg latency: {stats['avg_embed_ms']:.0f} ms")
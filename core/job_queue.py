@@ -0,0 +1,147 @@
+import json
+import time
+import sqlite3
+import threading
+from data.constants import JOB_QUEUE_FILE, JOB_STALE_AFTER, JOB_MAX_ATTEMPTS
+
+# ✅ Local broker between the Discord process(es) and the LLM worker
+# processes, in one SQLite file (WAL mode, so every process can read while
+# one writes). The bot enqueues /ash jobs; workers claim them, do the
+# context fetch, OpenAI call and memory writes, and store the reply; the bot
+# polls for finished jobs and posts them. Workers heartbeat the jobs they
+# hold; jobs whose heartbeat stops (the worker died) are handed out again.
+
+class JobQueue:
+    """SQLite-backed job queue shared by every process on this machine."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _db(self):
+        """Opens the database on first use. Caller must hold the lock."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, origin INTEGER NOT NULL, "
+                "status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, worker TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, claimed_at REAL, heartbeat_at REAL, finished_at REAL)"
+            )
+            try:
+                self._connection.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")  # ✅ Queues created before heartbeats
+            except sqlite3.OperationalError:
+                pass  # ✅ Already there
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS stop_requests (worker TEXT PRIMARY KEY)")
+        return self._connection
+
+    def enqueue(self, user_id, origin, payload):
+        """Adds a job and returns its id. `origin` is the bot process that will post the result."""
+        with self._lock:
+            cursor = self._db().execute(
+                "INSERT INTO jobs (user_id, origin, status, payload, created_at) VALUES (?, ?, 'queued', ?, ?)",
+                (str(user_id), origin, json.dumps(payload), time.time())
+            )
+            return cursor.lastrowid
+
+    def claim(self, worker):
+        """
+        Atomically takes the oldest queued job whose user has nothing running
+        (one in-flight job per user, like the in-process scheduler).
+        Returns (job_id, payload) or None.
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")  # ✅ Take the write lock first so two workers can't claim the same row
+            try:
+                row = db.execute(
+                    "SELECT id, payload FROM jobs WHERE status = 'queued' "
+                    "AND user_id NOT IN (SELECT user_id FROM jobs WHERE status = 'running') "
+                    "ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, claimed_at = ?, heartbeat_at = ?, attempts = attempts + 1 WHERE id = ?",
+                        (worker, now, now, row[0])
+                    )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return (row[0], json.loads(row[1])) if row else None
+
+    def heartbeat(self, worker):
+        """Renews the lease on every job a live worker is running."""
+        with self._lock:
+            self._db().execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE worker = ? AND status = 'running'", (time.time(), worker)
+            )
+
+    def finish(self, job_id, result, failed=False):
+        """Stores a job's result for the bot to post."""
+        with self._lock:
+            self._db().execute(
+                "UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?",
+                ("failed" if failed else "done", json.dumps(result), time.time(), job_id)
+            )
+
+    def finished_jobs(self, origin, limit=50):
+        """Done/failed jobs for one bot process, oldest first: [(job_id, status, payload, result)]."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT id, status, payload, result FROM jobs WHERE origin = ? AND status IN ('done', 'failed') ORDER BY id LIMIT ?",
+                (origin, limit)
+            ).fetchall()
+        return [(job_id, status, json.loads(payload), json.loads(result or "{}")) for job_id, status, payload, result in rows]
+
+    def delete(self, job_ids):
+        """Removes delivered jobs."""
+        if not job_ids:
+            return
+        with self._lock:
+            self._db().execute(f"DELETE FROM jobs WHERE id IN ({','.join('?' * len(job_ids))})", list(job_ids))
+
+    def recover_stale(self, stale_after=JOB_STALE_AFTER, max_attempts=JOB_MAX_ATTEMPTS):
+        """
+        Requeues running jobs whose worker stopped heartbeating (it died);
+        fails them after max_attempts. Slow jobs on a live worker keep their
+        lease. Returns (requeued, failed).
+        """
+        cutoff = time.time() - stale_after
+        with self._lock:
+            db = self._db()
+            requeued = db.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL WHERE status = 'running' AND COALESCE(heartbeat_at, claimed_at) < ? AND attempts < ?",
+                (cutoff, max_attempts)
+            ).rowcount
+            failed = db.execute(
+                "UPDATE jobs SET status = 'failed', result = ?, finished_at = ? WHERE status = 'running' AND COALESCE(heartbeat_at, claimed_at) < ?",
+                (json.dumps({"error": "worker stopped responding"}), time.time(), cutoff)
+            ).rowcount
+        return requeued, failed
+
+    def request_stop(self, workers):
+        """Asks workers to finish their running jobs and exit (works where SIGTERM can't be caught, i.e. Windows)."""
+        with self._lock:
+            self._db().executemany("INSERT OR IGNORE INTO stop_requests (worker) VALUES (?)", [(worker,) for worker in workers])
+
+    def stop_requested(self, worker):
+        with self._lock:
+            return self._db().execute("SELECT 1 FROM stop_requests WHERE worker = ?", (worker,)).fetchone() is not None
+
+    def clear_stop(self, worker):
+        """A starting worker drops any stop request left for its name (pids get reused)."""
+        with self._lock:
+            self._db().execute("DELETE FROM stop_requests WHERE worker = ?", (worker,))
+
+    def counts(self):
+        """Jobs per status, e.g. {"queued": 3, "running": 2}."""
+        with self._lock:
+            rows = self._db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+job_queue = JobQueue(JOB_QUEUE_FILE)
@@ -0,0 +1,188 @@
+import json
+import datetime
+import asyncio
+import openai
+from data.constants import OPENAI_API_KEY, ASSISTANT_ID, LLM_BACKEND, CHAT_MODEL, ASH_PERSONA_FILE
+from core.prompt_assembler import count_tokens
+from core.rate_limiter import openai_rate_limiter
+
+# ✅ send_to_ash / stream_to_ash talk to one of these instead of the OpenAI
+# API directly. "assistants" is the original path: a thread per message, a
+# run, polling, then a message list (4+ round trips). "chat_completions" is
+# one stateless call: Ash's persona and the response schema go first as an
+# identical system message every time, so OpenAI's prompt caching can reuse
+# that prefix, and JSON mode guarantees a parseable object back.
+# Pick one with "llm_backend" in config.json.
+
+# ✅ The fields Ash answers with (sent as expected_response_format, and part of the chat system prompt)
+ASH_RESPONSE_FORMAT = {
+    "reply": "string",
+    "conversation_summary": "string",
+    "pronouns": "string",
+    "preferred_name": "string",
+    "relationship_notes": "string",
+    "ash_memories": ["memory1", "memory2"],
+    "long_term_memories": ["memory1", "memory2"]
+}
+
+RUN_POLL_INTERVAL = 1  # ✅ Seconds between run status checks
+RUN_FINISHED_STATUSES = {"completed", "failed", "cancelled", "expired", "incomplete"}
+PROMPT_CACHE_KEY = "ash-persona"  # ✅ Routes every request with our shared prefix to the same cache
+
+def serialize_datetime(obj):
+    """Ensures datetime objects are ISO formatted before sending."""
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    return str(obj)
+
+def load_persona(path=ASH_PERSONA_FILE):
+    """Ash's instructions, read once when the chat backend is built."""
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read().strip()
+
+class AssistantsBackend:
+    """Thread + run on the configured Assistant; Ash's instructions live on OpenAI's side."""
+    label = "OpenAI Assistants API"
+
+    def __init__(self, client, assistant_id, poll_interval=RUN_POLL_INTERVAL):
+        self.client = client
+        self.assistant_id = assistant_id
+        self.poll_interval = poll_interval
+
+    def user_content(self, structured_message):
+        return json.dumps(structured_message, default=serialize_datetime)
+
+    def prompt_tokens(self, content):
+        return count_tokens(content)
+
+    async def complete(self, content, tokens):
+        """Returns Ash's raw reply text, or None if the run produced nothing."""
+        # ✅ Step 1: Create a thread with the user's message
+        thread = await openai_rate_limiter.call(
+            self.client.beta.threads.with_raw_response.create,
+            messages=[{"role": "user", "content": content}]
+        )
+
+        # ✅ Step 2: Run the assistant within the thread
+        run = await openai_rate_limiter.call(
+            self.client.beta.threads.runs.with_raw_response.create,
+            tokens=tokens,
+            thread_id=thread.id,
+            assistant_id=self.assistant_id
+        )
+
+        # ✅ Step 3: Wait for completion
+        while run.status not in RUN_FINISHED_STATUSES:
+            await asyncio.sleep(self.poll_interval)  # ✅ Prevent excessive polling
+            run = await openai_rate_limiter.call(
+                self.client.beta.threads.runs.with_raw_response.retrieve,
+                thread_id=thread.id,
+                run_id=run.id
+            )
+
+        if run.status != "completed":
+            print(f"❌ Ash's run ended with status '{run.status}'.")
+            return None
+
+        # ✅ Step 4: Fetch the assistant’s latest response message
+        messages = await openai_rate_limiter.call(
+            self.client.beta.threads.messages.with_raw_response.list,
+            thread_id=thread.id
+        )
+        return messages.data[0].content[0].text.value if messages.data else None
+
+    async def stream_text(self, content):
+        """Yields Ash's reply text as it generates."""
+        async with self.client.beta.threads.create_and_run_stream(
+            assistant_id=self.assistant_id,
+            thread={"messages": [{"role": "user", "content": content}]}
+        ) as stream:
+            async for text in stream.text_deltas:
+                yield text
+
+class ChatCompletionsBackend:
+    """One stateless JSON-mode completion with Ash's persona as a stable, cacheable prefix."""
+    label = "OpenAI Chat Completions"
+
+    def __init__(self, client, model, persona):
+        self.client = client
+        self.model = model
+        # ✅ Byte-for-byte identical on every call; anything per-message goes in the user turn
+        self.system_prompt = f"{persona}\n\n## Response format\n{json.dumps(ASH_RESPONSE_FORMAT, indent=2)}"
+        self._system_tokens = None
+
+    def user_content(self, structured_message):
+        # ✅ The schema is already in the system prompt
+        message = {key: value for key, value in structured_message.items() if key != "expected_response_format"}
+        return json.dumps(message, default=serialize_datetime)
+
+    def prompt_tokens(self, content):
+        if self._system_tokens is None:
+            self._system_tokens = count_tokens(self.system_prompt)
+        return self._system_tokens + count_tokens(content)
+
+    def _request(self, content):
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": content}
+            ],
+            "response_format": {"type": "json_object"},
+            "prompt_cache_key": PROMPT_CACHE_KEY,
+        }
+
+    async def complete(self, content, tokens):
+        """Returns Ash's raw reply text, or None if the completion was empty."""
+        completion = await openai_rate_limiter.call(
+            self.client.chat.completions.with_raw_response.create,
+            tokens=tokens,
+            **self._request(content)
+        )
+        log_cache_usage(completion.usage)
+
+        choice = completion.choices[0] if completion.choices else None
+        if choice is None:
+            return None
+        if choice.finish_reason == "length":
+            print("⚠️ Ash's reply hit the token limit; the JSON may be cut off.")
+        return choice.message.content
+
+    async def stream_text(self, content):
+        """Yields Ash's reply text as it generates."""
+        stream = await self.client.chat.completions.create(
+            **self._request(content),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            if chunk.usage:
+                log_cache_usage(chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+def log_cache_usage(usage):
+    """Prints how much of the prompt was served from OpenAI's prompt cache."""
+    if not usage:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    print(f"🧠 Prompt tokens: {usage.prompt_tokens} ({cached} cached) | completion: {usage.completion_tokens}")
+
+_backend = None
+
+def create_llm_backend(name, client):
+    """Builds the backend called `name`; unknown names fall back to Assistants."""
+    if name == "chat_completions":
+        return ChatCompletionsBackend(client, CHAT_MODEL, load_persona())
+    if name != "assistants":
+        print(f"⚠️ Unknown llm_backend '{name}' in config.json. Using assistants.")
+    return AssistantsBackend(client, ASSISTANT_ID)
+
+def get_llm_backend():
+    """The backend selected in config.json, built on first use."""
+    global _backend
+    if _backend is None:
+        _backend = create_llm_backend(LLM_BACKEND, openai.AsyncOpenAI(api_key=OPENAI_API_KEY))
+        print(f"✅ LLM backend: {_backend.label}")
+    return _backend
@@ -0,0 +1,163 @@
+import os
+import sys
+import signal
+import socket
+import asyncio
+import subprocess
+from types import SimpleNamespace
+from core.job_queue import job_queue
+from core.message_handler import gather_data_for_chatgpt
+from core.prompt_assembler import load_encoding
+from core.memory_writer import memory_writer
+from core.weaviate_async import close_async_weaviate_client
+from core.weaviate_manager import close_weaviate_client
+from data.constants import JOB_WORKERS, JOB_WORKER_CONCURRENCY, JOB_POLL_INTERVAL, JOB_HEARTBEAT_INTERVAL, JOB_WORKER_LOG_DIR
+
+# ✅ LLM worker process for "job_mode": "queue". Claims /ash jobs from the
+# local job queue and runs the same pipeline the bot runs inline (context
+# fetch, OpenAI call, memory writes), storing Ash's reply for the bot to
+# post. The console menu starts "job_workers" of these with the bot; more
+# can be started by hand (python -m core.llm_worker) without touching the
+# gateway process.
+
+class JobReplyChannel:
+    """Stands in for the Discord channel inside a worker: whatever Ash sends is kept for the bot to post."""
+
+    def __init__(self, channel_id, guild_id):
+        self.id = channel_id
+        self.guild = SimpleNamespace(id=guild_id) if guild_id else None  # ✅ For the response cache's guild scope
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+async def run_job(job_id, payload):
+    """Runs one /ash job and stores its reply (or marks it failed)."""
+    channel = JobReplyChannel(payload["channel_id"], payload.get("guild_id"))
+    try:
+        handled = await gather_data_for_chatgpt(
+            payload["user_id"], payload["message"], channel,
+            last_messages=payload["last_messages"],
+            stream=False  # ✅ Nothing to edit progressively; the bot posts the finished reply
+        )
+        if handled or channel.sent:  # ✅ A reply that went out before a later step failed is still delivered
+            await asyncio.to_thread(job_queue.finish, job_id, {"messages": channel.sent})
+        else:
+            await asyncio.to_thread(job_queue.finish, job_id, {"error": "request failed (see the worker log)"}, True)
+    except Exception as e:
+        print(f"❌ ERROR running job {job_id}: {e}")
+        await asyncio.to_thread(job_queue.finish, job_id, {"error": str(e)}, True)
+
+async def keep_alive(name, stopping):
+    """Heartbeats this worker's running jobs and watches for a stop request from the bot."""
+    while not stopping.is_set():
+        try:
+            await asyncio.to_thread(job_queue.heartbeat, name)
+            if await asyncio.to_thread(job_queue.stop_requested, name):
+                print(f"🛑 Stop requested for worker {name}.")
+                stopping.set()
+                return
+        except Exception as e:
+            print(f"⚠️ Worker {name} heartbeat failed: {e}")
+        try:
+            await asyncio.wait_for(stopping.wait(), timeout=JOB_HEARTBEAT_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_worker(name):
+    """Claims and runs jobs, up to JOB_WORKER_CONCURRENCY at once, until asked to stop (stop request or SIGTERM)."""
+    stopping = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+    except NotImplementedError:
+        pass  # ✅ Windows: the bot asks workers to stop through the job queue instead
+
+    await asyncio.to_thread(job_queue.clear_stop, name)
+    await load_encoding()
+    heartbeat = asyncio.create_task(keep_alive(name, stopping))
+    slots = asyncio.Semaphore(JOB_WORKER_CONCURRENCY)  # ✅ Jobs mostly wait on OpenAI, so one process runs several
+    running = set()
+    print(f"👷 LLM worker {name} is taking jobs ({JOB_WORKER_CONCURRENCY} at a time).")
+
+    try:
+        while not stopping.is_set():
+            await slots.acquire()
+            if stopping.is_set():  # ✅ Asked to stop while every slot was busy
+                slots.release()
+                break
+
+            job = await asyncio.to_thread(job_queue.claim, name)
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(stopping.wait(), timeout=JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            print(f"📥 Claimed job {job[0]} from {job[1]['user_id']}.")
+            task = asyncio.create_task(run_job(*job))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+        print(f"🛑 Worker {name} stopping; finishing {len(running)} running jobs...")
+        await asyncio.gather(*running)
+    finally:
+        stopping.set()
+        await heartbeat  # ✅ Keeps the lease alive until the last job is finished
+        await close_async_weaviate_client()
+
+class WorkerPool:
+    """Starts and stops the LLM worker processes alongside the bot."""
+
+    def __init__(self, count):
+        self.count = count
+        self.processes = []  # ✅ (worker name, Popen)
+
+    def start(self):
+        os.makedirs(JOB_WORKER_LOG_DIR, exist_ok=True)
+        for index in range(self.count):
+            log_path = os.path.join(JOB_WORKER_LOG_DIR, f"worker-{index}.log")
+            name = f"{socket.gethostname()}-worker-{index}"  # ✅ Named here, not by pid: venv launchers on Windows run Python as a child
+            with open(log_path, "a", encoding="utf-8") as log:
+                self.processes.append((name, subprocess.Popen(
+                    [sys.executable, "-m", "core.llm_worker"],
+                    env=dict(os.environ, ASH_WORKER_NAME=name), stdout=log, stderr=subprocess.STDOUT
+                )))
+            print(f"👷 Started LLM worker {index}. Logs: {log_path}")
+
+    def alive(self):
+        return sum(1 for _, process in self.processes if process.poll() is None)
+
+    def stop(self, timeout=60):
+        """
+        Asks workers (through the job queue) to finish the jobs they hold and
+        flush their memory writes, then waits for them (LLM calls can be
+        slow), killing stragglers.
+        """
+        running = [(name, process) for name, process in self.processes if process.poll() is None]
+        job_queue.request_stop([name for name, _ in running])
+        for name, process in running:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                print(f"⚠️ LLM worker {name} didn't exit in {timeout}s. Killing it.")
+                process.kill()
+                process.wait()
+        self.processes = []
+
+llm_workers = WorkerPool(JOB_WORKERS)
+
+def main():
+    name = os.environ.get("ASH_WORKER_NAME") or f"{socket.gethostname()}-{os.getpid()}"
+    try:
+        asyncio.run(run_worker(name))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        memory_writer.stop()  # ✅ Flush queued memory writes before exiting
+        close_weaviate_client()
+
+if __name__ == "__main__":
+    main()
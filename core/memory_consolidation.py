@@ -0,0 +1,168 @@
+import os
+import json
+import openai
+from weaviate.classes.query import Filter, Sort
+from weaviate.classes.aggregate import GroupByAggregate
+from data.constants import (
+    OPENAI_API_KEY,
+    CONSOLIDATION_MODEL,
+    CONSOLIDATION_FACT_THRESHOLD,
+    CONSOLIDATION_CONVERSATION_THRESHOLD,
+    CONSOLIDATION_TARGET_FACTS,
+    CONSOLIDATION_KEEP_CONVERSATIONS,
+    CONSOLIDATION_BATCH_SIZE,
+    CONSOLIDATION_MAX_USERS,
+    CONSOLIDATION_CHECKPOINT_FILE,
+)
+from core.weaviate_manager import get_weaviate_client, report_weaviate_error, replace_user_facts
+
+# ✅ Heavy users pile up facts (and conversation summaries) with every /ash
+# call. This job periodically merges each oversized user's memory into a
+# compact fact list with ONE summarization call per user. Progress is
+# checkpointed per batch, so an interrupted pass resumes where it stopped.
+
+CONSOLIDATION_PROMPT = (
+    "You maintain the long-term memory of Ash, a Discord bot, about one user. "
+    "Merge the facts and conversation summaries below into a compact list of distinct, durable facts "
+    "about the user. Combine duplicates and paraphrases into one fact, keep the newest version when "
+    "facts conflict, and drop details that only mattered in a single conversation. "
+    f"Return at most {CONSOLIDATION_TARGET_FACTS} facts as JSON: {{\"facts\": [\"...\"]}}"
+)
+
+_openai_client = None
+
+def _counts_by_user(client, class_name, max_users=CONSOLIDATION_MAX_USERS):
+    """Returns {user_id: object count} for one collection with a single aggregate (at most `max_users` groups)."""
+    groups = client.collections.get(class_name).aggregate.over_all(
+        group_by=GroupByAggregate(prop="user_id", limit=max_users), total_count=True
+    )
+    if len(groups.groups) >= max_users:
+        print(f"⚠️ Counted only {max_users} users in {class_name} (CONSOLIDATION_MAX_USERS); some may be skipped this pass.")
+    return {group.grouped_by.value: group.total_count or 0 for group in groups.groups}
+
+def find_oversized_users(client):
+    """User IDs whose facts or conversation summaries exceed the consolidation thresholds."""
+    fact_counts = _counts_by_user(client, "UserFact")
+    conversation_counts = _counts_by_user(client, "RecentConversations")
+    return sorted(
+        {user_id for user_id, count in fact_counts.items() if count > CONSOLIDATION_FACT_THRESHOLD}
+        | {user_id for user_id, count in conversation_counts.items() if count > CONSOLIDATION_CONVERSATION_THRESHOLD}
+    )
+
+def load_checkpoint():
+    """Returns the saved pass ({"pending": [...], "done": [...]}) or None."""
+    if not os.path.exists(CONSOLIDATION_CHECKPOINT_FILE):
+        return None
+    try:
+        with open(CONSOLIDATION_CHECKPOINT_FILE, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Ignoring unreadable consolidation checkpoint: {e}")
+        return None
+
+def save_checkpoint(checkpoint):
+    """Writes the checkpoint atomically so a crash mid-write can't corrupt it."""
+    temp_path = CONSOLIDATION_CHECKPOINT_FILE + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file, indent=2)
+    os.replace(temp_path, CONSOLIDATION_CHECKPOINT_FILE)
+
+def summarize_user_memories(facts, summaries):
+    """One chat call that merges facts and old summaries. Returns a list of facts, or None."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+
+    payload = {"facts": facts, "conversation_summaries": summaries}
+    try:
+        response = _openai_client.chat.completions.create(
+            model=CONSOLIDATION_MODEL,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": CONSOLIDATION_PROMPT},
+                {"role": "user", "content": json.dumps(payload)}
+            ]
+        )
+        merged = json.loads(response.choices[0].message.content).get("facts")
+    except (openai.OpenAIError, json.JSONDecodeError, AttributeError) as e:
+        print(f"❌ ERROR summarizing memories: {e}")
+        return None
+
+    if not isinstance(merged, list):
+        return None
+    merged = [fact.strip() for fact in merged if isinstance(fact, str) and fact.strip()]
+    return merged[:CONSOLIDATION_TARGET_FACTS] or None
+
+def consolidate_user(client, user_id):
+    """Consolidates one user's memory. Returns True if it was written (or nothing needed doing)."""
+    fact_collection = client.collections.get("UserFact")
+    conversation_collection = client.collections.get("RecentConversations")
+    user_filter = Filter.by_property("user_id").equal(user_id)
+
+    facts = fact_collection.query.fetch_objects(
+        filters=user_filter,
+        sort=Sort.by_property("created_at", ascending=True),
+        return_properties=["fact"],
+        limit=1000
+    ).objects
+    # ✅ The newest summaries stay as they are; everything older is folded into facts
+    old_conversations = conversation_collection.query.fetch_objects(
+        filters=user_filter,
+        sort=Sort.by_property("created_at", ascending=False),
+        offset=CONSOLIDATION_KEEP_CONVERSATIONS,
+        return_properties=["summary"],
+        limit=1000
+    ).objects
+
+    if len(facts) <= CONSOLIDATION_FACT_THRESHOLD and not old_conversations:
+        return True
+
+    merged = summarize_user_memories(
+        [obj.properties["fact"] for obj in facts],
+        [obj.properties["summary"] for obj in reversed(old_conversations)]
+    )
+    if merged is None:
+        print(f"⚠️ No usable consolidation for {user_id}; leaving their memories untouched.")
+        return False
+
+    return replace_user_facts(
+        user_id,
+        merged,
+        [obj.uuid for obj in facts],
+        [obj.uuid for obj in old_conversations]
+    )
+
+def run_memory_consolidation():
+    """
+    Runs (or resumes) a consolidation pass over every oversized user,
+    CONSOLIDATION_BATCH_SIZE users at a time, saving progress after each batch.
+    """
+    client = get_weaviate_client()
+    if not client:
+        return False
+
+    try:
+        checkpoint = load_checkpoint()
+        if checkpoint and checkpoint.get("pending"):
+            print(f"⏯️ Resuming memory consolidation: {len(checkpoint['pending'])} users left.")
+        else:
+            checkpoint = {"pending": find_oversized_users(client), "done": [], "failed": []}
+            print(f"🗜️ Memory consolidation: {len(checkpoint['pending'])} users over the limits.")
+
+        while checkpoint["pending"]:
+            batch = checkpoint["pending"][:CONSOLIDATION_BATCH_SIZE]
+            for user_id in batch:
+                succeeded = consolidate_user(client, user_id)
+                checkpoint["done" if succeeded else "failed"].append(user_id)
+            checkpoint["pending"] = checkpoint["pending"][len(batch):]
+            save_checkpoint(checkpoint)
+
+    except Exception as e:
+        print(f"❌ ERROR during memory consolidation: {e}")
+        report_weaviate_error(e)
+        return False
+
+    if os.path.exists(CONSOLIDATION_CHECKPOINT_FILE):
+        os.remove(CONSOLIDATION_CHECKPOINT_FILE)  # ✅ Pass finished; the next run starts fresh
+    print(f"✅ Memory consolidation complete: {len(checkpoint['done'])} users consolidated, {len(checkpoint['failed'])} failed.")
+    return not checkpoint["failed"]
@@ -0,0 +1,187 @@
+import time
+import atexit
+import threading
+from data.constants import WRITE_BEHIND_WINDOW, WRITE_BEHIND_MAX_RETRIES
+from core.context_cache import context_cache
+from core.ash_memories import ash_hot_set, match_existing_ash_memories
+from core.weaviate_manager import (
+    get_weaviate_client,
+    report_weaviate_error,
+    object_uuid,
+    merge_properties,
+    plan_upserts,
+    rebuild_user_context,
+)
+
+class MemoryWriter:
+    """
+    Write-behind queue for memory updates.
+    process_memory_updates hands objects to enqueue() and returns right away.
+    A background thread waits `window` seconds after the first update, so a
+    burst coalesces per natural key: profile fields and memory lists merge
+    into one UserMemory write, and reinforcements of the same Ash memory add
+    up. It then flushes everything through Weaviate's dynamic batch API.
+    """
+
+    def __init__(self, window, max_retries):
+        self.window = window
+        self.max_retries = max_retries
+        self._pending = {}  # ✅ (class_name, uuid) -> merged object
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._stats = {"enqueued": 0, "coalesced": 0, "flushes": 0, "written": 0, "retried": 0, "failed": 0}
+
+    def start(self):
+        """Starts the background flush thread if it isn't running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, class_name, obj):
+        """Queues one object for writing, merging it with any pending write of the same key."""
+        key = (class_name, str(object_uuid(class_name, obj)))
+        with self._lock:
+            if key in self._pending:
+                self._stats["coalesced"] += 1
+            self._pending[key] = merge_properties(class_name, self._pending.get(key), obj)
+            self._stats["enqueued"] += 1
+        self.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait()
+            self._stopping.wait(self.window)  # ✅ Coalescing window (cut short on shutdown)
+            self._wakeup.clear()
+            self.flush()
+        self.flush()
+
+    def _requeue(self, pending):
+        """Puts unwritten objects back, merging with anything queued since."""
+        with self._lock:
+            for (class_name, obj_uuid), obj in pending.items():
+                newer = self._pending.get((class_name, obj_uuid))
+                self._pending[(class_name, obj_uuid)] = merge_properties(class_name, obj, newer) if newer else obj
+        self._wakeup.set()
+
+    def flush(self):
+        """Writes everything pending. Returns False if anything had to be requeued."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return True
+
+            client = get_weaviate_client()
+            if not client:
+                print(f"⚠️ Memory writer can't reach Weaviate. Keeping {len(pending)} updates queued.")
+                self._requeue(pending)
+                return False
+
+            try:
+                writes = []
+                sources = {}  # ✅ (class_name, uuid) -> object each write came from, to requeue it if the write fails
+                for class_name in {class_name for class_name, _ in pending}:
+                    objects = [obj for (name, _), obj in pending.items() if name == class_name]
+                    if class_name == "AshMemories":
+                        objects = match_existing_ash_memories(objects, client)  # ✅ Paraphrases reinforce existing memories
+                    for obj in objects:
+                        key = (class_name, str(object_uuid(class_name, obj)))
+                        sources[key] = merge_properties(class_name, sources[key], obj) if key in sources else obj
+                    ids = list({obj_uuid for name, obj_uuid in sources if name == class_name})
+                    existing = client.collections.get(class_name).query.fetch_objects_by_ids(ids, limit=len(ids))
+                    existing_by_uuid = {str(obj.uuid): obj.properties for obj in existing.objects}
+
+                    for obj_uuid, (_, properties) in plan_upserts(class_name, objects, existing_by_uuid).items():
+                        writes.append((class_name, obj_uuid, properties))
+
+            except Exception as e:
+                print(f"❌ ERROR preparing memory writes: {e}")
+                report_weaviate_error(e)
+                self._requeue(pending)
+                return False
+
+            failed_keys = self._write_batch(client, writes)
+            self._stats["flushes"] += 1
+            if failed_keys:
+                self._requeue({key: sources[key] for key in failed_keys})  # ✅ Kept for the next flush, and for shutdown
+
+            written = [write for write in writes if (write[0], write[1]) not in failed_keys]
+            ash_hot_set.apply_writes([(obj_uuid, properties) for class_name, obj_uuid, properties in written if class_name == "AshMemories"])
+
+            # ✅ Refresh caches and context documents for everyone whose writes all landed
+            failed_users = {sources[key].get("user_id") for key in failed_keys}
+            for user_id in {obj["user_id"] for obj in pending.values() if obj.get("user_id")} - failed_users:
+                context_cache.invalidate_user(user_id)
+                rebuild_user_context(user_id)
+
+            print(f"💾 Memory writer flushed {len(pending)} queued updates as {len(written)}/{len(writes)} writes.")
+            return not failed_keys
+
+    def _write_batch(self, client, writes):
+        """
+        Sends writes through the dynamic batch API, retrying failed objects
+        with backoff. Returns the (class_name, uuid) keys that still failed.
+        """
+        attempt = 0
+        while writes:
+            try:
+                with client.batch.dynamic() as batch:
+                    for class_name, obj_uuid, properties in writes:
+                        batch.add_object(collection=class_name, properties=properties, uuid=obj_uuid)
+                failed_ids = {str(failed.object_.uuid) for failed in client.batch.failed_objects}
+            except Exception as e:
+                print(f"❌ ERROR in memory batch write: {e}")
+                report_weaviate_error(e)
+                failed_ids = {obj_uuid for _, obj_uuid, _ in writes}
+
+            self._stats["written"] += len(writes) - len(failed_ids)
+            writes = [write for write in writes if write[1] in failed_ids]
+            if not writes:
+                return set()
+
+            attempt += 1
+            if attempt > self.max_retries:
+                print(f"❌ {len(writes)} memory writes still failing after {self.max_retries} retries. Requeueing them.")
+                self._stats["failed"] += len(writes)
+                return {(class_name, obj_uuid) for class_name, obj_uuid, _ in writes}
+
+            print(f"⚠️ {len(writes)} memory writes failed. Retrying ({attempt}/{self.max_retries})...")
+            self._stats["retried"] += len(writes)
+            time.sleep(min(2 ** attempt, 8))
+            client = get_weaviate_client() or client
+        return set()
+
+    def stop(self, timeout=15):
+        """Flushes everything still queued and stops the background thread."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        else:
+            self.flush()
+        with self._lock:
+            if self._pending:
+                print(f"❌ Memory writer stopped with {len(self._pending)} updates it couldn't write.")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        return stats
+
+memory_writer = MemoryWriter(WRITE_BEHIND_WINDOW, WRITE_BEHIND_MAX_RETRIES)
+atexit.register(memory_writer.stop)  # ✅ Registered after the Weaviate client's hook, so it runs first
+
+def show_writer_stats():
+    """Prints write-behind queue counters."""
+    stats = memory_writer.stats()
+    print("\n=== 💾 Memory Writer Stats ===")
+    print(f"Pending: {stats['pending']} | Enqueued: {stats['enqueued']} (coalesced: {stats['coalesced']})")
+    print(f"Flushes: {stats['flushes']} | Objects written: {stats['written']}")
+    print(f"Retried: {stats['retried']} | Failed after retries (requeued): {stats['failed']}")
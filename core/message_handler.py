@@ -2,93 +2,176 @@ import os
 import json
 import time
 import openai
-import random
+import asyncio
 import datetime
-from data.constants import DEBUG_FILE, ASSISTANT_ID, OPENAI_API_KEY
-from core.weaviate_manager import (
-    fetch_user_profile, 
-    fetch_long_term_memories, 
-    fetch_recent_conversations, 
-    perform_vector_search,
-    insert_data
+from data.constants import (
+    DEBUG_FILE, OPENAI_API_KEY, STREAM_REPLIES, STREAM_EDIT_INTERVAL, RATE_LIMIT_RESPONSE_TOKENS,
+    RETRIEVAL_TOP_K, RETRIEVAL_SNIPPET_CHARS
 )
+from core.reply_stream import ReplyFieldParser, ProgressiveReply
+from core.memory_writer import memory_writer
+from core.channel_buffer import channel_buffer
+from core.records import UserProfile
+from core.ash_memories import fetch_relevant_ash_memories_async
+from core.prompt_assembler import PromptSection, assemble_prompt
+from core.llm_backends import ASH_RESPONSE_FORMAT, get_llm_backend
+from core.rate_limiter import openai_rate_limiter
+from core.weaviate_async import (
+    fetch_user_context_async,
+    fetch_relevant_facts_async
+)
+from core.retrieval import search_memories_async
+from core.embedding_cache import get_query_embedding_async
+from core.response_cache import response_cache, guild_scope, context_fingerprint, is_cacheable
+from core.weaviate_manager import build_user_facts, build_recent_conversation
 
 client = openai.OpenAI(api_key=OPENAI_API_KEY)
 
-MAX_RETRIES = 5  # ✅ Maximum retries before failing
-BASE_WAIT = 1  # ✅ Base wait time in seconds for exponential backoff
+CONTEXT_SOURCE_TIMEOUT = 8  # ✅ Seconds before a slow context source is given up on
+
+async def fetch_recent_messages(channel, user_id, limit=5):
+    """Collects the last few channel messages, skipping other bots (from the in-memory channel buffer)."""
+    return await channel_buffer.recent(channel, user_id, limit)
+
+async def run_context_source(name, coro, default):
+    """
+    Awaits one context source with a timeout and records how long it took.
+    Errors and timeouts are captured instead of raised, so one failing
+    source never cancels the others.
+    """
+    start = time.perf_counter()
+    result, error = default, None
+    try:
+        result = await asyncio.wait_for(coro, timeout=CONTEXT_SOURCE_TIMEOUT)
+    except asyncio.TimeoutError:
+        error = f"timed out after {CONTEXT_SOURCE_TIMEOUT}s"
+    except Exception as e:
+        error = str(e)
 
-async def gather_data_for_chatgpt(user_id, message, channel):
-    """Collects and formats data for ChatGPT based on user input."""
+    return {
+        "name": name,
+        "result": result if result is not None else default,
+        "error": error,
+        "elapsed_ms": (time.perf_counter() - start) * 1000
+    }
+
+async def gather_context_sources(user_id, message, channel, last_messages=None):
+    """
+    Fetches every independent context source concurrently.
+    Returns per-source results keyed by name, each with its own error and timing.
+    `last_messages` skips the channel read (jobs carry them from the bot process).
+    """
+    if last_messages is None:
+        recent_messages = fetch_recent_messages(channel, user_id)
+    else:
+        recent_messages = asyncio.sleep(0, result=last_messages)  # ✅ Already known; keeps the timing table uniform
+
+    sources = await asyncio.gather(
+        run_context_source("user_context", fetch_user_context_async(user_id), None),
+        run_context_source("long_term_memories", fetch_relevant_facts_async(user_id, message), []),
+        run_context_source("last_messages", recent_messages, []),
+        run_context_source("related_memories", search_memories_async(user_id, message, RETRIEVAL_TOP_K * 2), []),  # ✅ Room for hits dropped as duplicates
+        run_context_source("ash_memories", fetch_relevant_ash_memories_async(message), []),
+    )
+    return {source["name"]: source for source in sources}
+
+def log_context_timings(sources):
+    """Prints each source's latency and flags the slowest one (the critical path)."""
+    slowest = max(sources.values(), key=lambda source: source["elapsed_ms"])
+    for source in sorted(sources.values(), key=lambda source: -source["elapsed_ms"]):
+        marker = "🐢" if source is slowest else "⏱️"
+        status = f"❌ {source['error']}" if source["error"] else "✅"
+        print(f"{marker} {source['name']}: {source['elapsed_ms']:.0f} ms {status}")
+
+async def check_response_cache(user_id, message, channel):
+    """
+    Looks the message up in the response cache. Returns (hit, cache_key); the
+    key is what a fresh reply gets stored under. Both lookups here are cached,
+    so the full context fetch that follows a miss reuses them.
+    """
+    vector = await get_query_embedding_async(message)
+    if vector is None:
+        return None, None
+    profile = await fetch_user_context_async(user_id)
+    cache_key = (guild_scope(channel), vector, context_fingerprint(user_id, profile))
+    return response_cache.lookup(*cache_key), cache_key
+
+async def gather_data_for_chatgpt(user_id, message, channel, last_messages=None, stream=STREAM_REPLIES):
+    """
+    Collects and formats data for ChatGPT based on user input, then sends Ash's
+    reply to `channel`. Queue workers pass the channel's recent messages and
+    a stand-in channel that collects the reply (with streaming off).
+    Returns True once the request is handled, False if it failed.
+    """
 
     user_id = str(user_id)  # ✅ Ensure user_id is a string
     timestamp = datetime.datetime.now(datetime.UTC).isoformat()
     print(f"🔄 Gathering data for ChatGPT request from {user_id}...")
 
     try:
-        # ✅ Fetch User Profile
-        user_profile = fetch_user_profile(user_id) or {}
-        print(f"✅ User profile retrieved: {user_profile}")
-
-        # ✅ Fetch Long-Term Memories
-        long_term_memories = fetch_long_term_memories(user_id)
-        print(f"✅ Long-term memories retrieved: {long_term_memories}")
-
-        # ✅ Fetch Recent Conversations
-        recent_conversations = fetch_recent_conversations(user_id)
-        print(f"✅ Recent conversations retrieved: {recent_conversations}")
-
-        # ✅ Fetch Last 5 Messages (excluding bots)
-        last_messages = []
-        async for msg in channel.history(limit=10):
-            if msg.author.bot and msg.author.id != int(user_id):  # Ignore bots EXCEPT AshBot
-                continue
-            last_messages.append({
-                "user_id": str(msg.author.id),
-                "message": msg.content,
-                "timestamp": msg.created_at.isoformat()
-            })
-            if len(last_messages) == 5:
-                break  
-        print(f"✅ Last messages collected: {last_messages}")
-
-        # ✅ Perform Vector-Based Search for Related Conversations
-        related_memories = perform_vector_search(message)
-        print(f"✅ Vector search results: {related_memories}")
-
-        # ✅ Structure the Message Object
-        structured_message = {
-            "user": {
+        # ✅ Repeated questions: reuse a cached reply outright, or keep it as a draft for Ash
+        cache_hit, cache_key = None, None
+        if response_cache.enabled:
+            cache_hit, cache_key = await check_response_cache(user_id, message, channel)
+            if cache_hit and cache_hit.reusable:
+                print(f"💬 Reusing cached reply (similarity {cache_hit.similarity:.3f}); skipping context fetch and LLM run.")
+                await send_reply_to_channel(cache_hit.reply, channel, user_id, message)
+                return True
+
+        # ✅ Fetch profile, memories, conversations, channel history and vector hits concurrently
+        sources = await gather_context_sources(user_id, message, channel, last_messages)
+        log_context_timings(sources)
+
+        # ✅ Profile and recent conversations come from one keyed get; facts are the top-k for this message
+        user_profile = sources["user_context"]["result"] or UserProfile(user_id)
+        long_term_memories = sources["long_term_memories"]["result"]
+        recent_conversations = user_profile.recent_conversations
+        last_messages = sources["last_messages"]["result"]
+        ash_memories = [memory.memory for memory in sources["ash_memories"]["result"]]  # ✅ Ash's own most relevant, most reinforced memories
+
+        # ✅ Fused hybrid hits, minus anything another section already carries (compared on full text)
+        already_included = set(long_term_memories) | set(recent_conversations) | set(ash_memories)
+        related_memories = [
+            snippet.to_dict(RETRIEVAL_SNIPPET_CHARS) for snippet in sources["related_memories"]["result"]
+            if snippet.text not in already_included
+        ][:RETRIEVAL_TOP_K]
+
+        # ✅ Structure the Message Object, filling context sections in priority order until the token budget runs out
+        structured_message, _ = assemble_prompt(
+            user={
                 "id": user_id,
-                "name": user_profile.get("name"),
-                "pronouns": user_profile.get("pronouns"),
-                "relationship_notes": user_profile.get("relationship_notes"),
+                "name": user_profile.name,
+                "pronouns": user_profile.pronouns,
+                "relationship_notes": user_profile.relationship_notes,
             },
-            "message": {
+            message={
                 "content": message,
                 "timestamp": timestamp
             },
-            "conversation_history": last_messages,
-            "memory": {
-                "long_term": long_term_memories,
-                "recent_interactions": recent_conversations,
-                "related": related_memories
-            },
-            "expected_response_format": {
-                "reply": "string",
-                "conversation_summary": "string",
-                "pronouns": "string",
-                "preferred_name": "string",
-                "relationship_notes": "string",
-                "ash_memories": ["memory1", "memory2"],
-                "long_term_memories": ["memory1", "memory2"]
-            }
-        }
+            sections=[
+                PromptSection("memory.recent_interactions", reversed(recent_conversations), chronological=True),
+                PromptSection("memory.long_term", long_term_memories),
+                PromptSection("conversation_history", last_messages),
+                PromptSection("memory.ash_self", ash_memories),
+                PromptSection("memory.related", related_memories),
+            ],
+            response_format=ASH_RESPONSE_FORMAT
+        )
+
+        if cache_hit:
+            print(f"💬 Offering a cached draft reply (similarity {cache_hit.similarity:.3f}).")
+            response_format = structured_message.pop("expected_response_format")
+            structured_message["draft_reply"] = cache_hit.reply
+            structured_message["expected_response_format"] = response_format  # ✅ Keep the format last
 
         print("✅ Message structured successfully!")
         
-        # ✅ Send the message to Ash
-        response = await send_to_ash(structured_message)
+        # ✅ Send the message to Ash (streaming posts the reply while it generates)
+        reply_sent = False
+        if stream:
+            response, reply_sent = await stream_to_ash(structured_message, channel, user_id, message)
+        if not reply_sent:
+            response = await send_to_ash(structured_message)
         print("✅ Response received from Ash!")
 
         # ✅ Write Ash's response to debug file
@@ -96,99 +179,20 @@ async def gather_data_for_chatgpt(user_id, message, channel):
         print("✅ Response successfully written to debug file!")
 
         # ✅ Process the response
-        await process_response(response, channel, user_id, message)
+        await process_response(response, channel, user_id, message, reply_sent=reply_sent)
+
+        if cache_key and is_cacheable(response):
+            response_cache.store(*cache_key, message, reply_body(response["reply"]), user_id=user_id)
+        return True
 
     except Exception as e:
         print(f"❌ ERROR in gather_data_for_chatgpt: {e}")
+        return False
 
-async def send_to_ash(structured_message):
-    """
-    Sends structured message to OpenAI's Assistants API and retrieves Ash's response.
-    Implements exponential backoff retries for handling 429 errors.
-    """
-    print("🚀 Sending message to Ash (OpenAI Assistants API)...")
-
-    def serialize_datetime(obj):
-        """Ensures datetime objects are ISO formatted before sending."""
-        if isinstance(obj, datetime.datetime):
-            return obj.isoformat()
-        return obj
-
-    structured_message_json = json.dumps(structured_message, default=serialize_datetime)
-
-    retries = 0  # ✅ Retry counter
-
-    while retries < MAX_RETRIES:
-        try:
-            # ✅ Step 1: Create a thread with the user's message
-            thread = openai.beta.threads.create(
-                messages=[{"role": "user", "content": structured_message_json}]
-            )
-
-            # ✅ Step 2: Run the assistant within the thread
-            run = openai.beta.threads.runs.create(
-                thread_id=thread.id,
-                assistant_id=ASSISTANT_ID
-            )
-
-            # ✅ Step 3: Wait for completion & retrieve response
-            while run.status not in ["completed", "failed"]:
-                time.sleep(1)  # ✅ Prevent excessive polling
-                run = openai.beta.threads.runs.retrieve(thread_id=thread.id, run_id=run.id)
-
-            # ✅ Step 4: Fetch the assistant’s latest response messages
-            messages = openai.beta.threads.messages.list(thread_id=thread.id)
-
-            if messages.data:
-                response_content = messages.data[0].content[0].text.value  # ✅ Extract text response
-            else:
-                response_content = None
-
-            # ✅ Step 5: Ensure the response is valid JSON
-            try:
-                parsed_response = json.loads(response_content) if response_content else {
-                    "reply": "Oops! I seem to have tangled my words in the ether... Try again, mortal!",
-                    "conversation_summary": "",
-                    "pronouns": None,
-                    "preferred_name": None,
-                    "relationship_notes": None,
-                    "ash_memories": [],
-                    "long_term_memories": []
-                }
-            except json.JSONDecodeError:
-                print("❌ ERROR: Ash did not return valid JSON!")
-                parsed_response = {
-                    "reply": "Oops! I seem to have tangled my words in the ether... Try again, mortal!",
-                    "conversation_summary": "",
-                    "pronouns": None,
-                    "preferred_name": None,
-                    "relationship_notes": None,
-                    "ash_memories": [],
-                    "long_term_memories": []
-                }
-
-            return parsed_response  # ✅ Successfully got a response, exit retry loop
-
-        except openai.APIError as e:
-            if e.http_status == 429:  # ✅ Handle OpenAI rate limit errors
-                wait_time = BASE_WAIT * (2 ** retries) + random.uniform(0, 0.5)  # Exponential backoff with jitter
-                print(f"⚠️ OpenAI Rate Limit Hit (429). Retrying in {wait_time:.2f}s... (Attempt {retries+1}/{MAX_RETRIES})")
-                time.sleep(wait_time)
-                retries += 1
-                continue  # ✅ Retry request
-
-            else:
-                print(f"❌ OpenAI API Error: {e}")
-                break  # ✅ Stop retrying on non-429 errors
-
-        except Exception as e:
-            print(f"❌ ERROR sending to Ash: {e}")
-            break  # ✅ Stop retrying on unexpected errors
-
-    # ✅ If all retries failed, return a fallback response
-    print("❌ Max retries reached. Unable to get a response from OpenAI.")
+def fallback_response(reply):
+    """A response with only a reply and no memory updates."""
     return {
-        "reply": "I'm experiencing some magical interference... Try again later!",
+        "reply": reply,
         "conversation_summary": "",
         "pronouns": None,
         "preferred_name": None,
@@ -197,6 +201,94 @@ async def send_to_ash(structured_message):
         "long_term_memories": []
     }
 
+async def stream_to_ash(structured_message, channel, user_id, user_message):
+    """
+    Streams Ash's JSON response from the LLM backend and edits the reply
+    into a Discord message as it generates. The memory fields are returned
+    once the stream closes.
+    Returns (response, reply_sent); if nothing could be posted, reply_sent is
+    False and the caller should fall back to send_to_ash.
+    """
+    backend = get_llm_backend()
+    print(f"🌊 Streaming message to Ash ({backend.label})...")
+
+    content = backend.user_content(structured_message)
+    parser = ReplyFieldParser("reply")
+    progressive_reply = ProgressiveReply(channel, min_interval=STREAM_EDIT_INTERVAL)
+    response_text = ""
+    run_tokens = None
+    started_at = time.perf_counter()
+
+    try:
+        tokens = backend.prompt_tokens(content) + RATE_LIMIT_RESPONSE_TOKENS
+        await openai_rate_limiter.acquire(tokens)  # ✅ Streams skip the header sync, but still wait their turn
+        run_tokens = tokens
+        started_at = time.perf_counter()
+
+        async for text in backend.stream_text(content):
+            if not response_text:
+                print(f"⚡ First token after {time.perf_counter() - started_at:.2f}s")
+            response_text += text
+
+            if not parser.done:
+                reply_so_far = parser.feed(text)
+                if reply_so_far:
+                    await progressive_reply.update(format_reply(reply_so_far, user_id, user_message))
+                if parser.done:
+                    # ✅ The reply is complete; the memory fields can keep generating offscreen
+                    await progressive_reply.finish(format_reply(parser.value, user_id, user_message))
+
+    except Exception as e:
+        print(f"❌ ERROR streaming from Ash: {e}")
+        if not progressive_reply.started:
+            return None, False
+    finally:
+        if run_tokens is not None:
+            openai_rate_limiter.release(run_tokens)
+
+    if not parser.done and parser.value:
+        await progressive_reply.finish(format_reply(parser.value, user_id, user_message))
+
+    try:
+        response = json.loads(response_text)
+    except json.JSONDecodeError:
+        print("❌ ERROR: Ash did not return valid JSON!")
+        if not progressive_reply.started:
+            return None, False
+        response = fallback_response(parser.value)
+
+    print(f"✅ Stream closed after {time.perf_counter() - started_at:.2f}s")
+    return response, progressive_reply.started
+
+async def send_to_ash(structured_message):
+    """
+    Sends structured message to the configured LLM backend and retrieves Ash's response.
+    Every call goes through the shared rate limiter, which paces requests from
+    the x-ratelimit-* headers and retries 429s without blocking the event loop.
+    """
+    backend = get_llm_backend()
+    print(f"🚀 Sending message to Ash ({backend.label})...")
+
+    try:
+        content = backend.user_content(structured_message)
+        tokens = backend.prompt_tokens(content) + RATE_LIMIT_RESPONSE_TOKENS  # ✅ Reserved against the tokens-per-minute bucket
+        response_content = await backend.complete(content, tokens)
+
+        # ✅ Ensure the response is valid JSON
+        try:
+            return json.loads(response_content) if response_content else fallback_response("Oops! I seem to have tangled my words in the ether... Try again, mortal!")
+        except json.JSONDecodeError:
+            print("❌ ERROR: Ash did not return valid JSON!")
+            return fallback_response("Oops! I seem to have tangled my words in the ether... Try again, mortal!")
+
+    except openai.APIError as e:
+        print(f"❌ OpenAI API Error: {e}")
+    except Exception as e:
+        print(f"❌ ERROR sending to Ash: {e}")
+
+    # ✅ If the call failed (or stayed rate limited through every retry), return a fallback response
+    return fallback_response("I'm experiencing some magical interference... Try again later!")
+
 def write_debug_data(response_data):
     """
     Writes Ash's response to debug.txt.
@@ -215,38 +307,53 @@ def write_debug_data(response_data):
     except Exception as e:
         print(f"❌ ERROR writing to debug file: {e}")
 
-async def process_response(response, channel, user_id, user_message):
+async def process_response(response, channel, user_id, user_message, reply_sent=False):
     """Processes Ash's response step by step, sending messages and updating memory."""
     print("📌 Processing response...")
 
-    # ✅ Send Ash's reply to the Discord channel
-    if "reply" in response:
+    # ✅ Send Ash's reply to the Discord channel (unless it was already streamed there)
+    if "reply" in response and not reply_sent:
         await send_reply_to_channel(response["reply"], channel, user_id, user_message)
 
     # ✅ Store memory updates in batch (if any exist)
     if any(key in response for key in ["conversation_summary", "pronouns", "preferred_name", "relationship_notes", "long_term_memories", "ash_memories"]):
         await process_memory_updates(response, user_id)
 
+def format_reply(reply, user_id, user_message):
+    """Wraps Ash's reply with the quoted user message, unless Ash already did."""
+
+    # ✅ Strip leading/trailing whitespace
+    cleaned_reply = reply.strip()
+
+    # ✅ Check if Ash has already formatted the message (or is in the middle of doing so)
+    if cleaned_reply.startswith(f"**<@{user_id}>:**") or (f"**<@{user_id}>:**" in cleaned_reply and "**Ash:**" in cleaned_reply):
+        return cleaned_reply  # Use as-is
+
+    # ✅ Quote every line (coalesced requests carry one line per message)
+    quoted_message = "\n".join(f"> {line}" for line in str(user_message).splitlines() or [""])
+
+    # ✅ Ensure the message is formatted correctly
+    return (
+        f"**<@{user_id}>:**\n"
+        f"{quoted_message}\n\n"
+        f"**Ash:**\n"
+        f"{cleaned_reply}"
+    )
+
+def reply_body(reply):
+    """Ash's answer without the quoted-message header (added by format_reply, or written by Ash)."""
+    cleaned_reply = reply.strip()
+    if cleaned_reply.startswith("**<@") and "**Ash:**" in cleaned_reply:
+        return cleaned_reply.split("**Ash:**", 1)[1].strip()
+    return cleaned_reply
+
 async def send_reply_to_channel(reply, channel, user_id, user_message):
     """Sends Ash's formatted reply to the Discord channel, ensuring no message duplication."""
 
     # ✅ Debug: Log raw reply from Ash
     print(f"DEBUG - Raw Reply from Ash: {reply}")
 
-    # ✅ Strip leading/trailing whitespace
-    cleaned_reply = reply.strip()
-
-    # ✅ Check if Ash has already formatted the message
-    if f"**<@{user_id}>:**" in cleaned_reply and "**Ash:**" in cleaned_reply:
-        formatted_message = cleaned_reply  # Use as-is
-    else:
-        # ✅ Ensure the message is formatted correctly
-        formatted_message = (
-            f"**<@{user_id}>:**\n"
-            f"> {user_message}\n\n"
-            f"**Ash:**\n"
-            f"{cleaned_reply}"
-        )
+    formatted_message = format_reply(reply, user_id, user_message)
 
     try:
         await channel.send(formatted_message)
@@ -256,8 +363,8 @@ async def send_reply_to_channel(reply, channel, user_id, user_message):
 
 async def process_memory_updates(response, user_id):
     """
-    Processes and stores memory updates in Weaviate.
-    Uses batch insert to optimize database interactions.
+    Queues memory updates for the write-behind writer, which coalesces them
+    and stores them in Weaviate in the background (refreshing UserContext).
     """
 
     print("📌 Processing memory updates...")
@@ -266,31 +373,32 @@ async def process_memory_updates(response, user_id):
     data_to_insert = {
         "RecentConversations": [],
         "UserMemory": [],
+        "UserFact": [],
         "AshMemories": []
     }
 
     # ✅ Store conversation summary
     if response.get("conversation_summary"):
-        data_to_insert["RecentConversations"].append({
-            "user_id": user_id,
-            "summary": response["conversation_summary"]
-        })
+        data_to_insert["RecentConversations"].append(
+            build_recent_conversation(user_id, response["conversation_summary"])
+        )
 
     # ✅ Store user profile updates (Name, Pronouns, Relationship Notes)
-    user_profile_update = {"user_id": user_id, "memory": []}  # ✅ Base structure
-
-    for key in ["pronouns", "preferred_name", "relationship_notes"]:
-        if response.get(key):
-            user_profile_update[key] = response[key]
-
-    # ✅ Store long-term memories (if any)
-    if response.get("long_term_memories"):
-        user_profile_update["memory"].extend(response["long_term_memories"])  
-        user_profile_update["memory"] = json.dumps(user_profile_update["memory"])  # ✅ Convert list to string for storage
+    user_profile_update = {
+        "user_id": user_id,
+        "name": response.get("preferred_name"),  # ✅ Ash calls it preferred_name; the schema calls it name
+        "pronouns": response.get("pronouns"),
+        "relationship_notes": response.get("relationship_notes")
+    }
 
     # ✅ Only add user update if new data exists
-    if any(key in user_profile_update for key in ["pronouns", "preferred_name", "relationship_notes", "memory"]):
+    if any(user_profile_update[key] for key in ["name", "pronouns", "relationship_notes"]):
         data_to_insert["UserMemory"].append(user_profile_update)
+        response_cache.invalidate_user(user_id)  # ✅ Cached replies were written for how Ash saw them before
+
+    # ✅ Store long-term memories as individual facts (appends never rewrite the profile)
+    if response.get("long_term_memories"):
+        data_to_insert["UserFact"].extend(build_user_facts(user_id, response["long_term_memories"]))
 
     # ✅ Store Ash’s self-memories
     if response.get("ash_memories"):
@@ -300,9 +408,9 @@ async def process_memory_updates(response, user_id):
                 "reinforced_count": 1  # ✅ New memories start with reinforcement count 1
             })
 
-    # ✅ Perform batch insert for all categories
+    # ✅ Hand everything to the write-behind queue (merged by natural key, flushed in batches)
     for class_name, objects in data_to_insert.items():
-        if objects:
-            insert_data(class_name, objects)  # ✅ Use batch insert
+        for obj in objects:
+            memory_writer.enqueue(class_name, obj)
 
-    print("✅ Memory updates processed successfully!")
\ No newline at end of file
+    print("✅ Memory updates queued!")
\ No newline at end of file
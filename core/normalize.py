@@ -0,0 +1,7 @@
+# ✅ One normalization for every "is this the same text?" check: natural
+# keys, embedding and response cache keys, and duplicate /ash messages.
+# Kept free of heavy imports so any module can use it without a cycle.
+
+def normalize_text(text):
+    """Lowercases and collapses whitespace so trivially different strings compare equal."""
+    return " ".join(str(text or "").lower().split())
@@ -0,0 +1,138 @@
+import json
+import math
+import asyncio
+import tiktoken
+from data.constants import PROMPT_TOKEN_BUDGET, PROMPT_MAX_ITEM_TOKENS, PROMPT_TOKENIZER_ENCODING
+
+# ✅ Builds Ash's structured_message under a token budget. The user, the
+# message and the response format are always sent; context sections are
+# then filled in priority order, each section's items in relevance order,
+# until the budget runs out. Anything cut is logged.
+
+MIN_TRUNCATED_ITEM_TOKENS = 16  # ✅ Below this a truncated item is just noise, so it's dropped instead
+
+CHARS_PER_TOKEN = 4  # ✅ Rough estimate used when the tokenizer can't be loaded
+
+_encoding = None
+_encoding_failed = False
+
+def get_encoding():
+    """
+    The tokenizer, loaded once. tiktoken downloads it on first use; if that
+    fails (e.g. offline) the failure is cached and None is returned, so
+    callers estimate instead of retrying the download on every prompt.
+    To run offline, pre-fetch the encoding into TIKTOKEN_CACHE_DIR.
+    """
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding(PROMPT_TOKENIZER_ENCODING)
+        except Exception as e:
+            _encoding_failed = True
+            print(f"⚠️ Couldn't load the {PROMPT_TOKENIZER_ENCODING} tokenizer ({e}). Estimating ~{CHARS_PER_TOKEN} chars per token.")
+    return _encoding
+
+async def load_encoding():
+    """Loads the tokenizer in a thread at startup, so a download never blocks the event loop."""
+    await asyncio.to_thread(get_encoding)
+
+def count_tokens(value):
+    """Tokens in a string, or in a value's JSON encoding."""
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    encoding = get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+def truncate_text(text, max_tokens):
+    """Cuts text to at most `max_tokens` tokens, marking the cut with an ellipsis."""
+    encoding = get_encoding()
+    if encoding is None:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        return text if len(text) <= max_chars else text[:max(max_chars - 1, 0)] + "…"
+
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max(max_tokens - 1, 0)]) + "…"
+
+def truncate_item(item, max_tokens):
+    """Shrinks an item's longest string to fit `max_tokens`. Returns None if it can't fit."""
+    if isinstance(item, str):
+        return truncate_text(item, max_tokens)
+    if not isinstance(item, dict):
+        return None
+
+    text_fields = [key for key, value in item.items() if isinstance(value, str)]
+    if not text_fields:
+        return None
+    longest = max(text_fields, key=lambda key: len(item[key]))
+    overhead = count_tokens(dict(item, **{longest: ""}))
+    if overhead >= max_tokens:
+        return None
+    return dict(item, **{longest: truncate_text(item[longest], max_tokens - overhead)})
+
+class PromptSection:
+    """One context section. Items are ranked most relevant first."""
+    __slots__ = ("name", "items", "chronological")
+
+    def __init__(self, name, items, chronological=False):
+        self.name = name
+        self.items = list(items or [])
+        self.chronological = chronological  # ✅ Items ranked newest first, but sent oldest first
+
+def assemble_prompt(user, message, sections, response_format, budget=PROMPT_TOKEN_BUDGET):
+    """
+    Returns (structured_message, report). `sections` is a list of
+    PromptSection in priority order; their names are the structured_message
+    keys ("conversation_history") or memory keys ("memory.long_term").
+    """
+    structured_message = {"user": user, "message": message, "expected_response_format": response_format}
+    used = count_tokens(structured_message)
+    report = {"budget": budget, "fixed_tokens": used, "untrimmed_tokens": used, "sections": {}}
+
+    for section in sections:
+        kept, truncated = [], 0
+        for item in section.items:
+            item_tokens = count_tokens(item) + 1  # ✅ +1 for the separating comma
+            report["untrimmed_tokens"] += item_tokens
+
+            if item_tokens > PROMPT_MAX_ITEM_TOKENS or used + item_tokens > budget:
+                room = min(PROMPT_MAX_ITEM_TOKENS, budget - used) - 1
+                item = truncate_item(item, room) if room >= MIN_TRUNCATED_ITEM_TOKENS else None
+                if item is None:
+                    continue
+                item_tokens = count_tokens(item) + 1
+                truncated += 1
+
+            kept.append(item)
+            used += item_tokens
+
+        if section.chronological:
+            kept.reverse()
+        _place(structured_message, section.name, kept)
+        report["sections"][section.name] = {
+            "kept": len(kept),
+            "dropped": len(section.items) - len(kept),
+            "truncated": truncated,
+        }
+
+    structured_message["expected_response_format"] = structured_message.pop("expected_response_format")  # ✅ Keep it last
+    report["total_tokens"] = count_tokens(structured_message)
+    log_prompt_report(report)
+    return structured_message, report
+
+def _place(structured_message, name, items):
+    """Stores a section under its key; "memory.long_term" nests under "memory"."""
+    if "." in name:
+        parent, key = name.split(".", 1)
+        structured_message.setdefault(parent, {})[key] = items
+    else:
+        structured_message[name] = items
+
+def log_prompt_report(report):
+    """Prints the payload size and everything that was cut to fit the budget."""
+    print(f"📏 Prompt payload: {report['total_tokens']} tokens (budget {report['budget']}, untrimmed ~{report['untrimmed_tokens']})")
+    for name, section in report["sections"].items():
+        if section["dropped"] or section["truncated"]:
+            print(f"✂️ {name}: kept {section['kept']}, dropped {section['dropped']}, truncated {section['truncated']}")
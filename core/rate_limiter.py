@@ -0,0 +1,182 @@
+import re
+import time
+import random
+import asyncio
+import openai
+from data.constants import (
+    RATE_LIMIT_REQUESTS_PER_MINUTE,
+    RATE_LIMIT_TOKENS_PER_MINUTE,
+    RATE_LIMIT_HEADROOM,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_BASE_BACKOFF,
+    RATE_LIMIT_MAX_BACKOFF,
+)
+
+# ✅ One shared limiter paces every OpenAI call the bot makes for /ash.
+# Two token buckets (requests and tokens per minute) start from configured
+# guesses and are re-synced from the x-ratelimit-* headers on every
+# response, so calls wait *before* hitting quota instead of after a 429.
+# All waiting is asyncio.sleep; nothing blocks the event loop.
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+def parse_reset(value):
+    """Parses OpenAI's reset durations ("1s", "6m0s", "20ms", "1h2m3.5s") into seconds, or None."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(str(value))
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in parts)
+
+class TokenBucket:
+    """
+    Refills at `capacity` per minute. `in_flight` is what running calls have
+    taken but the server hasn't reported back yet, so a header sync doesn't
+    hand the same quota out twice.
+    """
+
+    def __init__(self, name, capacity):
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / 60
+        self.level = capacity * (1 - RATE_LIMIT_HEADROOM)
+        self.in_flight = 0
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        ceiling = self.capacity * (1 - RATE_LIMIT_HEADROOM)
+        self.level = min(ceiling, self.level + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` is available (0 if it is now)."""
+        self._refill()
+        amount = min(amount, self.capacity * (1 - RATE_LIMIT_HEADROOM))  # ✅ Oversized asks wait for a full bucket, not forever
+        if self.level >= amount:
+            return 0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= amount
+        self.in_flight += amount
+
+    def release(self, amount):
+        self.in_flight -= amount
+
+    def sync(self, limit, remaining, reset_seconds):
+        """Re-bases the bucket on what the server just reported."""
+        if limit:
+            self.capacity = limit
+            self.rate = limit / 60
+        if remaining is None:
+            return
+        if reset_seconds and limit:
+            self.rate = max(self.rate, (limit - remaining) / reset_seconds)  # ✅ Server says it refills faster than 1/60 per second
+        self._updated_at = time.monotonic()
+        self.level = remaining - self.in_flight - self.capacity * RATE_LIMIT_HEADROOM
+
+class OpenAIRateLimiter:
+    """Requests + tokens buckets shared by every caller, synced from response headers."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.buckets = {
+            "requests": TokenBucket("requests", requests_per_minute),
+            "tokens": TokenBucket("tokens", tokens_per_minute),
+        }
+        self._lock = asyncio.Lock()  # ✅ Waiting callers take quota in arrival order
+        self._stats = {"calls": 0, "waits": 0, "wait_seconds": 0.0, "rate_limited": 0, "header_syncs": 0}
+
+    async def acquire(self, tokens=0):
+        """Waits until one request and `tokens` tokens fit under the limits, then takes them."""
+        async with self._lock:
+            while True:
+                wait = max(self.buckets["requests"].wait_time(1), self.buckets["tokens"].wait_time(tokens))
+                if wait <= 0:
+                    break
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += wait
+                await asyncio.sleep(wait)
+            self.buckets["requests"].take(1)
+            self.buckets["tokens"].take(tokens)
+            self._stats["calls"] += 1
+
+    def release(self, tokens=0):
+        self.buckets["requests"].release(1)
+        self.buckets["tokens"].release(tokens)
+
+    def update_from_headers(self, headers):
+        """Syncs both buckets from x-ratelimit-limit/remaining/reset-{requests,tokens}, when present."""
+        if not headers:
+            return
+        synced = False
+        for name, bucket in self.buckets.items():
+            remaining = headers.get(f"x-ratelimit-remaining-{name}")
+            if remaining is None:
+                continue
+            try:
+                limit = int(headers.get(f"x-ratelimit-limit-{name}") or 0)
+                bucket.sync(limit, int(remaining), parse_reset(headers.get(f"x-ratelimit-reset-{name}")))
+                synced = True
+            except ValueError:
+                continue
+        if synced:
+            self._stats["header_syncs"] += 1
+
+    def backoff_delay(self, attempt, headers=None):
+        """Retry-After when the server gives one, else exponential backoff with jitter."""
+        headers = headers or {}
+        retry_after = headers.get("retry-after-ms")
+        if retry_after:
+            try:
+                return float(retry_after) / 1000
+            except ValueError:
+                pass
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return min(RATE_LIMIT_BASE_BACKOFF * (2 ** attempt), RATE_LIMIT_MAX_BACKOFF) + random.uniform(0, 0.5)
+
+    async def call(self, raw_method, tokens=0, **kwargs):
+        """
+        Calls an OpenAI `with_raw_response` method under the limiter and returns
+        the parsed result. 429s are retried with non-blocking backoff; other
+        errors propagate.
+        """
+        for attempt in range(RATE_LIMIT_MAX_RETRIES):
+            await self.acquire(tokens)
+            rate_limited = None
+            try:
+                raw = await raw_method(**kwargs)
+            except openai.RateLimitError as e:
+                rate_limited = e
+            finally:
+                self.release(tokens)  # ✅ Before syncing: the server's numbers already include this call
+
+            if rate_limited is None:
+                self.update_from_headers(raw.headers)
+                return raw.parse()
+
+            self._stats["rate_limited"] += 1
+            headers = rate_limited.response.headers if rate_limited.response is not None else {}
+            self.update_from_headers(headers)
+            wait = self.backoff_delay(attempt, headers)
+            print(f"⚠️ OpenAI Rate Limit Hit (429). Retrying in {wait:.2f}s... (Attempt {attempt + 1}/{RATE_LIMIT_MAX_RETRIES})")
+            await asyncio.sleep(wait)
+
+        raise RuntimeError(f"OpenAI still rate limited after {RATE_LIMIT_MAX_RETRIES} attempts")
+
+    def stats(self):
+        stats = dict(self._stats)
+        for name, bucket in self.buckets.items():
+            bucket._refill()
+            stats[f"{name}_available"] = int(bucket.level)
+            stats[f"{name}_per_minute"] = bucket.capacity
+        return stats
+
+openai_rate_limiter = OpenAIRateLimiter(RATE_LIMIT_REQUESTS_PER_MINUTE, RATE_LIMIT_TOKENS_PER_MINUTE)
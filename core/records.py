@@ -0,0 +1,97 @@
+# ✅ Typed, slotted records built straight from Weaviate query results.
+# Lists arrive as native TEXT[] values, so nothing is re-parsed here.
+
+class UserProfile:
+    """A user's profile plus their latest conversation summaries (UserMemory / UserContext)."""
+    __slots__ = ("user_id", "name", "pronouns", "role", "relationship_notes", "memory", "recent_conversations")
+
+    def __init__(self, user_id, name="", pronouns="", role="", relationship_notes="", memory=None, recent_conversations=None):
+        self.user_id = str(user_id)
+        self.name = name or ""
+        self.pronouns = pronouns or ""
+        self.role = role or ""
+        self.relationship_notes = relationship_notes or ""
+        self.memory = list(memory or [])
+        self.recent_conversations = list(recent_conversations or [])
+
+    @classmethod
+    def from_object(cls, obj):
+        """Builds a profile from a UserMemory or UserContext object."""
+        return cls.from_properties(obj.properties)
+
+    @classmethod
+    def from_properties(cls, properties):
+        return cls(
+            properties.get("user_id", ""),
+            name=properties.get("name"),
+            pronouns=properties.get("pronouns"),
+            role=properties.get("role"),
+            relationship_notes=properties.get("relationship_notes"),
+            memory=properties.get("memory"),
+            recent_conversations=properties.get("recent_conversations")
+        )
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        return f"UserProfile({self.to_dict()!r})"
+
+class Conversation:
+    """One RecentConversations summary."""
+    __slots__ = ("uuid", "user_id", "summary", "created_at")
+
+    def __init__(self, uuid, user_id, summary, created_at=None):
+        self.uuid = str(uuid) if uuid else None
+        self.user_id = str(user_id)
+        self.summary = summary or ""
+        self.created_at = created_at
+
+    @classmethod
+    def from_object(cls, obj):
+        properties = obj.properties
+        return cls(obj.uuid, properties.get("user_id", ""), properties.get("summary"), properties.get("created_at"))
+
+    def to_dict(self):
+        return {"user_id": self.user_id, "summary": self.summary, "created_at": self.created_at}
+
+    def __repr__(self):
+        return f"Conversation({self.summary!r})"
+
+class AshMemory:
+    """One of Ash's self-memories and how often it has been reinforced."""
+    __slots__ = ("uuid", "memory", "reinforced_count")
+
+    def __init__(self, uuid, memory, reinforced_count=1):
+        self.uuid = str(uuid) if uuid else None
+        self.memory = memory or ""
+        self.reinforced_count = reinforced_count or 1
+
+    @classmethod
+    def from_object(cls, obj):
+        return cls(obj.uuid, obj.properties.get("memory"), obj.properties.get("reinforced_count"))
+
+    def to_dict(self):
+        return {"memory": self.memory, "reinforced_count": self.reinforced_count}
+
+    def __repr__(self):
+        return f"AshMemory({self.memory!r}, reinforced={self.reinforced_count})"
+
+class Snippet:
+    """A scored piece of memory returned by hybrid retrieval (cut to size when sent to Ash)."""
+    __slots__ = ("source", "uuid", "text", "score", "created_at", "vector")
+
+    def __init__(self, source, uuid, text, score=0.0, created_at=None, vector=None):
+        self.source = source
+        self.uuid = str(uuid) if uuid else None
+        self.text = text or ""
+        self.score = score
+        self.created_at = created_at
+        self.vector = vector
+
+    def to_dict(self, max_chars=None):
+        text = self.text if max_chars is None else self.text[:max_chars]
+        return {"source": self.source, "text": text, "score": round(self.score, 4)}
+
+    def __repr__(self):
+        return f"Snippet({self.source}, {self.text!r}, score={self.score:.4f})"
@@ -0,0 +1,132 @@
+import re
+import time
+import json
+import discord
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+class ReplyFieldParser:
+    """
+    Incrementally pulls the string value of one JSON field (Ash's "reply")
+    out of a response that is still being streamed, decoding escapes as
+    they arrive. Everything after the closing quote is ignored.
+    """
+
+    def __init__(self, field="reply"):
+        self.field_pattern = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self.buffer = ""
+        self.position = None  # ✅ Next undecoded character of the field's value
+        self.value = ""
+        self.done = False
+
+    def feed(self, chunk):
+        """Adds a streamed chunk and returns the reply text decoded so far."""
+        self.buffer += chunk
+        if self.done:
+            return self.value
+
+        if self.position is None:
+            match = self.field_pattern.search(self.buffer)
+            if not match:
+                return self.value
+            self.position = match.end()
+
+        while self.position < len(self.buffer):
+            char = self.buffer[self.position]
+
+            if char == '"':
+                self.done = True
+                break
+
+            if char != "\\":
+                self.value += char
+                self.position += 1
+                continue
+
+            escape = self._read_escape()
+            if escape is None:
+                break  # ✅ Escape sequence is split across chunks; wait for more
+            self.value += escape
+
+        return self.value
+
+    def _read_escape(self):
+        """
+        Decodes the escape at the current position, or returns None if it's
+        incomplete. Malformed escapes and unpaired surrogates decode to "".
+        """
+        start = self.position
+        if start + 1 >= len(self.buffer):
+            return None
+
+        length = 6 if self.buffer[start + 1] == "u" else 2
+        if start + length > len(self.buffer):
+            return None
+
+        if length == 6:
+            try:
+                code = int(self.buffer[start + 2:start + 6], 16)
+            except ValueError:
+                self.position = start + length  # ✅ Not four hex digits; skip it rather than fail the stream
+                return ""
+            # ✅ A high surrogate must be decoded together with the low surrogate escape after it
+            if 0xD800 <= code <= 0xDBFF:
+                if start + 8 > len(self.buffer):
+                    return None
+                if self.buffer[start + 6:start + 8] == "\\u":
+                    length = 12
+                    if start + length > len(self.buffer):
+                        return None
+
+        self.position = start + length
+        try:
+            text = json.loads('"' + self.buffer[start:start + length] + '"')
+        except json.JSONDecodeError:
+            return ""
+        return "".join(char for char in text if not 0xD800 <= ord(char) <= 0xDFFF)  # ✅ Discord can't take lone surrogates
+
+class ProgressiveReply:
+    """
+    Posts a Discord message on the first update and edits it as more text
+    streams in, at most once every `min_interval` seconds so we stay well
+    inside Discord's edit rate limit.
+    """
+
+    def __init__(self, channel, min_interval=1.0):
+        self.channel = channel
+        self.min_interval = min_interval
+        self.message = None
+        self.last_edit = 0.0
+        self.shown_text = ""
+
+    async def update(self, text):
+        """Shows `text` if enough time has passed since the last edit."""
+        if not text.strip() or time.monotonic() - self.last_edit < self.min_interval:
+            return
+        shown = text[:DISCORD_MESSAGE_LIMIT - 1] + "…" if len(text) > DISCORD_MESSAGE_LIMIT - 2 else text + " ▌"
+        try:
+            await self._show(shown)
+        except discord.HTTPException as e:
+            self.last_edit = time.monotonic()  # ✅ A failed progress edit is cosmetic; retry on a later update
+            print(f"⚠️ Couldn't update the streaming reply: {e}")
+
+    async def finish(self, text):
+        """Shows the complete text, spilling anything past Discord's limit into follow-up messages."""
+        chunks = [text[i:i + DISCORD_MESSAGE_LIMIT] for i in range(0, len(text), DISCORD_MESSAGE_LIMIT)] or [""]
+        await self._show(chunks[0])
+        for chunk in chunks[1:]:
+            await self.channel.send(chunk)
+
+    @property
+    def started(self):
+        return self.message is not None
+
+    async def _show(self, text):
+        if text == self.shown_text:
+            return
+        if self.message is None:
+            self.message = await self.channel.send(text)
+        else:
+            await self.message.edit(content=text)
+        self.shown_text = text
+        self.last_edit = time.monotonic()
@@ -0,0 +1,63 @@
+import datetime
+import numpy as np
+from data.constants import RERANK_HALF_LIFE_DAYS, RERANK_MIN_DECAY, RERANK_MMR_LAMBDA, RERANK_DUPLICATE_SIMILARITY
+
+# ✅ Sits between retrieval and prompt assembly. Retrieval returns more
+# candidates than we send; this stage decays old memories, then picks a
+# diverse subset with maximal marginal relevance (MMR) so five paraphrases
+# of one fact don't crowd out everything else. Near-duplicates of an
+# already chosen snippet are dropped outright, so fewer snippets go out.
+
+def recency_weights(created_ats, now, half_life_days=RERANK_HALF_LIFE_DAYS, floor=RERANK_MIN_DECAY):
+    """Exponential decay by age (1.0 when new, 0.5 after one half-life), never below `floor`."""
+    weights = np.ones(len(created_ats))
+    for index, created_at in enumerate(created_ats):
+        if created_at is None:
+            continue  # ✅ Undated memories (Ash's own) don't decay
+        age_days = max((now - created_at).total_seconds(), 0) / 86400
+        weights[index] = max(0.5 ** (age_days / half_life_days), floor)
+    return weights
+
+def unit_vectors(snippets):
+    """Stacks snippet vectors into an L2-normalized matrix; rows without a vector stay zero."""
+    dimensions = next((len(snippet.vector) for snippet in snippets if snippet.vector), 0)
+    vectors = np.zeros((len(snippets), dimensions), dtype=np.float32)
+    for index, snippet in enumerate(snippets):
+        if snippet.vector and len(snippet.vector) == dimensions:
+            vectors[index] = snippet.vector
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+def rerank(snippets, limit, mmr_lambda=RERANK_MMR_LAMBDA, duplicate_similarity=RERANK_DUPLICATE_SIMILARITY, now=None):
+    """
+    Returns up to `limit` snippets chosen by MMR over recency-decayed relevance.
+    Each returned snippet's score is replaced by its decayed relevance.
+    """
+    if not snippets:
+        return []
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+
+    scores = np.array([snippet.score for snippet in snippets], dtype=np.float64)
+    relevance = scores / scores.max() if scores.max() > 0 else np.ones(len(snippets))
+    relevance *= recency_weights([snippet.created_at for snippet in snippets], now)
+
+    vectors = unit_vectors(snippets)
+    similarity = vectors @ vectors.T
+
+    selected = []
+    max_similarity = np.zeros(len(snippets))  # ✅ Closest already-selected snippet, per candidate
+    available = np.ones(len(snippets), dtype=bool)
+    while len(selected) < limit and available.any():
+        mmr = mmr_lambda * relevance - (1 - mmr_lambda) * max_similarity
+        mmr[~available] = -np.inf
+        best = int(np.argmax(mmr))
+
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[best])
+        available &= max_similarity < duplicate_similarity
+
+    for index in selected:
+        snippets[index].score = float(relevance[index])
+    return [snippets[index] for index in selected]
@@ -0,0 +1,169 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from core.normalize import normalize_text
+from data.constants import (
+    RESPONSE_CACHE_MODE,
+    RESPONSE_CACHE_SIMILARITY,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_ENTRIES,
+)
+
+# ✅ Opt-in cache for the questions people ask Ash over and over ("what can
+# you do?"). Entries are keyed on the message embedding and scoped per
+# guild. A close enough match from someone Ash would address the same way
+# (same name/pronouns fingerprint) is sent as-is in "reply" mode, skipping
+# context fetch and the LLM run. Any other close match is handed to the
+# model as a draft. Only the answer body is cached (never the quoted-message
+# header), and a user's entries are dropped when Ash learns something new
+# about how to address them. Set "response_cache" in config.json to "off",
+# "draft" or "reply".
+
+def context_fingerprint(user_id, profile):
+    """
+    Coarse user-context fingerprint: what a reply depends on beyond the
+    question itself. Users Ash has no name or pronouns for are keyed on
+    their own id, so they never share a fingerprint with each other.
+    """
+    name = ((profile.name if profile else None) or "").strip().lower()
+    pronouns = ((profile.pronouns if profile else None) or "").strip().lower()
+    basis = f"{name}|{pronouns}" if name or pronouns else f"user:{user_id}"
+    return hashlib.sha1(basis.encode()).hexdigest()[:16]
+
+def guild_scope(channel):
+    """Cache scope for a channel: its guild, or one shared scope for DMs."""
+    guild = getattr(channel, "guild", None)
+    return str(guild.id) if guild else "dm"
+
+def is_cacheable(response):
+    """
+    Only plain answers are cached: a reply that taught Ash something new is
+    about that user, and fallbacks (no summary) aren't real answers.
+    """
+    if not response.get("reply") or not response.get("conversation_summary"):
+        return False
+    return not response.get("long_term_memories") and not response.get("ash_memories")
+
+class CacheHit:
+    __slots__ = ("reply", "message", "similarity", "reusable")
+
+    def __init__(self, reply, message, similarity, reusable):
+        self.reply = reply
+        self.message = message
+        self.similarity = similarity
+        self.reusable = reusable  # ✅ True: send as-is. False: offer to the model as a draft.
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache of Ash's replies, searched by embedding similarity within a guild."""
+
+    def __init__(self, mode, max_entries, ttl, threshold):
+        self.mode = mode
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries = OrderedDict()  # ✅ (scope, normalized message, fingerprint) -> entry, oldest first
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "reply_hits": 0, "draft_hits": 0, "misses": 0, "stores": 0, "expired": 0, "evictions": 0, "invalidated": 0}
+
+    @property
+    def enabled(self):
+        return self.mode in ("draft", "reply")
+
+    def lookup(self, scope, vector, fingerprint):
+        """Returns the best CacheHit at or above the similarity threshold in this scope, or None."""
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        now = time.monotonic()
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            expired = [key for key, entry in self._entries.items() if entry["expires_at"] <= now]
+            for key in expired:
+                del self._entries[key]
+            self._stats["expired"] += len(expired)
+
+            candidates = [(key, entry) for key, entry in self._entries.items() if key[0] == scope]
+            if not candidates:
+                self._stats["misses"] += 1
+                return None
+
+            similarities = np.stack([entry["vector"] for _, entry in candidates]) @ query
+            matches = [
+                (float(similarity), key, entry)
+                for similarity, (key, entry) in zip(similarities, candidates)
+                if similarity >= self.threshold
+            ]
+            if not matches:
+                self._stats["misses"] += 1
+                return None
+
+            # ✅ A same-fingerprint match wins (it can be reused as-is), then the closest one
+            similarity, key, entry = max(matches, key=lambda match: (match[1][2] == fingerprint, match[0]))
+            self._entries.move_to_end(key)
+            reusable = self.mode == "reply" and key[2] == fingerprint
+            self._stats["reply_hits" if reusable else "draft_hits"] += 1
+            return CacheHit(entry["reply"], entry["message"], similarity, reusable)
+
+    def store(self, scope, vector, fingerprint, message, reply, user_id=None):
+        """
+        Caches a reply body (no quoted-message header) for the user it was
+        written for, evicting the least recently used entries past the size bound.
+        """
+        unit = np.asarray(vector, dtype=np.float32)
+        unit /= np.linalg.norm(unit) or 1.0
+        key = (scope, normalize_text(message), fingerprint)
+
+        with self._lock:
+            self._entries[key] = {
+                "vector": unit,
+                "message": message,
+                "reply": reply,
+                "user_id": str(user_id) if user_id is not None else None,
+                "expires_at": time.monotonic() + self.ttl,
+            }
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate_user(self, user_id):
+        """Drops the replies written for a user (their name, pronouns or relationship notes changed)."""
+        user_id = str(user_id)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry["user_id"] == user_id]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidated"] += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["scopes"] = len({key[0] for key in self._entries})
+        hits = stats["reply_hits"] + stats["draft_hits"]
+        stats["hit_rate"] = hits / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+response_cache = ResponseCache(RESPONSE_CACHE_MODE, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL, RESPONSE_CACHE_SIMILARITY)
+
+def show_response_cache_stats():
+    """Prints response cache counters and offers to clear it."""
+    stats = response_cache.stats()
+    print("\n=== 💬 Response Cache Stats ===")
+    print(f"Mode: {response_cache.mode} | Similarity threshold: {response_cache.threshold} | TTL: {response_cache.ttl}s")
+    print(f"Entries: {stats['size']}/{response_cache.max_entries} across {stats['scopes']} guild scopes")
+    print(f"Lookups: {stats['lookups']} | Reused replies: {stats['reply_hits']} | Drafts: {stats['draft_hits']} | Misses: {stats['misses']}")
+    print(f"Hit rate: {stats['hit_rate']:.1%}")
+    print(f"Stored: {stats['stores']} | Expired: {stats['expired']} | Evicted: {stats['evictions']} | Invalidated: {stats['invalidated']}")
+
+    if input("Clear the cache? (y/N): ").strip().lower() == "y":
+        response_cache.clear()
+        print("🧹 Response cache cleared.")
@@ -0,0 +1,113 @@
+import asyncio
+from weaviate.classes.query import Filter, MetadataQuery
+from data.constants import (
+    RETRIEVAL_TOP_K,
+    RETRIEVAL_CANDIDATES_PER_SOURCE,
+    RETRIEVAL_HYBRID_ALPHA,
+    RETRIEVAL_RRF_K,
+    RERANK_OVERFETCH,
+)
+from core.rerank import rerank
+from core.records import Snippet
+from core.embedding_cache import get_query_embedding, get_query_embedding_async
+from core.weaviate_manager import get_weaviate_client, report_weaviate_error
+from core.weaviate_async import get_async_weaviate_client, report_async_weaviate_error
+
+# ✅ Hybrid (BM25 + vector) search over everything Ash remembers that this
+# user may see: their own facts and past conversations, plus Ash's shared
+# self-memories. Each collection is queried in parallel and the ranked
+# lists are merged with reciprocal-rank fusion into scored snippets. Hits
+# already carried by another prompt section are dropped by the caller.
+
+# ✅ (collection, text property, scoped to the requesting user?)
+SEARCH_SOURCES = [
+    ("UserFact", "fact", True),
+    ("RecentConversations", "summary", True),
+    ("AshMemories", "memory", False),
+]
+
+def _hybrid_arguments(user_id, query_text, query_vector, text_property, user_scoped):
+    """Keyword arguments for one collection's hybrid query."""
+    return {
+        "query": query_text,
+        "vector": query_vector,  # ✅ None lets Weaviate embed the query itself
+        "alpha": RETRIEVAL_HYBRID_ALPHA,
+        "query_properties": [text_property],
+        "filters": Filter.by_property("user_id").equal(str(user_id)) if user_scoped else None,
+        "limit": RETRIEVAL_CANDIDATES_PER_SOURCE,
+        "return_properties": [text_property, "created_at"] if user_scoped else [text_property],
+        "return_metadata": MetadataQuery(score=True),
+        "include_vector": True,  # ✅ For diversity re-ranking
+    }
+
+def _to_snippets(class_name, text_property, objects):
+    """Turns one collection's ranked hits into snippets, best first."""
+    return [
+        Snippet(
+            class_name,
+            obj.uuid,
+            obj.properties.get(text_property),  # ✅ Full text, so callers can dedupe; cut when sent
+            created_at=obj.properties.get("created_at"),
+            vector=(obj.vector or {}).get("default")
+        )
+        for obj in objects
+    ]
+
+def fuse_rankings(rankings, limit=RETRIEVAL_TOP_K, k=RETRIEVAL_RRF_K):
+    """
+    Reciprocal-rank fusion: each snippet scores Σ 1 / (k + rank) over the
+    lists it appears in. Returns the top `limit` snippets, best first.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, snippet in enumerate(ranking, start=1):
+            best = fused.setdefault(snippet.uuid, snippet)
+            best.score += 1 / (k + rank)
+    return sorted(fused.values(), key=lambda snippet: -snippet.score)[:limit]
+
+async def search_memories_async(user_id, query_text, limit=RETRIEVAL_TOP_K):
+    """
+    Returns the top Snippets for a message, scoped to the user plus Ash's
+    shared memories: fused by rank, then re-ranked for recency and diversity.
+    """
+    client = await get_async_weaviate_client()
+    if not client:
+        return []
+
+    query_vector = await get_query_embedding_async(query_text)
+
+    async def search(class_name, text_property, user_scoped):
+        try:
+            response = await client.collections.get(class_name).query.hybrid(
+                **_hybrid_arguments(user_id, query_text, query_vector, text_property, user_scoped)
+            )
+            return _to_snippets(class_name, text_property, response.objects)
+        except Exception as e:
+            print(f"❌ ERROR in hybrid search over {class_name}: {e}")
+            await report_async_weaviate_error(e)
+            return []
+
+    rankings = await asyncio.gather(*(search(*source) for source in SEARCH_SOURCES))
+    snippets = rerank(fuse_rankings(rankings, limit * RERANK_OVERFETCH), limit)
+    print(f"✅ Hybrid search reduced {sum(len(ranking) for ranking in rankings)} hits to {len(snippets)} snippets.")
+    return snippets
+
+def search_memories(user_id, query_text, limit=RETRIEVAL_TOP_K):
+    """Sync version of search_memories_async for the console tools (queries run one after another)."""
+    client = get_weaviate_client()
+    if not client:
+        return []
+
+    query_vector = get_query_embedding(query_text)
+    rankings = []
+    for class_name, text_property, user_scoped in SEARCH_SOURCES:
+        try:
+            response = client.collections.get(class_name).query.hybrid(
+                **_hybrid_arguments(user_id, query_text, query_vector, text_property, user_scoped)
+            )
+            rankings.append(_to_snippets(class_name, text_property, response.objects))
+        except Exception as e:
+            print(f"❌ ERROR in hybrid search over {class_name}: {e}")
+            report_weaviate_error(e)
+
+    return rerank(fuse_rankings(rankings, limit * RERANK_OVERFETCH), limit)
@@ -0,0 +1,105 @@
+import asyncio
+from collections import OrderedDict, deque
+
+# ✅ Every /ash request (context fetch + OpenAI run) goes through one
+# scheduler instead of an unbounded asyncio.create_task. At most
+# `max_concurrent` requests run at once, each user has at most
+# `per_user_limit` running, waiting users are served round-robin, and when
+# the queue is full new requests are shed instead of piling up.
+
+class RequestScheduler:
+    def __init__(self, max_concurrent, per_user_limit, max_queue):
+        self.max_concurrent = max_concurrent
+        self.per_user_limit = per_user_limit
+        self.max_queue = max_queue
+        self._queues = OrderedDict()  # ✅ user_id -> deque of job factories, in round-robin order
+        self._in_flight = {}  # ✅ user_id -> running jobs
+        self._running = 0
+        self._tasks = set()
+        self._stats = {"started": 0, "queued": 0, "shed": 0, "completed": 0, "failed": 0}
+
+    def submit(self, user_id, job):
+        """
+        Schedules `job` (a zero-argument coroutine function) for `user_id`.
+        Returns (status, position): "started" runs now, "queued" waits at
+        `position` (1 = next), "rejected" was shed because the queue is full.
+        """
+        user_id = str(user_id)
+        if self.queued_count() >= self.max_queue:
+            self._stats["shed"] += 1
+            print(f"🚦 Request queue full ({self.max_queue}). Shedding request from {user_id}.")
+            return "rejected", None
+
+        self._queues.setdefault(user_id, deque()).append(job)
+        self._pump()
+
+        position = self.position(user_id, job)
+        if position is None:
+            return "started", None
+        self._stats["queued"] += 1
+        print(f"⏳ Queued request from {user_id} at position {position}.")
+        return "queued", position
+
+    def queued_count(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def position(self, user_id, job):
+        """1-based place of a waiting job in the round-robin dispatch order, or None if it isn't waiting."""
+        for index, (queued_user, queued_job) in enumerate(self._dispatch_order(), start=1):
+            if queued_user == user_id and queued_job is job:
+                return index
+        return None
+
+    def _dispatch_order(self):
+        """Waiting jobs in the order round-robin would start them (one per user per round)."""
+        queues = [(user_id, list(queue)) for user_id, queue in self._queues.items()]
+        order, round_index = [], 0
+        while any(round_index < len(queue) for _, queue in queues):
+            order.extend((user_id, queue[round_index]) for user_id, queue in queues if round_index < len(queue))
+            round_index += 1
+        return order
+
+    def _next_job(self):
+        """Pops the next job from the first user (in rotation) who is under their in-flight limit."""
+        for user_id, queue in self._queues.items():
+            if self._in_flight.get(user_id, 0) < self.per_user_limit:
+                job = queue.popleft()
+                if queue:
+                    self._queues.move_to_end(user_id)  # ✅ Served this round; go to the back
+                else:
+                    del self._queues[user_id]
+                return user_id, job
+        return None
+
+    def _pump(self):
+        """Starts waiting jobs while there is capacity."""
+        while self._running < self.max_concurrent:
+            next_job = self._next_job()
+            if next_job is None:
+                return
+            user_id, job = next_job
+            self._running += 1
+            self._in_flight[user_id] = self._in_flight.get(user_id, 0) + 1
+            self._stats["started"] += 1
+            task = asyncio.create_task(self._run(user_id, job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, user_id, job):
+        try:
+            await job()
+            self._stats["completed"] += 1
+        except Exception as e:
+            self._stats["failed"] += 1
+            print(f"❌ ERROR in scheduled request for {user_id}: {e}")
+        finally:
+            self._running -= 1
+            self._in_flight[user_id] -= 1
+            if not self._in_flight[user_id]:
+                del self._in_flight[user_id]
+            self._pump()
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats.update(running=self._running, waiting=self.queued_count(), waiting_users=len(self._queues))
+        return stats
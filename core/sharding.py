@@ -0,0 +1,180 @@
+import os
+import sys
+import json
+import math
+import time
+import signal
+import subprocess
+import discord
+from discord.ext import commands
+from data.constants import (
+    SHARD_COUNT,
+    SHARD_IDS,
+    SHARD_PROCESSES,
+    SHARD_PROCESS_INDEX,
+    SHARD_STATUS_DIR,
+    SHARD_STATUS_STALE_AFTER,
+)
+
+# ✅ With "shard_count" > 0 in config.json, Ash runs as an AutoShardedBot:
+# several gateway connections instead of one. With "shard_processes" > 1
+# the shards are split across worker processes on this machine (each with
+# its own event loop), started by the console menu. Workers write their
+# shard status to small JSON files that the menu reads, since it doesn't
+# share memory with them.
+
+def shard_ids_for_process(shard_count, processes, index):
+    """The shards one worker process runs: every `processes`-th shard, starting at `index`."""
+    return [shard_id for shard_id in range(shard_count) if shard_id % processes == index]
+
+def create_bot(intents):
+    """commands.Bot for a single connection, or an AutoShardedBot running this process's shards."""
+    if SHARD_COUNT <= 0:
+        return commands.Bot(command_prefix="/", intents=intents)
+    shard_ids = SHARD_IDS if SHARD_IDS is not None else list(range(SHARD_COUNT))
+    print(f"🧩 Sharded mode: running shards {shard_ids} of {SHARD_COUNT}.")
+    return commands.AutoShardedBot(command_prefix="/", intents=intents, shard_count=SHARD_COUNT, shard_ids=shard_ids)
+
+### **🔹 Per-Guild Command Registration**
+_synced_guilds = set()  # ✅ on_ready fires again after reconnects; sync each guild once per process
+
+async def sync_guild_commands(bot, guilds):
+    """
+    Copies the global commands onto each guild and syncs them there. Guild
+    syncs apply immediately (global ones can take an hour), and each shard
+    process only syncs the guilds on its own shards.
+    """
+    for guild in guilds:
+        if guild.id in _synced_guilds:
+            continue
+        try:
+            bot.tree.copy_global_to(guild=guild)
+            synced = await bot.tree.sync(guild=guild)
+            _synced_guilds.add(guild.id)
+            print(f"📌 Registered {[command.name for command in synced]} in {guild.name} ({guild.id}).")
+        except discord.HTTPException as e:
+            print(f"❌ ERROR syncing commands for guild {guild.id}: {e}")
+
+### **🔹 Shard Status**
+def _latency_ms(latency):
+    return round(latency * 1000) if math.isfinite(latency) else None  # ✅ inf until the first heartbeat
+
+def collect_shard_status(bot):
+    """One row per shard this process runs: id, latency, connection state, guild count."""
+    if isinstance(bot, commands.AutoShardedBot):
+        return [
+            {
+                "shard_id": shard_id,
+                "latency_ms": _latency_ms(shard.latency),
+                "connected": not shard.is_closed(),
+                "guilds": sum(1 for guild in bot.guilds if guild.shard_id == shard_id),
+            }
+            for shard_id, shard in sorted(bot.shards.items())
+        ]
+    return [{
+        "shard_id": 0,
+        "latency_ms": _latency_ms(bot.latency),
+        "connected": not bot.is_closed(),
+        "guilds": len(bot.guilds),
+    }]
+
+def status_path(index):
+    return os.path.join(SHARD_STATUS_DIR, f"process-{index}.json")
+
+def write_shard_status(bot):
+    """Worker processes: publish this process's shard status for the console menu."""
+    os.makedirs(SHARD_STATUS_DIR, exist_ok=True)
+    path = status_path(SHARD_PROCESS_INDEX)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump({"pid": os.getpid(), "updated_at": time.time(), "shards": collect_shard_status(bot)}, file)
+    os.replace(temporary_path, path)  # ✅ The menu never reads a half-written file
+
+def read_shard_status():
+    """Console menu: (process index, status or None) for every worker process."""
+    statuses = []
+    for index in range(SHARD_PROCESSES):
+        try:
+            with open(status_path(index), "r", encoding="utf-8") as file:
+                statuses.append((index, json.load(file)))
+        except (OSError, json.JSONDecodeError):
+            statuses.append((index, None))
+    return statuses
+
+def print_shard_rows(shards, prefix=""):
+    for shard in shards:
+        latency = f"{shard['latency_ms']} ms" if shard["latency_ms"] is not None else "—"
+        state = "🟢 connected" if shard["connected"] else "🔴 disconnected"
+        print(f"{prefix}Shard {shard['shard_id']}: {state} | latency {latency} | guilds {shard['guilds']}")
+
+def show_shard_status(bot, bot_running):
+    """Prints per-shard status and latency, from this process or from the worker status files."""
+    print("\n=== 🧩 Shard Status ===")
+    if not bot_running:
+        print("AshBot is not running.")
+        return
+
+    if not shard_processes.enabled:
+        print_shard_rows(collect_shard_status(bot))
+        return
+
+    now = time.time()
+    for index, status in read_shard_status():
+        process = shard_processes.processes[index] if index < len(shard_processes.processes) else None
+        alive = process is not None and process.poll() is None
+        if status is None:
+            print(f"Process {index}: {'starting (no status yet)' if alive else '❌ not running'}")
+            continue
+
+        age = now - status["updated_at"]
+        stale = " ⚠️ stale" if age > SHARD_STATUS_STALE_AFTER else ""
+        print(f"Process {index} (pid {status['pid']}, {'alive' if alive else '❌ exited'}, updated {age:.0f}s ago{stale}):")
+        print_shard_rows(status["shards"], prefix="  ")
+
+### **🔹 Worker Processes**
+class ShardProcessManager:
+    """Starts and stops the worker processes that split the shards between them."""
+
+    def __init__(self, shard_count, processes):
+        self.shard_count = shard_count
+        self.process_count = processes
+        self.processes = []
+
+    @property
+    def enabled(self):
+        return self.shard_count > 0 and self.process_count > 1
+
+    def start(self):
+        os.makedirs(SHARD_STATUS_DIR, exist_ok=True)
+        for index in range(self.process_count):
+            shard_ids = shard_ids_for_process(self.shard_count, self.process_count, index)
+            if not shard_ids:
+                continue  # ✅ More processes than shards
+            env = dict(os.environ, ASH_SHARD_IDS=",".join(map(str, shard_ids)), ASH_SHARD_PROCESS=str(index))
+            with open(os.path.join(SHARD_STATUS_DIR, f"process-{index}.log"), "a", encoding="utf-8") as log:
+                self.processes.append(subprocess.Popen(
+                    [sys.executable, "-m", "core.bot", "--shard-worker"],
+                    env=env, stdout=log, stderr=subprocess.STDOUT
+                ))
+            print(f"🚀 Started shard process {index} (shards {shard_ids}). Logs: {SHARD_STATUS_DIR}/process-{index}.log")
+
+    def stop(self, timeout=15):
+        """Asks every worker to shut down (they flush pending memory writes), killing stragglers."""
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                print(f"⚠️ Shard process {process.pid} didn't exit in {timeout}s. Killing it.")
+                process.kill()
+        self.processes = []
+
+shard_processes = ShardProcessManager(SHARD_COUNT, SHARD_PROCESSES)
+
+def stop_on_sigterm():
+    """Worker processes: turn SIGTERM into KeyboardInterrupt so bot.run() shuts down cleanly."""
+    def handle(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, handle)
@@ -0,0 +1,205 @@
+import asyncio
+import weaviate
+from weaviate.classes.query import Filter, Sort
+from data.constants import OPENAI_API_KEY, USER_FACT_TOP_K
+from core.context_cache import context_cache, MISS
+from core.embedding_cache import get_query_embedding_async
+from core.records import UserProfile, Conversation
+from core.weaviate_manager import (
+    CONNECTION_ERRORS,
+    WeaviateQueryError,
+    fact_search_arguments,
+    rerank_fact_hits,
+    user_context_uuid,
+    build_user_context,
+    USER_CONTEXT_RECENT_LIMIT,
+)
+
+# ✅ Async counterparts of the core/weaviate_manager.py reads the /ash hot
+# path makes. They share ONE WeaviateAsyncClient bound to the Discord bot's
+# event loop, so requests never block heartbeats. Writes go through the
+# write-behind writer (core/memory_writer.py) in its own thread; the sync
+# API stays in weaviate_manager for it, the console menu and test_queries.py.
+
+_async_client = None
+_async_client_loop = None
+_async_client_lock = None
+
+### **🔹 Helper: Shared Async Client**
+async def get_async_weaviate_client():
+    """Returns the shared async Weaviate client, connecting on first use."""
+    global _async_client, _async_client_loop, _async_client_lock
+
+    loop = asyncio.get_running_loop()
+    if _async_client_loop is not loop:
+        # ✅ The bot was restarted on a new loop; the old client can't be reused there
+        _async_client, _async_client_loop, _async_client_lock = None, loop, asyncio.Lock()
+
+    async with _async_client_lock:
+        if _async_client is not None and _async_client.is_connected():
+            return _async_client
+
+        try:
+            client = weaviate.use_async_with_local(headers={"X-OpenAI-Api-Key": OPENAI_API_KEY})
+            await client.connect()
+            _async_client = client
+            print("✅ Connected async Weaviate client!")
+            return client
+        except Exception as e:
+            print(f"❌ ERROR: Failed to connect async Weaviate client: {e}")
+            return None
+
+async def report_async_weaviate_error(error):
+    """Drops the shared async client after a connection failure so the next call reconnects."""
+    global _async_client
+
+    is_connection_error = isinstance(error, CONNECTION_ERRORS) or (
+        isinstance(error, WeaviateQueryError) and "UNAVAILABLE" in str(error)
+    )
+    if is_connection_error and _async_client is not None:
+        print("🔌 Async Weaviate connection lost. Reconnecting on next use.")
+        client, _async_client = _async_client, None
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+async def close_async_weaviate_client():
+    """Closes the shared async Weaviate client. Safe to call more than once."""
+    global _async_client
+    if _async_client is not None:
+        client, _async_client = _async_client, None
+        await client.close()
+        print("🔒 Async Weaviate client closed.")
+
+### **🔹 Async Reads**
+async def fetch_user_profile_async(user_id):
+    """Async version of fetch_user_profile."""
+    cache_key = ("profile", str(user_id))
+    cached = context_cache.get(cache_key)
+    if cached is not MISS:
+        return cached
+
+    client = await get_async_weaviate_client()
+    if not client:
+        return None
+
+    try:
+        collection = client.collections.get("UserMemory")
+        response = await collection.query.fetch_objects(
+            filters=Filter.by_property("user_id").equal(user_id),
+            limit=1,
+            return_properties=["user_id", "name", "pronouns", "role", "relationship_notes", "memory"]
+        )
+
+        profile = UserProfile.from_object(response.objects[0]) if response.objects else None
+        context_cache.set(cache_key, profile)
+        return profile
+
+    except Exception as e:
+        print(f"❌ ERROR fetching user profile (async): {e}")
+        await report_async_weaviate_error(e)
+        return None
+
+async def fetch_relevant_facts_async(user_id, query_text, limit=USER_FACT_TOP_K):
+    """Async version of fetch_relevant_facts: the user's top-k facts for this message."""
+    client = await get_async_weaviate_client()
+    if not client:
+        return []
+
+    try:
+        collection = client.collections.get("UserFact")
+        query_vector = await get_query_embedding_async(query_text)
+        if query_vector is not None:
+            response = await collection.query.near_vector(near_vector=query_vector, **fact_search_arguments(user_id, limit))
+        else:
+            response = await collection.query.near_text(query=query_text, **fact_search_arguments(user_id, limit))
+
+        return rerank_fact_hits(response.objects, limit)
+
+    except Exception as e:
+        print(f"❌ ERROR fetching relevant facts (async): {e}")
+        await report_async_weaviate_error(e)
+        return []
+
+async def fetch_recent_conversations_async(user_id, limit=3):
+    """Async version of fetch_recent_conversations."""
+    cache_key = ("recent", str(user_id), limit)
+    cached = context_cache.get(cache_key)
+    if cached is not MISS:
+        return cached
+
+    client = await get_async_weaviate_client()
+    if not client:
+        return []
+
+    try:
+        collection = client.collections.get("RecentConversations")
+        response = await collection.query.fetch_objects(
+            filters=Filter.by_property("user_id").equal(user_id),
+            sort=Sort.by_property("created_at", ascending=False),
+            limit=limit
+        )
+
+        conversations = [Conversation.from_object(obj) for obj in reversed(response.objects)]
+        print(f"✅ Retrieved {len(conversations)} recent conversations for {user_id}")
+        context_cache.set(cache_key, conversations)
+        return conversations
+
+    except Exception as e:
+        print(f"❌ ERROR fetching recent conversations (async): {e}")
+        await report_async_weaviate_error(e)
+        return []
+
+### **🔹 Materialized User Context**
+async def _write_user_context(client, user_id, context):
+    """Stores a UserContext object under the user's deterministic UUID."""
+    collection = client.collections.get("UserContext")
+    context_id = user_context_uuid(user_id)
+    if await collection.data.exists(context_id):
+        await collection.data.replace(uuid=context_id, properties=context)
+    else:
+        await collection.data.insert(properties=context, uuid=context_id)
+
+async def fetch_user_context_async(user_id):
+    """
+    Fetches a user's profile, long-term memories and recent conversations with
+    a single fetch-by-id. If the document doesn't exist yet it is built from
+    the source collections once and stored (read-repair).
+    """
+    cache_key = ("context", str(user_id))
+    cached = context_cache.get(cache_key)
+    if cached is not MISS:
+        return cached
+
+    client = await get_async_weaviate_client()
+    if not client:
+        return None
+
+    try:
+        collection = client.collections.get("UserContext")
+        context_object = await collection.query.fetch_object_by_id(user_context_uuid(user_id))
+        if context_object:
+            context = UserProfile.from_object(context_object)
+            context_cache.set(cache_key, context)
+            return context
+
+        print(f"🧩 No UserContext for {user_id} yet. Materializing it...")
+        profile, recent_conversations = await asyncio.gather(
+            fetch_user_profile_async(user_id),
+            fetch_recent_conversations_async(user_id, limit=USER_CONTEXT_RECENT_LIMIT)
+        )
+        if not profile and not recent_conversations:
+            context_cache.set(cache_key, None)
+            return None
+
+        properties = build_user_context(user_id, profile, [conversation.summary for conversation in recent_conversations])
+        await _write_user_context(client, user_id, properties)
+        context = UserProfile.from_properties(properties)
+        context_cache.set(cache_key, context)
+        return context
+
+    except Exception as e:
+        print(f"❌ ERROR fetching user context (async): {e}")
+        await report_async_weaviate_error(e)
+        return None
@@ -1,13 +1,33 @@
 import os
 import time
 import yaml
+import atexit
+import threading
 import json
 import weaviate
 import requests
+import datetime
 import subprocess
 import weaviate.classes as wvc
-from weaviate.classes.query import Filter
-from data.constants import WEAVIATE_URL, CAILEA_ID, BASE_MEMORIES, OPENAI_API_KEY
+from weaviate.util import generate_uuid5
+from weaviate.classes.query import Filter, Sort, MetadataQuery
+from weaviate.classes.aggregate import GroupByAggregate
+from weaviate.exceptions import (
+    WeaviateConnectionError,
+    WeaviateGRPCUnavailableError,
+    WeaviateClosedClientError,
+    WeaviateQueryError,
+)
+from data.constants import (
+    WEAVIATE_URL, CAILEA_ID, BASE_MEMORIES, OPENAI_API_KEY, USER_FACT_TOP_K, RERANK_OVERFETCH,
+    RECENT_CONVERSATIONS_KEEP_PER_USER, RECENT_CONVERSATIONS_MAX_AGE_DAYS, RECENT_CONVERSATIONS_PRUNE_BATCH_SIZE,
+    RECENT_CONVERSATIONS_PRUNE_MAX_BATCHES, RECENT_CONVERSATIONS_PRUNE_MAX_USERS
+)
+from core.context_cache import context_cache, MISS, show_cache_stats
+from core.embedding_cache import get_query_embedding, show_embedding_stats
+from core.normalize import normalize_text
+from core.records import UserProfile, Conversation, Snippet
+from core.rerank import rerank
 
 URLS =  [
         "http://localhost:8080/v1/meta",  # Works when calling from the host machine
@@ -15,30 +35,113 @@ URLS =  [
         ]
 
 
-def convert_lists_to_json(obj):
+def parse_memory_list(value):
     """
-    Converts list values to JSON strings before inserting into Weaviate.
-    Ensures all list-based fields are properly formatted.
+    Returns a memory list field as a Python list. Values are native TEXT[]
+    arrays; JSON strings only appear in data not yet migrated to TEXT[].
     """
-    for key, value in obj.items():
-        if isinstance(value, list):  # ✅ If it's a list, convert it to a JSON string
-            obj[key] = json.dumps(value)
-    return obj
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            parsed_value = json.loads(value)
+        except json.JSONDecodeError:
+            return []
+        return parsed_value if isinstance(parsed_value, list) else []
+    return []
+
+### **🔹 Natural Keys & Merge Rules**
+# Every memory object is stored under a deterministic UUID derived from its
+# natural key, so writing the same thing twice merges into (or leaves alone)
+# the existing object instead of adding a duplicate row.
+PROFILE_FIELDS = ["name", "pronouns", "role", "relationship_notes"]
+
+def object_uuid(class_name, properties):
+    """Returns the deterministic UUID for an object's natural key."""
+    if class_name == "UserMemory":
+        return generate_uuid5(str(properties["user_id"]), class_name)
+    if class_name == "AshMemories":
+        return generate_uuid5(normalize_text(properties["memory"]), class_name)
+    if class_name == "RecentConversations":
+        return generate_uuid5(f"{properties['user_id']}:{normalize_text(properties['summary'])}", class_name)
+    if class_name == "UserFact":
+        return generate_uuid5(f"{properties['user_id']}:{normalize_text(properties['fact'])}", class_name)
+    raise ValueError(f"No natural key defined for {class_name}")
+
+def merge_memory_lists(existing, incoming):
+    """Appends incoming memories to existing ones, skipping ones already stored."""
+    merged = list(existing)
+    seen = {normalize_text(memory) for memory in merged}
+    for memory in incoming:
+        if memory and normalize_text(memory) not in seen:
+            merged.append(memory)
+            seen.add(normalize_text(memory))
+    return merged
+
+def merge_properties(class_name, existing, incoming):
+    """
+    Merges an incoming write into the stored properties of the same key.
+    - UserMemory: non-empty profile fields overwrite, memories are unioned.
+    - AshMemories: reinforcement counts add up.
+    - RecentConversations / UserFact: identical content is a no-op.
+    """
+    if existing is None:
+        merged = dict(incoming)
+        if class_name == "UserMemory":
+            merged.update({field: incoming.get(field) or "" for field in PROFILE_FIELDS})
+            merged["memory"] = merge_memory_lists([], parse_memory_list(incoming.get("memory")))
+        return merged
+
+    if class_name == "UserMemory":
+        merged = dict(existing)
+        merged["user_id"] = incoming["user_id"]
+        for field in PROFILE_FIELDS:
+            if incoming.get(field):
+                merged[field] = incoming[field]
+        merged["memory"] = merge_memory_lists(
+            parse_memory_list(existing.get("memory")),
+            parse_memory_list(incoming.get("memory"))
+        )
+        return merged
+
+    if class_name == "AshMemories":
+        return {
+            "memory": existing.get("memory") or incoming["memory"],
+            "reinforced_count": (existing.get("reinforced_count") or 0) + (incoming.get("reinforced_count") or 1)
+        }
+
+    return dict(existing)
 
-def convert_json_to_lists(obj):
+def _comparable(class_name, properties):
+    """Properties with any legacy JSON-encoded memory lists decoded, for change detection."""
+    if class_name != "UserMemory":
+        return properties
+    return {key: parse_memory_list(value) if key == "memory" else value for key, value in properties.items()}
+
+def plan_upserts(class_name, objects, existing_by_uuid, only_if_missing=False):
     """
-    Converts JSON strings back to lists when retrieving from Weaviate.
-    Ensures consistency in how lists are handled in memory.
+    Works out the writes needed to upsert `objects` given what is already stored.
+    Returns {uuid: (action, properties)} where action is "insert" or "replace";
+    keys that wouldn't change are left out. Objects sharing a key in the same
+    call are merged first. With only_if_missing, existing keys are never touched.
     """
-    for key, value in obj.items():
-        if isinstance(value, str):  # ✅ If it's a string, check if it's a JSON list
-            try:
-                parsed_value = json.loads(value)
-                if isinstance(parsed_value, list):
-                    obj[key] = parsed_value  # ✅ Convert it back to a list
-            except json.JSONDecodeError:
-                pass  # Ignore if it's not valid JSON
-    return obj
+    incoming_by_uuid = {}
+    for obj in objects:
+        obj_uuid = str(object_uuid(class_name, obj))
+        incoming_by_uuid[obj_uuid] = merge_properties(class_name, incoming_by_uuid.get(obj_uuid), obj)
+
+    writes = {}
+    for obj_uuid, incoming in incoming_by_uuid.items():
+        existing = existing_by_uuid.get(obj_uuid)
+        if existing is not None and only_if_missing:
+            continue
+
+        merged = merge_properties(class_name, existing, incoming)
+        if existing is not None and _comparable(class_name, merged) == _comparable(class_name, existing):
+            continue  # ✅ No-op: nothing new to store
+
+        writes[obj_uuid] = ("replace" if existing is not None else "insert", merged)
+    return writes
 
 ### **🔹 Helper: Connect to Weaviate**
 def connect_to_weaviate():
@@ -51,190 +154,366 @@ def connect_to_weaviate():
         print(f"❌ ERROR: Failed to connect to Weaviate: {e}")
         return None
 
-### **🔹 Upsert User Memory (Profile & Long-Term Memory)**
-def upsert_user_memory(user_id, name=None, pronouns=None, role=None, relationship_notes=None, new_memory=None):
-    """
-    Inserts or updates user details and long-term memories into Weaviate.
-    """
-    client = connect_to_weaviate()
-    if not client:
-        return False
-
+### **🔹 Shared Weaviate Client**
+# One warm client is shared by the whole process (bot thread + console menu).
+# The v4 client is safe to use from several threads; the lock only guards
+# creating, replacing and closing it.
+HEALTH_CHECK_INTERVAL = 30  # ✅ Seconds between readiness checks on the shared client
+
+CONNECTION_ERRORS = (
+    WeaviateConnectionError,
+    WeaviateGRPCUnavailableError,
+    WeaviateClosedClientError,
+)
+
+_shared_client = None
+_shared_client_lock = threading.RLock()
+_last_health_check = 0.0
+_connection_stats = {
+    "connects": 0,
+    "reuses": 0,
+    "reconnects": 0,
+    "failed_health_checks": 0,
+    "connection_errors": 0,
+}
+
+def _is_client_healthy(client):
+    """Returns True if the client is connected and Weaviate answers its readiness probe."""
     try:
-        user_collection = client.collections.get("UserMemory")
-        user_profile = user_collection.query.fetch_objects(
-            filters=Filter.by_property("user_id").equal(user_id),
-            limit=1
-        )
-
-        existing_user = user_profile.objects[0] if user_profile.objects else None
-
-        # ✅ Prepare data for insert/update
-        update_data = {
-            "user_id": user_id,
-            "name": name or existing_user.properties.get("name", ""),
-            "pronouns": pronouns or existing_user.properties.get("pronouns", ""),
-            "role": role or existing_user.properties.get("role", ""),
-            "relationship_notes": relationship_notes or existing_user.properties.get("relationship_notes", ""),
-            "memory": json.dumps(existing_user.properties.get("memory", []) + [new_memory]) if new_memory else existing_user.properties.get("memory", "[]")
-        }
-
-        if existing_user:
-            user_collection.data.replace(uuid=existing_user.uuid, properties=update_data)
-            print(f"🔄 Updated UserMemory for {user_id}")
-        else:
-            user_collection.data.insert(properties=update_data)
-            print(f"✅ Inserted new UserMemory for {user_id}")
-
-    except Exception as e:
-        print(f"❌ ERROR in upsert_user_memory: {e}")
-
-    finally:
-        client.close()
-
-### **🔹 Insert Recent Conversation**
-def insert_recent_conversation(user_id, summary):
-    """Stores a conversation summary in Weaviate."""
-    client = connect_to_weaviate()
-    if not client:
+        return client.is_connected() and client.is_ready()
+    except Exception:
         return False
 
-    try:
-        conversation_collection = client.collections.get("RecentConversations")
-        conversation_collection.data.insert(properties={"user_id": user_id, "summary": summary})
-        print(f"✅ Inserted RecentConversation for {user_id}")
+def _discard_shared_client():
+    """Closes and forgets the shared client. Caller must hold the lock."""
+    global _shared_client
+    if _shared_client is not None:
+        try:
+            _shared_client.close()
+        except Exception as e:
+            print(f"⚠️ Error closing stale Weaviate client: {e}")
+    _shared_client = None
 
-    except Exception as e:
-        print(f"❌ ERROR inserting recent conversation: {e}")
+def get_weaviate_client():
+    """
+    Returns the process-wide Weaviate client, connecting on first use.
+    The client is health-checked at most every HEALTH_CHECK_INTERVAL seconds
+    and transparently replaced if it has gone stale.
+    """
+    global _shared_client, _last_health_check
+
+    with _shared_client_lock:
+        if _shared_client is not None:
+            now = time.monotonic()
+            if now - _last_health_check < HEALTH_CHECK_INTERVAL:
+                _connection_stats["reuses"] += 1
+                return _shared_client
+            if _is_client_healthy(_shared_client):
+                _last_health_check = now  # ✅ Only a check that actually ran restarts the interval
+                _connection_stats["reuses"] += 1
+                return _shared_client
+
+            print("⚠️ Shared Weaviate client failed its health check. Reconnecting...")
+            _connection_stats["failed_health_checks"] += 1
+            _connection_stats["reconnects"] += 1
+            _discard_shared_client()
 
-    finally:
-        if client and client.is_connected():
-            client.close()
+        client = connect_to_weaviate()
+        if client:
+            _shared_client = client
+            _last_health_check = time.monotonic()
+            _connection_stats["connects"] += 1
+        return client
 
-def insert_data(class_name, objects):
+def report_weaviate_error(error):
+    """
+    Drops the shared client after a connection-level (HTTP/gRPC) failure so the
+    next call reconnects. Query errors caused by bad requests keep the client.
+    """
+    is_connection_error = isinstance(error, CONNECTION_ERRORS) or (
+        isinstance(error, WeaviateQueryError) and "UNAVAILABLE" in str(error)
+    )
+    if not is_connection_error:
+        return
+
+    with _shared_client_lock:
+        _connection_stats["connection_errors"] += 1
+        if _shared_client is not None:
+            print("🔌 Weaviate connection lost. The shared client will reconnect on next use.")
+            _connection_stats["reconnects"] += 1
+            _discard_shared_client()
+
+def close_weaviate_client():
+    """Closes the shared Weaviate client. Safe to call more than once."""
+    with _shared_client_lock:
+        if _shared_client is not None:
+            _discard_shared_client()
+            print("🔒 Shared Weaviate client closed.")
+
+def get_connection_stats():
+    """Returns a snapshot of shared client usage counters."""
+    with _shared_client_lock:
+        stats = dict(_connection_stats)
+        stats["connected"] = _shared_client is not None
+    total = stats["connects"] + stats["reuses"]
+    stats["reuse_rate"] = stats["reuses"] / total if total else 0.0
+    return stats
+
+def show_connection_stats():
+    """Prints shared Weaviate client statistics to the console."""
+    stats = get_connection_stats()
+    print("\n=== 🔌 Weaviate Connection Stats ===")
+    print(f"Connected: {'yes' if stats['connected'] else 'no'}")
+    print(f"New connections: {stats['connects']} (reconnects: {stats['reconnects']})")
+    print(f"Reused client: {stats['reuses']} times ({stats['reuse_rate']:.1%} of requests)")
+    print(f"Failed health checks: {stats['failed_health_checks']}")
+    print(f"Connection errors: {stats['connection_errors']}")
+
+atexit.register(close_weaviate_client)
+
+### **🔹 Keyed Upserts**
+def upsert_data(class_name, objects, only_if_missing=False):
     """
-    Inserts multiple objects into Weaviate.
-    Ensures lists are converted to JSON strings before insertion.
+    Upserts objects into Weaviate under their natural-key UUIDs.
+    Repeated writes merge into the stored object or are skipped entirely.
     """
-    client = connect_to_weaviate()
+    client = get_weaviate_client()
     if not client:
-        print(f"❌ Failed to connect to Weaviate for inserting into {class_name}.")
+        print(f"❌ Failed to connect to Weaviate for upserting into {class_name}.")
         return False
 
     try:
         collection = client.collections.get(class_name)
-        print(f"📥 Inserting into {class_name}: {len(objects)} records...")
+        ids = list({str(object_uuid(class_name, obj)) for obj in objects})
+        existing = collection.query.fetch_objects_by_ids(ids, limit=len(ids))
+        existing_by_uuid = {str(obj.uuid): obj.properties for obj in existing.objects}
 
-        for obj in objects:
-            # ✅ Ensure all lists are converted to JSON strings
-            obj = convert_lists_to_json(obj)
+        writes = plan_upserts(class_name, objects, existing_by_uuid, only_if_missing)
+        print(f"📥 Upserting into {class_name}: {len(objects)} records, {len(writes)} changed...")
 
-            try:
-                collection.data.insert(properties=obj)
-                print(f"✅ Successfully inserted into {class_name}: {obj}")
+        for obj_uuid, (action, properties) in writes.items():
+            if action == "replace":
+                collection.data.replace(uuid=obj_uuid, properties=properties)
+            else:
+                collection.data.insert(properties=properties, uuid=obj_uuid)
 
-            except Exception as e:
-                print(f"❌ ERROR inserting into {class_name}: {e}")
+        invalidate_cached_users(objects)
+        return True
 
     except Exception as e:
-        print(f"❌ ERROR accessing collection {class_name}: {e}")
+        print(f"❌ ERROR upserting into {class_name}: {e}")
+        report_weaviate_error(e)
+        return False
 
-    finally:
-        client.close()
+def build_user_facts(user_id, facts):
+    """UserFact objects for new long-term memories, timestamped in the order given."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        {
+            "user_id": str(user_id),
+            "fact": fact,
+            "created_at": now + datetime.timedelta(microseconds=index)  # ✅ Keeps same-batch facts ordered
+        }
+        for index, fact in enumerate(facts) if fact
+    ]
 
-### **🔹 Perform Vector-Based Search**
-def perform_vector_search(query_text):
+def build_recent_conversation(user_id, summary):
+    """A timestamped RecentConversations object."""
+    return {
+        "user_id": str(user_id),
+        "summary": summary,
+        "created_at": datetime.datetime.now(datetime.timezone.utc)
+    }
+
+def invalidate_cached_users(objects):
+    """Drops cached context for every user touched by a write."""
+    for user_id in {obj["user_id"] for obj in objects if obj.get("user_id")}:
+        context_cache.invalidate_user(user_id)
+
+### **🔹 Upsert User Memory (Profile & Long-Term Memory)**
+def upsert_user_memory(user_id, name=None, pronouns=None, role=None, relationship_notes=None, new_memory=None):
+    """
+    Inserts or updates user details and long-term memories into Weaviate.
+    A new memory becomes its own UserFact, so the profile is never rewritten for it.
+    """
+    profile_saved = upsert_data("UserMemory", [{
+        "user_id": user_id,
+        "name": name,
+        "pronouns": pronouns,
+        "role": role,
+        "relationship_notes": relationship_notes
+    }])
+    if new_memory:
+        return upsert_data("UserFact", build_user_facts(user_id, [new_memory])) and profile_saved
+    return profile_saved
+
+### **🔹 Replace Consolidated Memories**
+def replace_user_facts(user_id, facts, old_fact_ids, old_conversation_ids=()):
     """
-    Searches Weaviate for memories or conversations that are similar to the given query.
-    Uses vector similarity instead of direct lookups.
+    Swaps a user's facts for a consolidated set. The new facts are upserted
+    first and the old facts (and any conversations folded into them) are
+    deleted only once that succeeded, so a failure part-way never loses a
+    memory; at worst both sets exist until the next consolidation pass.
     """
-    client = connect_to_weaviate()
+    new_facts = build_user_facts(user_id, facts)
+    if not new_facts or not upsert_data("UserFact", new_facts):
+        return False
+
+    client = get_weaviate_client()
     if not client:
-        return []
+        return False
 
-    try:
-        user_collection = client.collections.get("UserMemory")
-        response = user_collection.query.near_text(query=query_text, limit=5)
+    kept_ids = {str(object_uuid("UserFact", fact)) for fact in new_facts}
+    stale_ids = {
+        "UserFact": [str(obj_uuid) for obj_uuid in old_fact_ids if str(obj_uuid) not in kept_ids],
+        "RecentConversations": [str(obj_uuid) for obj_uuid in old_conversation_ids],
+    }
 
-        relevant_memories = [obj.properties for obj in response.objects]
-        print(f"✅ Found {len(relevant_memories)} contextually relevant memories.")
-        return relevant_memories
+    try:
+        for class_name, ids in stale_ids.items():
+            collection = client.collections.get(class_name)
+            for start in range(0, len(ids), RECENT_CONVERSATIONS_PRUNE_BATCH_SIZE):
+                batch = ids[start:start + RECENT_CONVERSATIONS_PRUNE_BATCH_SIZE]
+                collection.data.delete_many(where=Filter.by_id().contains_any(batch))
 
     except Exception as e:
-        print(f"❌ ERROR in vector search: {e}")
-        return []
+        print(f"❌ ERROR removing consolidated memories for {user_id}: {e}")
+        report_weaviate_error(e)
+        return False
 
     finally:
-        client.close()
+        context_cache.invalidate_user(user_id)
+
+    rebuild_user_context(user_id)
+    print(f"🗜️ {user_id}: replaced {len(stale_ids['UserFact'])} facts and {len(stale_ids['RecentConversations'])} conversations with {len(new_facts)} facts.")
+    return True
+
+### **🔹 Insert Recent Conversation**
+def insert_recent_conversation(user_id, summary):
+    """Stores a conversation summary in Weaviate. Storing the same summary twice is a no-op."""
+    return upsert_data("RecentConversations", [build_recent_conversation(user_id, summary)])
 
 ### **🔹 Fetch User Profile**
 def fetch_user_profile(user_id):
     """
-    Retrieves user profile data from Weaviate and converts JSON-encoded lists back to Python lists.
+    Retrieves a user's profile from Weaviate as a UserProfile, or None if unknown.
     """
+    cache_key = ("profile", str(user_id))
+    cached = context_cache.get(cache_key)
+    if cached is not MISS:
+        return cached
+
+    client = get_weaviate_client()
+    if not client:
+        return None
+
     try:
-        client = connect_to_weaviate()
         collection = client.collections.get("UserMemory")
 
         response = collection.query.fetch_objects(
-            filters=weaviate.classes.query.Filter.by_property("user_id").equal(user_id),
+            filters=Filter.by_property("user_id").equal(user_id),
+            limit=1,
             return_properties=["user_id", "name", "pronouns", "role", "relationship_notes", "memory"]
         )
 
-        if response.objects:
-            user_data = response.objects[0].properties  # ✅ Extract first matching user
-            
-            # ✅ Convert JSON string back to a list
-            if isinstance(user_data.get("memory"), str):
-                try:
-                    user_data["memory"] = json.loads(user_data["memory"])
-                except json.JSONDecodeError:
-                    user_data["memory"] = []  # ✅ Default to empty list if it fails
-
-            return user_data
-
-        return {}  # ✅ Return empty if no user found
+        profile = UserProfile.from_object(response.objects[0]) if response.objects else None  # ✅ None if no user found
+        context_cache.set(cache_key, profile)
+        return profile
 
     except Exception as e:
         print(f"❌ ERROR fetching user profile: {e}")
-        return {}
+        report_weaviate_error(e)
+        return None
 
 ### **🔹 Fetch Long-Term Memories**
 def fetch_long_term_memories(user_id):
-    """Fetches long-term memories from Weaviate and ensures proper format handling."""
-    client = connect_to_weaviate()
+    """Fetches all long-term memories (UserFact objects) about a user, oldest first."""
+    cache_key = ("long_term", str(user_id))
+    cached = context_cache.get(cache_key)
+    if cached is not MISS:
+        return cached
+
+    client = get_weaviate_client()
     if not client:
         return []
 
     try:
-        # ✅ Use proper Weaviate filter class
-        filter_condition = Filter.by_property("user_id").equal(user_id)
-
-        memory_collection = client.collections.get("UserMemory")
-        results = memory_collection.query.fetch_objects(
-            limit=1,
-            return_properties=["memory"],
-            filters=filter_condition  # ✅ Correct filter usage
+        fact_collection = client.collections.get("UserFact")
+        results = fact_collection.query.fetch_objects(
+            filters=Filter.by_property("user_id").equal(user_id),
+            sort=Sort.by_property("created_at", ascending=True),
+            return_properties=["fact"],
+            limit=1000
         )
 
-        if results.objects:
-            memory_data = results.objects[0].properties.get("memory", "[]")
-            return json.loads(memory_data) if isinstance(memory_data, str) else memory_data  # ✅ Ensure proper format
+        memories = [obj.properties["fact"] for obj in results.objects]
+        context_cache.set(cache_key, memories)
+        return memories
 
     except Exception as e:
         print(f"❌ ERROR fetching long-term memories: {e}")
-
-    finally:
-        client.close()
+        report_weaviate_error(e)
 
     return []
 
+### **🔹 Fetch Relevant Facts**
+def fact_search_arguments(user_id, limit):
+    """Shared near_vector/near_text arguments: overfetch with vectors and dates for re-ranking."""
+    return {
+        "filters": Filter.by_property("user_id").equal(user_id),
+        "limit": limit * RERANK_OVERFETCH,
+        "return_properties": ["fact", "created_at"],
+        "return_metadata": MetadataQuery(distance=True),
+        "include_vector": True,
+    }
+
+def rerank_fact_hits(objects, limit):
+    """Re-ranks UserFact hits for recency and diversity. Returns the fact strings."""
+    snippets = [
+        Snippet(
+            "UserFact",
+            obj.uuid,
+            obj.properties["fact"],
+            score=1 - (obj.metadata.distance or 0),
+            created_at=obj.properties.get("created_at"),
+            vector=(obj.vector or {}).get("default")
+        )
+        for obj in objects
+    ]
+    return [snippet.text for snippet in rerank(snippets, limit)]
+
+def fetch_relevant_facts(user_id, query_text, limit=USER_FACT_TOP_K):
+    """Returns up to `limit` of the user's facts most relevant to the query, recent and non-redundant first."""
+    client = get_weaviate_client()
+    if not client:
+        return []
+
+    try:
+        fact_collection = client.collections.get("UserFact")
+        query_vector = get_query_embedding(query_text)
+        if query_vector is not None:
+            response = fact_collection.query.near_vector(near_vector=query_vector, **fact_search_arguments(user_id, limit))
+        else:
+            response = fact_collection.query.near_text(query=query_text, **fact_search_arguments(user_id, limit))
+
+        return rerank_fact_hits(response.objects, limit)
+
+    except Exception as e:
+        print(f"❌ ERROR fetching relevant facts: {e}")
+        report_weaviate_error(e)
+        return []
+
 ### **🔹 Fetch Recent Conversations**
 def fetch_recent_conversations(user_id, limit=3):
     """
-    Retrieves the most recent conversations a user has had with Ash.
+    Retrieves the `limit` most recent conversations a user has had with Ash, oldest first.
     """
-    client = connect_to_weaviate()
+    cache_key = ("recent", str(user_id), limit)
+    cached = context_cache.get(cache_key)
+    if cached is not MISS:
+        return cached
+
+    client = get_weaviate_client()
     if not client:
         return []
 
@@ -242,87 +521,402 @@ def fetch_recent_conversations(user_id, limit=3):
         conversation_collection = client.collections.get("RecentConversations")
         response = conversation_collection.query.fetch_objects(
             filters=Filter.by_property("user_id").equal(user_id),
+            sort=Sort.by_property("created_at", ascending=False),
             limit=limit
         )
 
-        conversations = [obj.properties for obj in response.objects]
+        conversations = [Conversation.from_object(obj) for obj in reversed(response.objects)]
         print(f"✅ Retrieved {len(conversations)} recent conversations for {user_id}")
+        context_cache.set(cache_key, conversations)
         return conversations
 
     except Exception as e:
         print(f"❌ ERROR fetching recent conversations: {e}")
+        report_weaviate_error(e)
         return []
 
-    finally:
-        client.close()
+### **🔹 Materialized User Context**
+# One UserContext object per user, keyed by a UUID derived from the Discord ID,
+# holds the profile and latest conversation summaries the prompt needs
+# (long-term facts are retrieved by relevance from UserFact). Reads become a single
+# fetch-by-id; the write path in process_memory_updates keeps it current.
+USER_CONTEXT_RECENT_LIMIT = 3  # ✅ Conversation summaries kept on the context document
+
+def user_context_uuid(user_id):
+    """Deterministic UUID of a user's UserContext object."""
+    return generate_uuid5(str(user_id), "UserContext")
+
+def build_user_context(user_id, profile=None, summaries=None):
+    """Builds UserContext properties from a UserProfile and a list of conversation summaries."""
+    profile = profile or UserProfile(user_id)
+
+    return {
+        "user_id": str(user_id),
+        "name": profile.name,
+        "pronouns": profile.pronouns,
+        "role": profile.role,
+        "relationship_notes": profile.relationship_notes,
+        "recent_conversations": list(summaries or [])[-USER_CONTEXT_RECENT_LIMIT:],
+        "updated_at": datetime.datetime.now(datetime.timezone.utc)
+    }
+
+def fetch_user_context(user_id):
+    """Fetches a user's materialized context (a UserProfile) with one keyed get. Returns None if missing."""
+    cache_key = ("context", str(user_id))
+    cached = context_cache.get(cache_key)
+    if cached is not MISS:
+        return cached
+
+    client = get_weaviate_client()
+    if not client:
+        return None
+
+    try:
+        collection = client.collections.get("UserContext")
+        context_object = collection.query.fetch_object_by_id(user_context_uuid(user_id))
+        context = UserProfile.from_object(context_object) if context_object else None
+        context_cache.set(cache_key, context)
+        return context
+
+    except Exception as e:
+        print(f"❌ ERROR fetching user context: {e}")
+        report_weaviate_error(e)
+        return None
+
+def rebuild_user_context(user_id):
+    """Rebuilds one user's UserContext from UserMemory and RecentConversations."""
+    client = get_weaviate_client()
+    if not client:
+        return False
+
+    try:
+        context = build_user_context(
+            user_id,
+            fetch_user_profile(user_id),
+            [conversation.summary for conversation in fetch_recent_conversations(user_id, limit=USER_CONTEXT_RECENT_LIMIT)]
+        )
+        collection = client.collections.get("UserContext")
+        context_id = user_context_uuid(user_id)
+
+        if collection.data.exists(context_id):
+            collection.data.replace(uuid=context_id, properties=context)
+        else:
+            collection.data.insert(properties=context, uuid=context_id)
+        context_cache.invalidate_user(user_id)
+        return True
+
+    except Exception as e:
+        print(f"❌ ERROR rebuilding user context for {user_id}: {e}")
+        report_weaviate_error(e)
+        return False
+
+def rebuild_all_user_contexts():
+    """Rebuilds the UserContext object of every user found in UserMemory or RecentConversations."""
+    client = get_weaviate_client()
+    if not client:
+        return False
+
+    try:
+        user_ids = set()
+        for class_name in ["UserMemory", "RecentConversations"]:
+            collection = client.collections.get(class_name)
+            for obj in collection.iterator(return_properties=["user_id"]):
+                if obj.properties.get("user_id"):
+                    user_ids.add(obj.properties["user_id"])
+
+    except Exception as e:
+        print(f"❌ ERROR listing users for context rebuild: {e}")
+        report_weaviate_error(e)
+        return False
+
+    print(f"🔄 Rebuilding UserContext for {len(user_ids)} users...")
+    rebuilt = sum(1 for user_id in user_ids if rebuild_user_context(user_id))
+    print(f"✅ Rebuilt {rebuilt}/{len(user_ids)} user contexts.")
+    return rebuilt == len(user_ids)
 
 ### **🔹 Insert a New Self-Memory for Ash**
 def add_ash_memory(new_memory):
     """
-    Adds a new memory for Ash, reinforcing existing ones if applicable.
+    Adds a new memory for Ash, reinforcing an existing one if it's a close match.
     """
-    client = connect_to_weaviate()
+    from core.ash_memories import match_existing_ash_memories  # ✅ Lazy: ash_memories imports this module
+
+    return upsert_data("AshMemories", match_existing_ash_memories([{"memory": new_memory, "reinforced_count": 1}]))
+
+### **🔹 Dedupe Migration**
+def dedupe_memories():
+    """
+    One-time migration: collapses duplicate rows left by the old insert-only
+    write path. Each group of objects sharing a natural key is merged into the
+    object stored under the deterministic UUID and the extras are deleted.
+    """
+    client = get_weaviate_client()
     if not client:
         return False
 
     try:
-        ash_collection = client.collections.get("AshMemories")
-        response = ash_collection.query.fetch_objects(
-            filters=Filter.by_property("memory").equal(new_memory),
-            limit=1
-        )
+        for class_name in ["UserMemory", "RecentConversations", "UserFact", "AshMemories"]:
+            collection = client.collections.get(class_name)
+            groups, skipped = {}, 0
+            for obj in collection.iterator():
+                try:
+                    key_uuid = str(object_uuid(class_name, obj.properties))
+                except KeyError as e:
+                    # ✅ Legacy row without a natural key: leave it in place rather than abort the migration
+                    skipped += 1
+                    print(f"⚠️ Skipping {class_name} {obj.uuid}: missing natural key field {e}.")
+                    continue
+                groups.setdefault(key_uuid, []).append(obj)
+
+            merged_count, deleted_ids = 0, []
+            for key_uuid, group in groups.items():
+                if len(group) == 1 and str(group[0].uuid) == key_uuid:
+                    continue  # ✅ Already keyed and unique
+
+                merged = None
+                for obj in group:
+                    merged = merge_properties(class_name, merged, obj.properties)
+                if class_name == "AshMemories":
+                    # ✅ Each duplicate row was one reinforcement; merge_properties seeds the first as-is
+                    merged["reinforced_count"] = sum(obj.properties.get("reinforced_count") or 1 for obj in group)
+
+                if any(str(obj.uuid) == key_uuid for obj in group):
+                    collection.data.replace(uuid=key_uuid, properties=merged)
+                else:
+                    collection.data.insert(properties=merged, uuid=key_uuid)
+
+                merged_count += 1
+                deleted_ids.extend(str(obj.uuid) for obj in group if str(obj.uuid) != key_uuid)
+
+            for start in range(0, len(deleted_ids), 100):
+                collection.data.delete_many(where=Filter.by_id().contains_any(deleted_ids[start:start + 100]))
+
+            print(f"🧹 {class_name}: merged {merged_count} keys, removed {len(deleted_ids)} duplicate rows, skipped {skipped} without a natural key.")
 
-        if response.objects:
-            existing_memory = response.objects[0]
-            new_count = existing_memory.properties["reinforced_count"] + 1
+    except Exception as e:
+        print(f"❌ ERROR deduplicating memories: {e}")
+        report_weaviate_error(e)
+        return False
 
-            ash_collection.data.replace(uuid=existing_memory.uuid, properties={
-                "memory": new_memory,
-                "reinforced_count": new_count
-            })
-            print(f"🔄 Reinforced Ash memory: {new_memory}")
+    context_cache.clear()
+    rebuild_all_user_contexts()
+    print("✅ Memory dedupe complete!")
+    return True
 
-        else:
-            ash_collection.data.insert(properties={"memory": new_memory, "reinforced_count": 1})
-            print(f"✅ Added new Ash memory: {new_memory}")
+### **🔹 UserFact Migration**
+def migrate_memory_blobs_to_facts():
+    """
+    One-time migration: splits every UserMemory.memory JSON blob into one
+    UserFact object per memory, then empties the blob.
+    """
+    client = get_weaviate_client()
+    if not client:
+        return False
+
+    try:
+        user_collection = client.collections.get("UserMemory")
+        migrated_users, migrated_facts = 0, 0
+
+        for obj in user_collection.iterator(return_properties=["user_id", "memory"]):
+            memories = parse_memory_list(obj.properties.get("memory"))
+            if not memories:
+                continue
+
+            facts = build_user_facts(obj.properties["user_id"], memories)
+            if not upsert_data("UserFact", facts):
+                print(f"⚠️ Skipping blob cleanup for {obj.properties['user_id']}; facts were not saved.")
+                continue
+
+            user_collection.data.update(uuid=obj.uuid, properties={"memory": []})
+            migrated_users += 1
+            migrated_facts += len(facts)
 
     except Exception as e:
-        print(f"❌ ERROR adding Ash memory: {e}")
+        print(f"❌ ERROR migrating memories to UserFact: {e}")
+        report_weaviate_error(e)
+        return False
 
-    finally:
-        client.close()
+    context_cache.clear()
+    print(f"✅ Split {migrated_facts} memories from {migrated_users} users into UserFact.")
+    return True
 
-def load_weaviate_schema():
+### **🔹 Recent Conversation Retention**
+def _delete_conversations(collection, objects):
+    """Deletes one batch of RecentConversations objects. Returns how many were deleted."""
+    result = collection.data.delete_many(where=Filter.by_id().contains_any([obj.uuid for obj in objects]))
+    return result.successful
+
+def prune_recent_conversations(
+    keep_per_user=RECENT_CONVERSATIONS_KEEP_PER_USER,
+    max_age_days=RECENT_CONVERSATIONS_MAX_AGE_DAYS,
+    batch_size=RECENT_CONVERSATIONS_PRUNE_BATCH_SIZE,
+    max_batches=RECENT_CONVERSATIONS_PRUNE_MAX_BATCHES,
+    max_users=RECENT_CONVERSATIONS_PRUNE_MAX_USERS
+):
     """
-    Loads Weaviate schema from YAML file.
+    Deletes RecentConversations older than `max_age_days`, then anything
+    beyond each user's `keep_per_user` newest summaries, `batch_size`
+    objects at a time. Only users over the cap are queried individually.
+    A run stops after `max_batches` deletes, or as soon as a batch deletes
+    nothing, so it always terminates; whatever is left waits for the next run.
+    Returns the number of objects deleted, or None on failure.
     """
-    import yaml
+    client = get_weaviate_client()
+    if not client:
+        return None
 
-    client = connect_to_weaviate()
+    deleted, batches, touched_users = 0, 0, set()
+    try:
+        collection = client.collections.get("RecentConversations")
+
+        # ✅ Age limit
+        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=max_age_days)
+        while batches < max_batches:
+            expired = collection.query.fetch_objects(
+                filters=Filter.by_property("created_at").less_than(cutoff),
+                limit=batch_size,
+                return_properties=["user_id"]
+            )
+            if not expired.objects:
+                break
+            batch_deleted = _delete_conversations(collection, expired.objects)
+            batches += 1
+            deleted += batch_deleted
+            touched_users.update(obj.properties["user_id"] for obj in expired.objects)
+            if not batch_deleted:
+                print("⚠️ Couldn't delete expired conversation summaries; leaving them for the next run.")
+                break
+
+        # ✅ Per-user cap, oldest first
+        groups = collection.aggregate.over_all(
+            group_by=GroupByAggregate(prop="user_id", limit=max_users), total_count=True
+        )
+        if len(groups.groups) >= max_users:
+            print(f"⚠️ Counted only {max_users} users' conversations this run (RECENT_CONVERSATIONS_PRUNE_MAX_USERS).")
+        for group in groups.groups:
+            user_id = group.grouped_by.value
+            excess = (group.total_count or 0) - keep_per_user
+            while excess > 0 and batches < max_batches:
+                oldest = collection.query.fetch_objects(
+                    filters=Filter.by_property("user_id").equal(user_id),
+                    sort=Sort.by_property("created_at", ascending=True),
+                    limit=min(batch_size, excess),
+                    return_properties=["user_id"]
+                )
+                if not oldest.objects:
+                    break
+                batch_deleted = _delete_conversations(collection, oldest.objects)
+                batches += 1
+                deleted += batch_deleted
+                touched_users.add(user_id)
+                if not batch_deleted:
+                    print(f"⚠️ Couldn't delete old conversation summaries for {user_id}; skipping them this run.")
+                    break
+                excess -= batch_deleted
+
+        if batches >= max_batches:
+            print(f"⚠️ Prune stopped after {max_batches} batches; the rest will be pruned next run.")
+
+    except Exception as e:
+        print(f"❌ ERROR pruning recent conversations: {e}")
+        report_weaviate_error(e)
+        return None
+
+    for user_id in touched_users:
+        context_cache.invalidate_user(user_id)
+        rebuild_user_context(user_id)
+
+    print(f"🧹 Pruned {deleted} old conversation summaries across {len(touched_users)} users.")
+    return deleted
+
+def backfill_conversation_timestamps():
+    """
+    One-time migration: adds `created_at` to an existing RecentConversations
+    collection and fills it from each object's Weaviate creation time.
+    """
+    client = get_weaviate_client()
+    if not client:
+        return False
 
     try:
-        with open("data/weaviate_schema.yaml", "r", encoding="utf-8") as file:
-            schema = yaml.safe_load(file)
-
-        for collection in schema["classes"]:
-            class_name = collection["class"]
-            existing = client.collections.exists(class_name)
-
-            if not existing:
-                properties = [
-                    weaviate.Property(name=prop["name"], data_type=prop["dataType"][0])
-                    for prop in collection["properties"]
-                ]
-                client.collections.create(name=class_name, properties=properties)
-                print(f"✅ Created collection: {class_name}")
-            else:
-                print(f"⚠️ Collection {class_name} already exists. Skipping.")
+        collection = client.collections.get("RecentConversations")
+        if "created_at" not in [prop.name for prop in collection.config.get().properties]:
+            collection.config.add_property(wvc.config.Property(name="created_at", data_type=wvc.config.DataType.DATE))
+            print("✅ Added created_at to RecentConversations.")
+
+        backfilled = 0
+        for obj in collection.iterator(return_properties=["created_at"], return_metadata=MetadataQuery(creation_time=True)):
+            if not obj.properties.get("created_at"):
+                collection.data.update(uuid=obj.uuid, properties={"created_at": obj.metadata.creation_time})
+                backfilled += 1
 
     except Exception as e:
-        print(f"❌ Error loading Weaviate schema: {e}")
+        print(f"❌ ERROR backfilling conversation timestamps: {e}")
+        report_weaviate_error(e)
+        return False
 
-    finally:
-        client.close()
+    context_cache.clear()
+    print(f"✅ Backfilled created_at on {backfilled} conversations.")
+    return True
+
+### **🔹 TEXT[] Migration**
+def migrate_lists_to_text_arrays():
+    """
+    One-time migration: recreates UserMemory with `memory` as a native TEXT[]
+    property, re-inserting every object with its UUID and vector, and
+    recreates UserContext (a derived collection) before rebuilding it.
+    A JSON backup of UserMemory is written to data/ first.
+    """
+    client = get_weaviate_client()
+    if not client:
+        return False
+
+    try:
+        schema_classes = read_schema_classes()
+        collection = client.collections.get("UserMemory")
+        memory_property = next(prop for prop in collection.config.get().properties if prop.name == "memory")
+
+        if memory_property.data_type == wvc.config.DataType.TEXT_ARRAY:
+            print("⚠️ UserMemory.memory is already TEXT[]. Skipping.")
+        else:
+            objects = [
+                (str(obj.uuid), obj.properties, obj.vector.get("default"))
+                for obj in collection.iterator(include_vector=True)
+            ]
+
+            backup_path = f"data/UserMemory_backup_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+            with open(backup_path, "w", encoding="utf-8") as file:
+                json.dump([{"uuid": obj_uuid, "properties": properties, "vector": vector} for obj_uuid, properties, vector in objects], file, default=str)
+            print(f"💾 Backed up {len(objects)} UserMemory objects to {backup_path}")
+
+            client.collections.delete("UserMemory")
+            create_collection(client, schema_classes["UserMemory"])
+            collection = client.collections.get("UserMemory")
+
+            with collection.batch.dynamic() as batch:
+                for obj_uuid, properties, vector in objects:
+                    properties = dict(properties, memory=parse_memory_list(properties.get("memory")))
+                    batch.add_object(properties=properties, uuid=obj_uuid, vector=vector)
+
+            failed = collection.batch.failed_objects
+            if failed:
+                print(f"❌ {len(failed)} UserMemory objects failed to re-insert. Restore them from {backup_path}.")
+                return False
+            print(f"✅ Re-inserted {len(objects)} UserMemory objects with TEXT[] memory.")
+
+        # ✅ UserContext is rebuilt from the source collections, so no backup is needed
+        client.collections.delete("UserContext")
+        create_collection(client, schema_classes["UserContext"])
+
+    except Exception as e:
+        print(f"❌ ERROR migrating lists to TEXT[]: {e}")
+        report_weaviate_error(e)
+        return False
+
+    context_cache.clear()
+    rebuild_all_user_contexts()
+    print("✅ TEXT[] migration complete!")
+    return True
 
 def is_docker_running():
     """Check if Docker is running."""
@@ -343,17 +937,55 @@ def start_docker():
         print(f"❌ Error starting Docker: {e}")
         return False
 
+SCHEMA_PATH = "data/weaviate_schema.yaml"
+
+def read_schema_classes():
+    """Returns the class definitions from the schema YAML, keyed by class name."""
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as file:
+        schema = yaml.safe_load(file)
+    return {collection["class"]: collection for collection in schema["classes"]}
+
+def schema_data_type(name):
+    """Maps a schema dataType ("TEXT", "TEXT[]", "DATE", ...) onto the client's DataType enum."""
+    return wvc.config.DataType[name.upper().replace("[]", "_ARRAY")]
+
+def create_collection(client, collection):
+    """Creates one collection from its schema class definition."""
+    properties = [
+        wvc.config.Property(
+            name=prop["name"],
+            data_type=schema_data_type(prop["dataType"][0]),
+        )
+        for prop in collection["properties"]
+    ]
+
+    # ✅ Collections marked `vectorizer: none` store no embeddings; text2vec-openai
+    # collections pin their model so client-side query vectors (EMBEDDING_MODEL) match
+    if collection.get("vectorizer") == "none":
+        vectorizer_config = wvc.config.Configure.Vectorizer.none()
+    elif collection.get("vectorizer") == "text2vec-openai":
+        vectorizer_config = wvc.config.Configure.Vectorizer.text2vec_openai(
+            model=collection.get("moduleConfig", {}).get("text2vec-openai", {}).get("model")
+        )
+    else:
+        vectorizer_config = None
+
+    client.collections.create(
+        name=collection["class"],
+        properties=properties,
+        vectorizer_config=vectorizer_config
+    )
+
 def load_weaviate_schema():
     """Loads the Weaviate schema from YAML file, ensuring Weaviate is fully ready first."""
-    client = connect_to_weaviate()
-    
+    client = get_weaviate_client()
+
     if not client:
         print("❌ Unable to connect to Weaviate.")
         return False
 
-    schema_path = "data/weaviate_schema.yaml"
-    if not os.path.exists(schema_path):
-        print(f"❌ Schema file not found: {schema_path}. Ensure it exists before running RESET.")
+    if not os.path.exists(SCHEMA_PATH):
+        print(f"❌ Schema file not found: {SCHEMA_PATH}. Ensure it exists before running RESET.")
         return False
 
     # ✅ Wait for leader election (Weaviate might need time)
@@ -372,42 +1004,23 @@ def load_weaviate_schema():
         return False
 
     try:
-        with open(schema_path, "r", encoding="utf-8") as file:
-            schema = yaml.safe_load(file)
-
         # ✅ Get list of existing collections
-        existing_collections = [col.name for col in client.collections.list_all()]
-
-        for collection in schema["classes"]:
-            collection_name = collection["class"]
+        existing_collections = list(client.collections.list_all().keys())
 
+        for collection_name, collection in read_schema_classes().items():
             if collection_name not in existing_collections:
                 print(f"🚀 Creating collection: {collection_name}")
-
-                properties = [
-                    wvc.config.Property(
-                        name=prop["name"],
-                        data_type=wvc.config.DataType[prop["dataType"][0].upper()],
-                    )
-                    for prop in collection["properties"]
-                ]
-
-                client.collections.create(
-                    name=collection_name,
-                    properties=properties
-                )
-
+                create_collection(client, collection)
                 print(f"✅ Collection '{collection_name}' created successfully.")
             else:
                 print(f"⚠️ Collection '{collection_name}' already exists. Skipping.")
 
-        client.close()
         print("✅ Weaviate schema loaded successfully!")
         return True
 
     except Exception as e:
         print(f"❌ Error loading Weaviate schema: {e}")
-        client.close()
+        report_weaviate_error(e)
         return False
 
 def is_weaviate_running():
@@ -452,6 +1065,7 @@ def is_weaviate_fully_ready(retries=5, delay=3):
 def stop_weaviate():
     """Stops Weaviate using docker-compose, ensuring it is fully stopped."""
     print("🛑 Attempting to stop Weaviate...")
+    close_weaviate_client()  # ✅ Don't keep a client pointed at a stopping server
 
     # ✅ Step 1: Check if Weaviate is running
     if not is_weaviate_running():
@@ -576,6 +1190,9 @@ def initialize_weaviate_data():
         print("❌ Failed to insert base data. Weaviate may be incomplete.")
         return False  # ✅ Return failure if data insertion didn't work
 
+    print("🧩 Building user context documents...")
+    rebuild_all_user_contexts()
+
     print("🎉 Weaviate is fully initialized with schema and base data!")
     return True
 
@@ -594,6 +1211,7 @@ def reset_memory():
         return False
 
     print("⚠️ Resetting ALL memory...")
+    close_weaviate_client()
 
     try:
         # ✅ Step 3: Stop and remove all Weaviate-related resources
@@ -628,6 +1246,7 @@ def restart_weaviate():
         return start_weaviate()
 
     print("🔄 Restarting Weaviate...")
+    close_weaviate_client()
     try:
         subprocess.run(["docker", "compose", "restart", "weaviate"], check=True)
         print("✅ Weaviate restarted successfully!")
@@ -640,11 +1259,17 @@ def restart_weaviate():
 def insert_base_data():
     try:
         for collection_name, data_list in BASE_MEMORIES.items():
-            # ✅ Convert lists to JSON before inserting
-            formatted_data = [convert_lists_to_json(entry) for entry in data_list]
+            entries = [dict(entry) for entry in data_list]
+
+            # ✅ Base user memories are seeded as individual UserFact objects
+            if collection_name == "UserMemory":
+                facts = [fact for entry in entries for fact in build_user_facts(entry["user_id"], entry.pop("memory", []))]
+                if facts:
+                    upsert_data("UserFact", facts, only_if_missing=True)
 
-            if formatted_data:
-                insert_data(collection_name, formatted_data)  # ✅ Use updated insert_data
+            if entries:
+                # ✅ Keyed and insert-only, so seeding twice never duplicates or re-reinforces
+                upsert_data(collection_name, entries, only_if_missing=True)
 
         print("✅ Base data inserted successfully!")
         return True  # ✅ Explicit success return
@@ -665,6 +1290,19 @@ def weaviate_menu():
             print("[S] Stop Weaviate")
             print("[R] Restart Weaviate")
             print("[Q] Query Weaviate Data")
+            print("[P] Show Connection Stats")
+            print("[K] Show Context Cache Stats")
+            print("[E] Show Embedding Cache Stats")
+            print("[C] Show Response Cache Stats")
+            print("[B] Show Memory Writer Stats")
+            print("[A] Show Ash Memory Hot Set Stats")
+            print("[U] Rebuild User Context Documents")
+            print("[D] Dedupe Stored Memories (one-time migration)")
+            print("[F] Split Memory Blobs into UserFacts (one-time migration)")
+            print("[L] Convert JSON List Properties to TEXT[] (one-time migration)")
+            print("[T] Backfill Conversation Timestamps (one-time migration)")
+            print("[O] Prune Old Conversations")
+            print("[M] Consolidate Oversized User Memories")
         else:
             print("[W] Start Weaviate")
             print("[RESET] Reset ALL Memory to default")
@@ -683,6 +1321,36 @@ def weaviate_menu():
             test_message = input("Enter a message for vector search (or leave blank): ").strip() or None
             import test_queries
             test_queries.test_queries(test_user_id, test_message)
+        elif choice == "P":
+            show_connection_stats()
+        elif choice == "K":
+            show_cache_stats()
+        elif choice == "E":
+            show_embedding_stats()
+        elif choice == "C":
+            from core.response_cache import show_response_cache_stats
+            show_response_cache_stats()
+        elif choice == "B":
+            from core.memory_writer import show_writer_stats
+            show_writer_stats()
+        elif choice == "A":
+            from core.ash_memories import show_ash_memory_stats
+            show_ash_memory_stats()
+        elif choice == "U" and weaviate_running:
+            rebuild_all_user_contexts()
+        elif choice == "D" and weaviate_running:
+            dedupe_memories()
+        elif choice == "F" and weaviate_running:
+            migrate_memory_blobs_to_facts()
+        elif choice == "L" and weaviate_running:
+            migrate_lists_to_text_arrays()
+        elif choice == "T" and weaviate_running:
+            backfill_conversation_timestamps()
+        elif choice == "O" and weaviate_running:
+            prune_recent_conversations()
+        elif choice == "M" and weaviate_running:
+            from core.memory_consolidation import run_memory_consolidation
+            run_memory_consolidation()
         elif choice == "RESET" and not weaviate_running:
             reset_memory()
         elif choice == "X":
@@ -18,6 +18,136 @@ COMMUNITY_SUPPORT_ID = int(os.getenv("COMMUNITY_SUPPORT_ID", 0))
 # 🔹 Debugging
 DEBUG_FILE = "data/debug.txt"
 
+# 🔹 config.json
+CONFIG_FILE = "config.json"
+try:
+    with open(CONFIG_FILE, "r", encoding="utf-8") as file:
+        CONFIG = json.load(file)
+except (OSError, json.JSONDecodeError) as e:
+    print(f"⚠️ Could not load {CONFIG_FILE} ({e}). Using defaults.")
+    CONFIG = {}
+
+# 🔹 LLM Backend
+LLM_BACKEND = CONFIG.get("llm_backend", "assistants")  # ✅ "assistants" (threads + runs) or "chat_completions" (stateless)
+CHAT_MODEL = CONFIG.get("chat_model", "gpt-4o")  # ✅ Model for the chat_completions backend (must support JSON mode)
+ASH_PERSONA_FILE = "data/ash_persona.md"  # ✅ Ash's instructions for the chat_completions backend (the cached prompt prefix)
+
+# 🔹 Sharding
+SHARD_COUNT = int(CONFIG.get("shard_count", 0))  # ✅ 0 = one gateway connection (commands.Bot); >0 = AutoShardedBot with this many shards
+SHARD_PROCESSES = int(CONFIG.get("shard_processes", 1))  # ✅ Worker processes the shards are split across (sharded mode only)
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv("ASH_SHARD_IDS", "").split(",") if shard_id.strip()] or None  # ✅ Set by the launcher for each worker
+SHARD_PROCESS_INDEX = int(os.getenv("ASH_SHARD_PROCESS", -1))  # ✅ This worker's index; -1 when running in the console process
+SHARD_STATUS_DIR = "data/shard_status"  # ✅ Worker status files and logs
+SHARD_STATUS_INTERVAL = 15  # ✅ Seconds between worker status writes
+SHARD_STATUS_STALE_AFTER = 60  # ✅ A status older than this is flagged in the menu
+
+# 🔹 Job Queue (bot ↔ LLM workers)
+JOB_MODE = CONFIG.get("job_mode", "inline")  # ✅ "inline" (the bot process does the work) or "queue" (LLM worker processes do)
+JOB_WORKERS = int(CONFIG.get("job_workers", 2))  # ✅ LLM worker processes started with the bot in queue mode
+JOB_WORKER_CONCURRENCY = 4  # ✅ Jobs each worker runs at once (they mostly wait on OpenAI)
+JOB_QUEUE_FILE = "data/job_queue.sqlite3"  # ✅ SQLite broker shared by the bot and worker processes
+JOB_WORKER_LOG_DIR = "data/job_workers"  # ✅ Worker process logs
+JOB_POLL_INTERVAL = 0.25  # ✅ Seconds an idle worker waits before checking for jobs again
+JOB_RESULT_POLL_INTERVAL = 0.5  # ✅ Seconds between the bot's checks for finished replies
+JOB_HEARTBEAT_INTERVAL = 5  # ✅ Seconds between a worker's heartbeats on its running jobs (and stop-request checks)
+JOB_STALE_AFTER = 60  # ✅ Seconds without a heartbeat before a running job's worker is assumed dead
+JOB_MAX_ATTEMPTS = 2  # ✅ Claims per job before a stale job is failed instead of requeued
+
+# 🔹 Response Cache
+RESPONSE_CACHE_MODE = CONFIG.get("response_cache", "off")  # ✅ "off", "draft" (close matches become drafts) or "reply" (reuse matching replies)
+RESPONSE_CACHE_SIMILARITY = 0.95  # ✅ Minimum cosine similarity between message embeddings to count as the same question
+RESPONSE_CACHE_TTL = 3600  # ✅ Seconds a cached reply stays usable
+RESPONSE_CACHE_MAX_ENTRIES = 500  # ✅ LRU bound across all guilds
+
+# 🔹 Channel Message Buffer
+CHANNEL_BUFFER_SIZE = 20  # ✅ Recent messages kept per channel (fed by gateway events)
+CHANNEL_BUFFER_SCAN = 10  # ✅ Newest buffered messages scanned for conversation_history
+CHANNEL_BUFFER_MAX_MESSAGES = 5000  # ✅ Cap across all channels; idle channels are evicted first
+
+# 🔹 Per-User Context Cache
+CONTEXT_CACHE_MAX_ENTRIES = 512  # ✅ LRU bound across all users and lookups
+CONTEXT_CACHE_TTL = 300  # ✅ Seconds a cached profile/memory/conversation lookup stays fresh
+CONTEXT_CACHE_NEGATIVE_TTL = 60  # ✅ Seconds to remember that a user has no data yet
+
+# 🔹 Query Embeddings
+EMBEDDING_MODEL = "text-embedding-3-small"  # ✅ Must match the text2vec-openai model in weaviate_schema.yaml
+EMBEDDING_CACHE_FILE = "data/embedding_cache.sqlite3"
+EMBEDDING_CACHE_MAX_ENTRIES = 5000  # ✅ Least recently used embeddings are evicted past this
+EMBEDDING_CACHE_TOUCH_INTERVAL = 30  # ✅ Seconds between batched writes of cache hits' last_used timestamps
+
+# 🔹 Write-Behind Memory Writer
+WRITE_BEHIND_WINDOW = 2.0  # ✅ Seconds to collect and coalesce memory updates before a flush
+WRITE_BEHIND_MAX_RETRIES = 3  # ✅ Retries for objects the batch API reports as failed
+
+# 🔹 User Facts
+USER_FACT_TOP_K = 8  # ✅ Most relevant facts about the user included in each prompt
+
+# 🔹 Recent Conversations Retention
+RECENT_CONVERSATIONS_KEEP_PER_USER = 50  # ✅ Newest summaries kept per user; older ones are pruned
+RECENT_CONVERSATIONS_MAX_AGE_DAYS = 30  # ✅ Summaries older than this are pruned regardless of count
+RECENT_CONVERSATIONS_PRUNE_INTERVAL_HOURS = 6  # ✅ How often the background pruner runs
+RECENT_CONVERSATIONS_PRUNE_BATCH_SIZE = 200  # ✅ Objects deleted per delete_many call
+RECENT_CONVERSATIONS_PRUNE_MAX_BATCHES = 500  # ✅ delete_many calls per run; the next run picks up the rest
+RECENT_CONVERSATIONS_PRUNE_MAX_USERS = 10000  # ✅ Per-user groups counted per run (the aggregate can't be paged)
+
+# 🔹 Memory Consolidation
+CONSOLIDATION_MODEL = "gpt-4o-mini"  # ✅ Chat model that merges a user's facts
+CONSOLIDATION_FACT_THRESHOLD = 40  # ✅ Users with more facts than this get consolidated
+CONSOLIDATION_CONVERSATION_THRESHOLD = 20  # ✅ ...or with more conversation summaries than this
+CONSOLIDATION_TARGET_FACTS = 20  # ✅ Upper bound on facts kept after consolidation
+CONSOLIDATION_KEEP_CONVERSATIONS = 10  # ✅ Newest summaries left alone; older ones are folded into facts
+CONSOLIDATION_BATCH_SIZE = 10  # ✅ Users per batch between checkpoints
+CONSOLIDATION_MAX_USERS = 10000  # ✅ Per-user groups counted per collection per pass (the aggregate can't be paged)
+CONSOLIDATION_CHECKPOINT_FILE = "data/consolidation_checkpoint.json"
+CONSOLIDATION_INTERVAL_HOURS = 24  # ✅ How often the bot runs a consolidation pass
+
+# 🔹 Ash Self-Memories
+ASH_MEMORY_TOP_K = 5  # ✅ Ash memories included in each prompt
+ASH_MEMORY_REINFORCEMENT_WEIGHT = 0.25  # ✅ Score = similarity × (1 + weight × ln(1 + reinforced_count))
+ASH_MEMORY_MATCH_DISTANCE = 0.15  # ✅ Cosine distance under which a new memory reinforces an existing one
+ASH_MEMORY_HOT_SET_SIZE = 200  # ✅ Most reinforced memories kept in memory and scored locally
+ASH_MEMORY_HOT_SET_TTL = 600  # ✅ Seconds before the hot set is reloaded
+
+# 🔹 Hybrid Retrieval
+RETRIEVAL_TOP_K = 6  # ✅ Fused snippets returned per message
+RETRIEVAL_CANDIDATES_PER_SOURCE = 10  # ✅ Hybrid hits fetched from each searched collection before fusion
+RETRIEVAL_HYBRID_ALPHA = 0.5  # ✅ 0 = pure BM25, 1 = pure vector search
+RETRIEVAL_RRF_K = 60  # ✅ Reciprocal-rank fusion constant: score = Σ 1 / (k + rank)
+RETRIEVAL_SNIPPET_CHARS = 300  # ✅ Snippets are cut to this many characters when sent to Ash
+
+# 🔹 Re-ranking
+RERANK_OVERFETCH = 3  # ✅ Candidates retrieved per snippet we keep, for re-ranking to choose from
+RERANK_HALF_LIFE_DAYS = 90  # ✅ A memory's relevance halves every this many days
+RERANK_MIN_DECAY = 0.2  # ✅ Old memories never drop below this fraction of their relevance
+RERANK_MMR_LAMBDA = 0.7  # ✅ 1 = pure relevance, 0 = pure diversity
+RERANK_DUPLICATE_SIMILARITY = 0.95  # ✅ Candidates this similar to a chosen snippet are dropped
+
+# 🔹 Prompt Budget
+PROMPT_TOKEN_BUDGET = 3000  # ✅ Max tokens in the structured_message sent to Ash
+PROMPT_MAX_ITEM_TOKENS = 200  # ✅ Longer memories/messages are truncated to this
+PROMPT_TOKENIZER_ENCODING = "o200k_base"  # ✅ tiktoken encoding of the gpt-4o model family
+
+# 🔹 Reply Streaming
+STREAM_REPLIES = True  # ✅ Edit Ash's reply into Discord while it generates
+STREAM_EDIT_INTERVAL = 1.0  # ✅ Minimum seconds between message edits (Discord rate limits edits)
+
+# 🔹 /ash Message Coalescing
+DUPLICATE_WINDOW = 10.0  # ✅ Identical messages within this many seconds are dropped as double-submits
+
+# 🔹 /ash Request Scheduling
+SCHEDULER_MAX_CONCURRENT = 4  # ✅ /ash requests (context fetch + OpenAI run) running at once
+SCHEDULER_PER_USER_IN_FLIGHT = 1  # ✅ Requests one user can have running at once
+SCHEDULER_MAX_QUEUE = 50  # ✅ Waiting requests beyond this are shed with a "try again" message
+
+# 🔹 OpenAI Rate Limiting
+RATE_LIMIT_REQUESTS_PER_MINUTE = 500  # ✅ Starting guess; replaced by x-ratelimit-limit-requests after the first response
+RATE_LIMIT_TOKENS_PER_MINUTE = 200000  # ✅ Starting guess; replaced by x-ratelimit-limit-tokens after the first response
+RATE_LIMIT_HEADROOM = 0.05  # ✅ Fraction of each limit left unused so we stay just under quota
+RATE_LIMIT_RESPONSE_TOKENS = 800  # ✅ Tokens reserved for Ash's reply on top of the prompt
+RATE_LIMIT_MAX_RETRIES = 5  # ✅ Attempts per call before giving up on 429s
+RATE_LIMIT_BASE_BACKOFF = 1  # ✅ Seconds; doubles per retry when the server sends no Retry-After
+RATE_LIMIT_MAX_BACKOFF = 30  # ✅ Longest single backoff in seconds
+
 # 🔹 Weaviate Configuration
 WEAVIATE_URL = "http://localhost:8080"
 WEAVIATE_CALL_URL = "http://localhost:8080/v1/graphql"
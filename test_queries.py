@@ -1,6 +1,5 @@
 import sys
 import os
-import json
 
 # Ensure we can import weaviate_manager
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
@@ -9,8 +8,10 @@ from core.weaviate_manager import (
     fetch_user_profile,
     fetch_long_term_memories,
     fetch_recent_conversations,
-    perform_vector_search,  # ✅ Vector-based search (for both memories & conversations)
+    fetch_user_context,
+    fetch_relevant_facts,
 )
+from core.retrieval import search_memories  # ✅ Hybrid search over the user's facts, conversations and Ash's memories
 from data.constants import CAILEA_ID
 
 def test_queries(user_id, message=None):
@@ -24,13 +25,6 @@ def test_queries(user_id, message=None):
     user_profile = fetch_user_profile(user_id)
     print("\n🔹 User Profile:", user_profile)
 
-    # ✅ Fix: Convert JSON-encoded memory back to list if necessary
-    if isinstance(user_profile.get("memory"), str):
-        try:
-            user_profile["memory"] = json.loads(user_profile["memory"])
-        except json.JSONDecodeError:
-            user_profile["memory"] = []
-
     # ✅ Test Long-Term Memories
     long_term_memories = fetch_long_term_memories(user_id)
     print("\n🔹 Long-Term Memories:", long_term_memories)
@@ -39,7 +33,14 @@ def test_queries(user_id, message=None):
     recent_conversations = fetch_recent_conversations(user_id)
     print("\n🔹 Recent Conversations:", recent_conversations)
 
+    # ✅ Test Materialized User Context (what the bot actually reads per request)
+    user_context = fetch_user_context(user_id)
+    print("\n🔹 User Context Document:", user_context)
+
     # ✅ Test Vector-Based Search (if a message is provided)
     if message:
-        related_conversations = perform_vector_search(message)
-        print("\n🔹 Related Conversations (Vector Search):", related_conversations)
+        related_snippets = search_memories(user_id, message)
+        print("\n🔹 Related Memories (Hybrid Search):", related_snippets)
+
+        relevant_facts = fetch_relevant_facts(user_id, message)
+        print("\n🔹 Most Relevant Facts:", relevant_facts)